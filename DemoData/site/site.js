@@ -0,0 +1,74 @@
+// 本機替身站台：行為對齊 saucedemo 的登入 / 商品列表 / 購物車徽章
+var site = (function () {
+  var USERS = { "standard_user": "secret_sauce" };
+  var ITEMS = [
+    ["Sauce Labs Backpack", "$29.99"],
+    ["Sauce Labs Bike Light", "$9.99"],
+    ["Sauce Labs Bolt T-Shirt", "$15.99"],
+    ["Sauce Labs Fleece Jacket", "$49.99"],
+    ["Sauce Labs Onesie", "$7.99"],
+    ["Test.allTheThings() T-Shirt (Red)", "$15.99"]
+  ];
+
+  function currentUser() {
+    var m = document.cookie.match(/(?:^|; )session-username=([^;]*)/);
+    return m ? decodeURIComponent(m[1]) : "";
+  }
+
+  function login() {
+    var user = document.getElementById("user-name").value;
+    var pass = document.getElementById("password").value;
+    if (USERS[user] && USERS[user] === pass) {
+      document.cookie = "session-username=" + encodeURIComponent(user) + "; path=/";
+      window.localStorage.setItem("cart-contents", "[]");
+      window.location.href = "inventory.html";
+      return;
+    }
+    var err = document.querySelector("[data-test=error]");
+    err.textContent = "Epic sadface: Username and password do not match any user in this service";
+    err.hidden = false;
+  }
+
+  function requireLogin() {
+    if (!currentUser()) {
+      window.location.replace("/");
+    }
+  }
+
+  function cart() {
+    try { return JSON.parse(window.localStorage.getItem("cart-contents") || "[]"); }
+    catch (e) { return []; }
+  }
+
+  function renderBadge() {
+    var link = document.querySelector(".shopping_cart_link");
+    var count = cart().length;
+    link.innerHTML = count ? '<span class="shopping_cart_badge">' + count + "</span>" : "";
+  }
+
+  function renderInventory() {
+    var list = document.getElementById("inventory_list");
+    var html = "";
+    ITEMS.forEach(function (item, i) {
+      html += '<div class="inventory_item">'
+        + '<img class="inventory_item_img" src="/static/media/item-' + i + '.png" alt="">'
+        + '<div class="inventory_item_name">' + item[0] + "</div>"
+        + '<div class="inventory_item_price">' + item[1] + "</div>"
+        + '<button class="btn btn_inventory" data-index="' + i + '">Add to cart</button>'
+        + "</div>";
+    });
+    list.innerHTML = html;
+    list.addEventListener("click", function (e) {
+      var btn = e.target.closest("button.btn_inventory");
+      if (!btn) { return; }
+      var items = cart();
+      items.push(Number(btn.getAttribute("data-index")));
+      window.localStorage.setItem("cart-contents", JSON.stringify(items));
+      btn.textContent = "Remove";
+      renderBadge();
+    });
+    renderBadge();
+  }
+
+  return { login: login, requireLogin: requireLogin, renderInventory: renderInventory };
+})();
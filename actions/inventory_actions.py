@@ -1,14 +1,19 @@
 # actions/inventory_actions.py
 from base.browser import Browser
 from base.base_action import BaseAction
-from pages.inventory_page import InventoryPage
+from base.async_browser import AsyncBrowser
+from pages.inventory_page import InventoryPage, AsyncInventoryPage
+from toolkit.flow import flow
 
 class InventoryActions(BaseAction):
-    def __init__(self, browser: Browser):
-        super().__init__()
-        self.inventory_page = InventoryPage(browser)
+    """同一份流程給 Browser（同步）與 AsyncBrowser（engine.async_runner）使用"""
 
-    def inventory_has_items(self) -> None:
+    def __init__(self, browser: Browser | AsyncBrowser):
+        super().__init__(browser)
+        self.inventory_page = (AsyncInventoryPage if self.ASYNC else InventoryPage)(browser)
+
+    @flow
+    def inventory_has_items(self):
         """
         測試一：登入後，商品列表不應為空。
         驗證重點：
@@ -16,8 +21,8 @@ class InventoryActions(BaseAction):
         - 商品名稱清單長度與商品卡片數量一致
         """
         # Act
-        item_count = self.inventory_page.get_item_count()
-        item_names = self.inventory_page.get_all_item_names()
+        item_count = yield self.inventory_page.get_item_count()
+        item_names = yield self.inventory_page.get_all_item_names()
 
         self.logger.info(f"商品數量：{item_count}")
         self.logger.info(f"商品名稱列表：{item_names}")
@@ -29,7 +34,8 @@ class InventoryActions(BaseAction):
         self.logger.info("✅ test_inventory_has_items 通過")
 
 
-    def add_item_to_cart(self,index:int=0) -> None:
+    @flow
+    def add_item_to_cart(self,index:int=0):
         """
         測試二：加入一個商品到購物車，徽章數量應為 1。
 
@@ -41,8 +47,8 @@ class InventoryActions(BaseAction):
         # Arrange
         # Act：加入商品
         index = int(index)
-        self.inventory_page.add_item_to_cart_by_index(index)
-        badge_count = self.inventory_page.get_cart_badge_count()
+        yield self.inventory_page.add_item_to_cart_by_index(index)
+        badge_count = yield self.inventory_page.get_cart_badge_count()
 
         self.logger.info(f"🛒 購物車徽章數量：{badge_count}")
 
@@ -50,5 +56,3 @@ class InventoryActions(BaseAction):
         assert badge_count == 1, f"預期購物車徽章為 1，但實際為 {badge_count}"
 
         self.logger.info("✅ test_add_first_item_to_cart 通過")
-
-
@@ -1,16 +1,24 @@
 # actions/login_actions.py
+from urllib.parse import urljoin
+
 from base.browser import Browser
 from base.base_action import BaseAction
-from pages.login_page import LoginPage
-from pages.inventory_page import InventoryPage
+from engine.runtime import get_config
+from base.async_browser import AsyncBrowser
+from pages.login_page import LoginPage, AsyncLoginPage
+from pages.inventory_page import InventoryPage, AsyncInventoryPage
+from toolkit.flow import flow
+from toolkit.session_cache import get_session_cache, capture_session, inject_session
 
 class LoginActions(BaseAction):
+    """同一份流程給 Browser（同步）與 AsyncBrowser（engine.async_runner）使用"""
 
-    def __init__(self,browser:Browser):
-        super().__init__()
-        self.login_page = LoginPage(browser)
-        self.inventory_page = InventoryPage(browser)
+    def __init__(self,browser:Browser | AsyncBrowser):
+        super().__init__(browser)
+        self.login_page = (AsyncLoginPage if self.ASYNC else LoginPage)(browser)
+        self.inventory_page = (AsyncInventoryPage if self.ASYNC else InventoryPage)(browser)
 
+    @flow
     def login_success(self):
         """
         驗證：使用正確帳密可以成功登入並進入商品列表頁。
@@ -19,15 +27,45 @@ class LoginActions(BaseAction):
         - 使用 InventoryPage 驗證頁面狀態
         """
         self.logger.info("開始登入流程")
-        self.login_page.open(self.config.BASE_URL).login(username=self.config.USERNAME, password=self.config.PASSWORD)
+        login_page = yield self.login_page.open(self.config.BASE_URL)
+        yield login_page.login(username=self.config.USERNAME, password=self.config.PASSWORD)
         
         # 等待 URL 進入 inventory 頁（內部會封裝 WebDriverWait）
-        assert self.login_page.wait_for_url("inventory.html", partial=True), "登入後未導向商品列表頁"
+        assert (yield self.login_page.wait_for_url("inventory.html", partial=True)), "登入後未導向商品列表頁"
         # 使用 InventoryPage 做進一步驗證（例如：商品數量 > 0）
-        item_count = self.inventory_page.get_item_count()
+        item_count = yield self.inventory_page.get_item_count()
         self.logger.info(f"登入成功，商品數量：{item_count}")
         assert item_count > 0, "登入後商品列表應該至少有一項商品"
     
 
+    @flow
+    def login_with_session(self):
+        """
+        快速登入：優先注入快取的登入狀態，直接進入商品列表頁。
+        - 快取不存在 / 過期 / 注入後驗證失敗 → 走 login_success() 的 UI 登入，並重新擷取快照
+        - 真正要驗證登入流程的案例請用 login_success()，不要用這個
+        """
+        cache = get_session_cache()
+        if cache is None:
+            yield self.login_success()
+            return
+
+        C = get_config()
+        snapshot = cache.get(C.NAME, C.USERNAME)
+        if snapshot is not None:
+            driver = self.browser.driver
+            yield inject_session(driver, snapshot, C.BASE_URL)
+            yield driver.get(urljoin(C.BASE_URL, "inventory.html"))
+            if (yield self.login_page.wait_for_url("inventory.html", timeout=3, partial=True)) \
+                    and (yield self.inventory_page.is_visible(InventoryPage.ITEM_CARD)):
+                self.logger.info("使用 Session 快照登入成功")
+                return
+
+            self.logger.warning("Session 快照注入後登入失效，改走 UI 登入")
+            cache.invalidate(C.NAME, C.USERNAME)
+
+        yield self.login_success()
+        cache.put(C.NAME, C.USERNAME, (yield capture_session(self.browser.driver)))
+
     def login_fail(self):
-        pass
\ No newline at end of file
+        pass
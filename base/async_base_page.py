@@ -0,0 +1,83 @@
+# base/async_base_page.py
+from __future__ import annotations
+from typing import TYPE_CHECKING, List, Optional
+
+import toolkit.async_webdriver as aw
+from toolkit.types import Locator
+from selenium.common.exceptions import TimeoutException
+
+if TYPE_CHECKING:
+    from base.async_browser import AsyncBrowser
+
+
+class AsyncBasePage:
+    """
+    asyncio 版 Page Object 基底類別，方法與 BasePage 一一對應，全部為 coroutine。
+    頁面自己的流程寫在同步版 Page（@flow，toolkit/flow.py），asyncio 版以
+    class AsyncXxxPage(AsyncBasePage, XxxPage) 繼承：基本操作用這裡的，流程用 XxxPage 的。
+    """
+    ASYNC = True
+
+    def __init__(self, browser: "AsyncBrowser"):
+        self.browser = browser
+
+    @property
+    def driver(self) -> aw.AsyncWebDriver:
+        return self.browser.driver
+
+    @property
+    def wait(self) -> aw.AsyncWait:
+        return self.browser.wait
+
+    # === 基本操作封裝 ===
+
+    async def type(self, locator: Locator, text: str, clear: bool = True):
+        elem = await self.wait.until(aw.visibility_of_element_located(locator))
+        if clear:
+            await elem.clear()
+        await elem.send_keys(text)
+        return elem
+
+    async def click(self, locator: Locator):
+        elem = await self.wait.until(aw.element_to_be_clickable(locator))
+        await elem.click()
+        return elem
+
+    async def get_text(self, locator: Locator) -> str:
+        elem = await self.wait.until(aw.visibility_of_element_located(locator))
+        return await elem.text
+
+    async def is_visible(self, locator: Locator) -> bool:
+        try:
+            await self.wait.until(aw.visibility_of_element_located(locator))
+            return True
+        except TimeoutException:
+            return False
+
+    async def wait_for_url(self, expected: str, timeout: int = 10, partial: bool = True) -> bool:
+        condition = aw.url_contains(expected) if partial else aw.url_to_be(expected)
+        try:
+            await self.wait.until(condition, timeout=timeout)
+            return True
+        except TimeoutException:
+            return False
+
+    async def find_all(self, locator: Locator) -> List[aw.AsyncElement]:
+        return await self.wait.until(aw.visibility_of_all_elements_located(locator))
+
+    async def get_all_texts(self, items_locator: Locator, text_locator: Optional[Locator] = None) -> List[str]:
+        items = await self.find_all(items_locator)
+        texts: List[str] = []
+        for item in items:
+            elem = await item.find_element(text_locator) if text_locator else item
+            texts.append((await elem.text).strip())
+        return texts
+
+    async def find_existing(self, locator: Locator) -> List[aw.AsyncElement]:
+        return await self.driver.find_elements(locator)
+
+    async def elements_count(self, locator: Locator) -> int:
+        return len(await self.find_all(locator))
+
+    async def find_element(self, parent_elem: aw.AsyncElement, locator: Locator) -> aw.AsyncElement:
+        return await parent_elem.find_element(locator)
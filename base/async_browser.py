@@ -0,0 +1,80 @@
+# base/async_browser.py
+from __future__ import annotations
+import asyncio
+from typing import TYPE_CHECKING, Optional
+
+import config as C
+from config import EnvConfig, LoadProfile
+from toolkit.async_webdriver import AsyncWebDriver, AsyncWait
+from toolkit.governor import BrowserLease, get_governor
+from toolkit.perf_metrics import PerfCollector
+from toolkit.web_toolkit import apply_replay_proxy, build_chrome_options, blocked_url_patterns, reset_browser_state
+
+if TYPE_CHECKING:
+    import aiohttp
+
+
+class AsyncBrowser:
+    """
+    asyncio 版 Browser：driver / wait 介面與 Browser 對應，但所有操作都是 coroutine。
+    多個 AsyncBrowser 共用同一個 chromedriver 與 HTTP 連線池。
+    Action / Page Object 與 Browser 共用同一份流程（toolkit/flow.py），ASYNC 決定執行方式。
+    """
+    ASYNC = True
+
+    def __init__(self, driver: AsyncWebDriver, wait: AsyncWait, env_config: EnvConfig,
+                 lease: Optional[BrowserLease] = None):
+        self.driver = driver
+        self.wait = wait
+        self.env_config = env_config
+        self._lease = lease
+        self.perf = PerfCollector(self)
+
+    @classmethod
+    async def create(cls, http: "aiohttp.ClientSession", executor_url: str,
+                     env_config: Optional[EnvConfig] = None,
+                     profile: Optional[LoadProfile] = None,
+                     timeout: Optional[int] = None,
+                     headless: Optional[bool] = None) -> "AsyncBrowser":
+        if env_config is None:
+            env_config = C.ACTIVE_CONFIG
+        if profile is None:
+            profile = C.get_load_profile(env_config)
+        if timeout is None:
+            timeout = C.DEFAULT_TIMEOUT
+
+        options = build_chrome_options(profile, headless=headless)
+        apply_replay_proxy(options, env_config)
+        # 名額不足時會阻塞等待，放到 thread 避免卡住 event loop
+        governor = get_governor()
+        lease = await asyncio.to_thread(governor.acquire)
+        options.add_argument(f"--user-data-dir={lease.profile_dir}")
+
+        try:
+            driver = await AsyncWebDriver(http, executor_url).start(options.to_capabilities())
+        except BaseException:
+            await asyncio.to_thread(governor.release, lease)
+            raise
+        browser = cls(driver, AsyncWait(driver, timeout), env_config, lease)
+
+        patterns = blocked_url_patterns(profile)
+        try:
+            if patterns:
+                await driver.execute_cdp_cmd("Network.enable", {})
+                await driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        except BaseException:
+            await browser.quit()
+            raise
+        return browser
+
+    async def reset_state(self) -> None:
+        """同 reset_browser_state：清 storage / cookie，回到空白頁"""
+        await reset_browser_state(self.driver)
+
+    async def quit(self) -> None:
+        try:
+            await self.driver.quit()
+        finally:
+            if self._lease is not None:
+                lease, self._lease = self._lease, None
+                await asyncio.to_thread(get_governor().release, lease)
@@ -1,9 +1,16 @@
 # base/base_action.py 
 from __future__ import annotations
+from typing import Any, Optional
+from toolkit.flow import is_async
 from toolkit.logger import get_logger
 from engine.runtime import get_config
 class BaseAction:
-    def __init__(self):
+    def __init__(self, browser: Optional[Any] = None):
         self.logger = get_logger(__name__)
         self.config = get_config()
+        self.browser = browser
 
+    @property
+    def ASYNC(self) -> bool:
+        """browser 為 AsyncBrowser 時，@flow 方法回傳 coroutine（toolkit/flow.py）"""
+        return is_async(self.browser)
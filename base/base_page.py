@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, List
 import toolkit.web_toolkit as tool
 from toolkit.types import Locator
+from toolkit.table import TableAccessor
 from selenium.webdriver.remote.webelement import WebElement
 
 
@@ -20,8 +21,15 @@ class BasePage:
 
     def __init__(self, browser: "Browser"):
         self.browser = browser
-        self.driver = browser.driver
-        self.wait = browser.wait
+
+    # driver / wait 每次都從 browser 取，Browser.restart() 後 Page Object 不必重建
+    @property
+    def driver(self):
+        return self.browser.driver
+
+    @property
+    def wait(self):
+        return self.browser.wait
 
     # === 基本操作封裝 ===
 
@@ -69,6 +77,12 @@ class BasePage:
         """
         return tool.get_all_item_texts(self.wait, items_locator, text_locator)
 
+    def find_existing(self, locator: Locator) -> List[WebElement]:
+        """
+        不等待，回傳目前 DOM 中符合的元素（可能是空 list，例如購物車徽章尚未出現）。
+        """
+        return self.driver.find_elements(*locator)
+
     def elements_count(self,locator: Locator) -> int:
         """
         取得可見元素數量。
@@ -79,4 +93,10 @@ class BasePage:
         """
         在指定父元素底下尋找子元素。
         """
-        return tool.find_child_element(parent_elem, locator)
\ No newline at end of file
+        return tool.find_child_element(parent_elem, locator)
+
+    def table(self, table_locator: Locator) -> TableAccessor:
+        """
+        取得 table 存取器（表頭只讀一次，之後以欄位索引定位 / 整欄整列讀取）。
+        """
+        return TableAccessor(self.driver, table_locator)
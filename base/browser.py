@@ -1,9 +1,48 @@
 # base/browser.py
-from toolkit.web_toolkit import create_driver
+from __future__ import annotations
+from typing import Optional
+
+from selenium.common.exceptions import WebDriverException
+
+from base.flight_recorder import FlightRecorder
+from toolkit.perf_metrics import PerfCollector
+from toolkit.web_toolkit import create_driver, quit_driver
+from config import EnvConfig, LoadProfile, ACTIVE_CONFIG, FLIGHT_RECORDER
 
 class Browser:
-    def __init__(self):
-        self.driver, self.wait = create_driver()
+    def __init__(self, env_config: Optional[EnvConfig] = None, profile: Optional[LoadProfile] = None):
+        self._env_config = env_config
+        self._profile = profile
+        # 失敗現場記錄（FLIGHT_RECORDER=false 時為 None，chromedriver 也不開 performance log）
+        self.recorder: Optional[FlightRecorder] = FlightRecorder(self) if FLIGHT_RECORDER else None
+        self.driver, self.wait = create_driver(env_config=env_config, profile=profile,
+                                               flight_logs=self.recorder is not None)
+        self.perf = PerfCollector(self)
+
+    @property
+    def env_config(self) -> EnvConfig:
+        """此 Browser 所屬的環境（未指定時為 ACTIVE_CONFIG）"""
+        return self._env_config or ACTIVE_CONFIG
+
+    def is_alive(self) -> bool:
+        """driver session 是否還能回應（chromedriver / Chrome 掛掉時回傳 False）"""
+        try:
+            self.driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def restart(self) -> None:
+        """關掉目前的 driver 並以相同設定重建"""
+        try:
+            quit_driver(self.driver)
+        except WebDriverException:
+            pass
+        self.driver, self.wait = create_driver(env_config=self._env_config, profile=self._profile,
+                                               flight_logs=self.recorder is not None)
+        if self.recorder is not None:
+            self.recorder.clear()
+        self.perf.reset()
 
     def quit(self):
-        self.driver.quit()
+        quit_driver(self.driver)
@@ -0,0 +1,166 @@
+# base/flight_recorder.py
+"""
+失敗現場記錄器（Flight Recorder），掛在 Browser 上。
+
+平常只在記憶體保留「最近」的資料（固定大小的 ring buffer）：
+- DevTools 網路事件（performance log 的 Network.*，只留 URL / 狀態碼 / 錯誤等摘要欄位）
+- console log（browser log）
+- 每個步驟開始時的 DOM 快照（page_source）
+
+只有步驟失敗時才寫到 logs/flight/<TestName>_Step<StepNo>_<時間>/：
+    flight.json      步驟資訊、錯誤、網路事件、console log、各快照的步驟與 URL
+    dom_<n>.html     各步驟開始時的 DOM；dom_fail.html 為失敗當下的 DOM
+
+通過的測試只多了每步驟一次 log 取回與 page_source，不寫任何檔案。
+記錄器本身的任何錯誤都只寫 log，不會影響測試結果。
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+import config as C
+from toolkit.logger import LOG_DIR, get_logger
+from toolkit.types import Step
+
+if TYPE_CHECKING:
+    from base.browser import Browser
+
+logger = get_logger(__name__)
+
+FLIGHT_DIR = os.path.join(LOG_DIR, "flight")
+
+# 只保留會用來判斷失敗原因的網路事件
+_NETWORK_METHODS = {
+    "Network.requestWillBeSent",
+    "Network.responseReceived",
+    "Network.loadingFailed",
+}
+_UNSAFE_NAME_CHARS = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+@dataclass
+class DomSnapshot:
+    label: str
+    url: str
+    captured_at: float
+    html: str
+
+
+def _network_summary(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    method = message.get("method")
+    if method not in _NETWORK_METHODS:
+        return None
+    params = message.get("params", {})
+    event: Dict[str, Any] = {"method": method, "requestId": params.get("requestId")}
+    if method == "Network.requestWillBeSent":
+        request = params.get("request", {})
+        event.update(url=request.get("url"), httpMethod=request.get("method"), type=params.get("type"))
+    elif method == "Network.responseReceived":
+        response = params.get("response", {})
+        event.update(url=response.get("url"), status=response.get("status"), mimeType=response.get("mimeType"))
+    else:
+        event.update(errorText=params.get("errorText"), blocked=params.get("blockedReason"))
+    return event
+
+
+class FlightRecorder:
+
+    def __init__(self, browser: "Browser",
+                 max_events: int = C.FLIGHT_MAX_EVENTS,
+                 max_snapshots: int = C.FLIGHT_DOM_SNAPSHOTS):
+        self.browser = browser
+        self.network: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self.console: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self.snapshots: Deque[DomSnapshot] = deque(maxlen=max_snapshots)
+
+    def clear(self) -> None:
+        self.network.clear()
+        self.console.clear()
+        self.snapshots.clear()
+
+    def mark_step(self, step: Step) -> None:
+        """步驟開始：取回目前累積的 log，並記一份 DOM 快照"""
+        try:
+            self._drain()
+            self.snapshots.append(self._snapshot(f"Step{step.get('StepNo')} {step.get('FlowName')}"))
+        except Exception:
+            logger.debug("flight recorder 記錄失敗", exc_info=True)
+
+    def _drain(self) -> None:
+        driver = self.browser.driver
+        # get_log 會一併清掉 chromedriver 端的緩衝，不會無限累積
+        for entry in driver.get_log("performance"):
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError, TypeError):
+                continue
+            event = _network_summary(message)
+            if event is not None:
+                event["timestamp"] = entry.get("timestamp")
+                self.network.append(event)
+        for entry in driver.get_log("browser"):
+            self.console.append({k: entry.get(k) for k in ("level", "message", "source", "timestamp")})
+
+    def _snapshot(self, label: str) -> DomSnapshot:
+        driver = self.browser.driver
+        return DomSnapshot(label=label, url=driver.current_url, captured_at=time.time(),
+                           html=driver.page_source)
+
+    def dump(self, step: Step, error: BaseException, row_index: Optional[int] = None) -> Optional[str]:
+        """把 ring buffer 與失敗當下的 DOM 寫到 logs/flight，回傳目錄路徑"""
+        try:
+            failure: Optional[DomSnapshot] = None
+            try:
+                self._drain()
+                failure = self._snapshot("failure")
+            except WebDriverException:
+                # browser 已經掛掉時，至少把記憶體內已有的資料寫出來
+                logger.warning("flight recorder 無法取得失敗當下的 DOM / log")
+
+            name = _UNSAFE_NAME_CHARS.sub("_", f"{step.get('TestName')}_Step{step.get('StepNo')}")
+            if row_index is not None:
+                name += f"_Row{row_index + 1}"
+            directory = os.path.join(FLIGHT_DIR, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}")
+            os.makedirs(directory, exist_ok=True)
+
+            snapshots: List[Dict[str, Any]] = []
+            for i, snapshot in enumerate(self.snapshots, start=1):
+                snapshots.append(self._write_dom(directory, f"dom_{i}.html", snapshot))
+            if failure is not None:
+                snapshots.append(self._write_dom(directory, "dom_fail.html", failure))
+
+            report = {
+                "test_name": step.get("TestName"),
+                "step_no": step.get("StepNo"),
+                "flow_name": step.get("FlowName"),
+                "params": step.get("Params"),
+                "row": None if row_index is None else row_index + 1,
+                "env": self.browser.env_config.NAME,
+                "error": f"{type(error).__name__}: {error}",
+                "snapshots": snapshots,
+                "network": list(self.network),
+                "console": list(self.console),
+            }
+            with open(os.path.join(directory, "flight.json"), "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+            logger.error(f"失敗現場已記錄：{directory}")
+            return directory
+        except Exception:
+            logger.warning("flight recorder 寫出失敗", exc_info=True)
+            return None
+
+    @staticmethod
+    def _write_dom(directory: str, filename: str, snapshot: DomSnapshot) -> Dict[str, Any]:
+        with open(os.path.join(directory, filename), "w", encoding="utf-8") as f:
+            f.write(snapshot.html)
+        meta = asdict(snapshot)
+        meta["html"] = filename
+        return meta
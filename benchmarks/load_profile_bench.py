@@ -0,0 +1,67 @@
+# benchmarks/load_profile_bench.py
+"""
+比較各 LoadProfile 在本機替身站台上的頁面載入時間。
+
+用法：
+    python -m benchmarks.load_profile_bench --rounds 20
+    python -m benchmarks.load_profile_bench --profiles full,light --asset-delay-ms 150
+
+每輪都會開登入頁 → 登入 → 等到商品列表出現，量測 driver 端的 wall time。
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from dataclasses import replace
+
+import config as C
+from base.browser import Browser
+from pages.inventory_page import InventoryPage
+from pages.login_page import LoginPage
+from toolkit.governor import install_process_cleanup
+from toolkit.local_site import serve_local_site
+from toolkit.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def bench_profile(profile: C.LoadProfile, env_config: C.EnvConfig, rounds: int) -> list[float]:
+    browser = Browser(env_config=env_config, profile=profile)
+    login_page = LoginPage(browser)
+    inventory_page = InventoryPage(browser)
+
+    durations: list[float] = []
+    try:
+        for _ in range(rounds):
+            browser.driver.delete_all_cookies()
+            start = time.perf_counter()
+            login_page.open(env_config.BASE_URL).login(env_config.USERNAME, env_config.PASSWORD)
+            inventory_page.get_item_count()
+            durations.append((time.perf_counter() - start) * 1000)
+    finally:
+        browser.quit()
+    return durations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="LoadProfile 載入時間比較")
+    parser.add_argument("--profiles", default=",".join(C.LOAD_PROFILES.keys()))
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--asset-delay-ms", type=int, default=80)
+    args = parser.parse_args()
+    install_process_cleanup()
+
+    with serve_local_site(port=0, asset_delay_ms=args.asset_delay_ms) as base_url:
+        env_config = replace(C.LOCAL_CONFIG, BASE_URL=base_url)
+        for name in [x.strip() for x in args.profiles.split(",") if x.strip()]:
+            durations = bench_profile(C.LOAD_PROFILES[name], env_config, args.rounds)
+            logger.info(
+                f"profile={name:<6} rounds={len(durations)} "
+                f"median={statistics.median(durations):.1f}ms "
+                f"min={min(durations):.1f}ms max={max(durations):.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@
 
 import os
 from dataclasses import dataclass
+from typing import Tuple
 
 # === 通用設定（所有環境共用） ===
 DEFAULT_TIMEOUT = 10
@@ -19,6 +20,109 @@ HEADLESS = os.environ.get("HEADLESS", "false").lower() == "true"#本機跑有畫
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 SCREENSHOT_ROOT = os.path.join(ROOT_DIR, "screenshots")
 
+# 暫時性錯誤（timeout / 連線中斷）時，從最近的 checkpoint 重跑的次數
+FLOW_RETRIES = int(os.environ.get("FLOW_RETRIES", "0"))
+
+# 時間預算（秒，0 = 不限制），TestDir TestTimeoutSec / TestPlan TimeoutSec 欄位可個別覆蓋（toolkit/deadline.py）
+TEST_TIMEOUT = float(os.environ.get("TEST_TIMEOUT", "0"))
+STEP_TIMEOUT = float(os.environ.get("STEP_TIMEOUT", "0"))
+# 超過預算後再等幾秒仍未結束，watchdog 關掉 browser
+WATCHDOG_GRACE = float(os.environ.get("WATCHDOG_GRACE", "5"))
+
+# DataTable 記憶體預算（bytes），0 = 不限制；超過時移出最久未用、未修改的 sheet
+DATATABLE_MAX_BYTES = int(os.environ.get("DATATABLE_MAX_BYTES", "0"))
+
+# 共用 chromedriver：所有 Browser 的 session 掛在同一個（或 DRIVER_SERVICES 個）chromedriver process 上
+SHARED_DRIVER_SERVICE = os.environ.get("SHARED_DRIVER_SERVICE", "true").lower() == "true"
+DRIVER_SERVICES = int(os.environ.get("DRIVER_SERVICES", "1"))
+
+# === 失敗現場記錄（base/flight_recorder.py） ===
+# 在記憶體保留最近的網路事件 / console log / 步驟 DOM 快照，步驟失敗時才寫到 logs/flight
+# 預設關閉：開啟後同步 Browser 的 chromedriver 會記錄 DevTools performance log（asyncio / 壓測 session 不受影響）
+FLIGHT_RECORDER = os.environ.get("FLIGHT_RECORDER", "false").lower() == "true"
+FLIGHT_MAX_EVENTS = int(os.environ.get("FLIGHT_MAX_EVENTS", "500"))
+FLIGHT_DOM_SNAPSHOTS = int(os.environ.get("FLIGHT_DOM_SNAPSHOTS", "3"))
+
+# 每個步驟都收集頁面效能指標（未設定時只有 TestPlan 設了預算欄位的步驟會收集）
+PERF_METRICS = os.environ.get("PERF_METRICS", "false").lower() == "true"
+# logs/perf/metrics.jsonl 超過此大小時輪替成 metrics.jsonl.1（只保留一份舊檔）
+PERF_HISTORY_MAX_BYTES = int(os.environ.get("PERF_HISTORY_MAX_BYTES", "10000000"))
+
+# 多個案例開頭的 Shareable 步驟相同時，同一個 browser session 只執行一次（engine/prefix_scheduler.py）
+SHARE_PREFIX = os.environ.get("SHARE_PREFIX", "false").lower() == "true"
+
+# === Python 取樣 profiler（engine/profiler.py） ===
+# 逗號分隔的 TestName / FlowName（* = 全部），只在這些測試 / 步驟執行期間取樣；未設定時完全不啟用
+PROFILE_TARGETS = frozenset(x.strip() for x in os.environ.get("PROFILE_TARGETS", "").split(",") if x.strip())
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+
+# === 瀏覽器資源管控（toolkit/governor.py） ===
+MAX_BROWSERS = int(os.environ.get("MAX_BROWSERS", "0"))                   # 0 = 依 CPU / 記憶體自動計算
+BROWSER_MEMORY_MB = int(os.environ.get("BROWSER_MEMORY_MB", "400"))        # 預估每個 browser 佔用
+MEMORY_RESERVE_MB = int(os.environ.get("MEMORY_RESERVE_MB", "512"))        # 保留給系統 / 其他 process
+MAX_LOAD_PER_CPU = float(os.environ.get("MAX_LOAD_PER_CPU", "2.0"))        # 1 分鐘平均負載 / CPU 上限
+BROWSER_SLOT_TIMEOUT = float(os.environ.get("BROWSER_SLOT_TIMEOUT", "300"))  # 等待名額的上限（秒）
+
+# engine.async_runner 同時驅動的 browser session 上限
+ASYNC_CONCURRENCY = int(os.environ.get("ASYNC_CONCURRENCY", "20"))
+
+# === engine.daemon（常駐模式） ===
+DAEMON_PORT = int(os.environ.get("DAEMON_PORT", "8766"))
+DAEMON_POOL_SIZE = int(os.environ.get("DAEMON_POOL_SIZE", "1"))         # 每個環境預熱的 browser 數
+DAEMON_POLL_INTERVAL = float(os.environ.get("DAEMON_POLL_INTERVAL", "1.0"))  # 檢查檔案變更的間隔（秒）
+
+# === 登入 Session 快取（跳過 UI 登入） ===
+# SESSION_CACHE=false 可整個關閉，所有登入都走 UI
+SESSION_CACHE_ENABLED = os.environ.get("SESSION_CACHE", "true").lower() == "true"
+SESSION_CACHE_TTL = int(os.environ.get("SESSION_CACHE_TTL", "1800"))  # 秒
+SESSION_CACHE_DIR = os.path.join(ROOT_DIR, ".session_cache")
+
+# === 步驟 checkpoint（engine/checkpoint.py） ===
+# 內含 session 快照（cookie），不放在 logs/（CI 失敗時會整個上傳成 artifact），也不進版控
+CHECKPOINT_DIR = os.path.join(ROOT_DIR, ".checkpoints")
+
+
+@dataclass(frozen=True)
+class LoadProfile:
+    """
+    瀏覽器載入設定檔（create_driver 使用）。
+    - PAGE_LOAD_STRATEGY: normal / eager / none
+    - BLOCK_RESOURCE_TYPES: 依資源類型擋掉（image / font / media / stylesheet）
+    - BLOCK_URL_PATTERNS: 依 URL pattern 擋掉（CDP Network.setBlockedURLs，支援 * 萬用字元）
+    - DISABLE_FEATURES: 額外關閉的 Chrome 功能（--disable-features）
+    - DISABLE_BACKGROUND: 關掉擴充功能 / 背景連線 / 元件更新等與斷言無關的背景工作
+    """
+    NAME: str
+    PAGE_LOAD_STRATEGY: str = "normal"
+    BLOCK_RESOURCE_TYPES: Tuple[str, ...] = ()
+    BLOCK_URL_PATTERNS: Tuple[str, ...] = ()
+    DISABLE_FEATURES: Tuple[str, ...] = ()
+    DISABLE_BACKGROUND: bool = False
+
+
+# 完整載入：跟真人使用者看到的一樣
+FULL_PROFILE = LoadProfile(NAME="full")
+
+# 輕量載入：斷言用不到的圖片/字型/媒體/第三方追蹤 script 全部不載
+LIGHT_PROFILE = LoadProfile(
+    NAME="light",
+    PAGE_LOAD_STRATEGY="eager",
+    BLOCK_RESOURCE_TYPES=("image", "font", "media"),
+    BLOCK_URL_PATTERNS=(
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*doubleclick.net*",
+        "*backtrace.io*",
+    ),
+    DISABLE_FEATURES=("Translate", "OptimizationHints", "MediaRouter", "AutofillServerCommunication"),
+    DISABLE_BACKGROUND=True,
+)
+
+LOAD_PROFILES = {
+    "full": FULL_PROFILE,
+    "light": LIGHT_PROFILE,
+}
+
 
 @dataclass(frozen=True)
 class EnvConfig:
@@ -28,7 +132,18 @@ class EnvConfig:
     USERNAME: str
     PASSWORD: str
     TESTPLANPATH: str
-    
+    LOAD_PROFILE: str = "full"  # 對應 LOAD_PROFILES 的 key，可被環境變數 LOAD_PROFILE 覆蓋
+    REPLAY_MODE: str = "off"    # off / record / replay（toolkit/replay_proxy.py），可被環境變數 REPLAY_MODE 覆蓋
+
+
+
+# TestPlan 來源：Excel 檔，或 python -m toolkit.sheet_sources 轉出的 CSV / JSON lines / Parquet 目錄
+TESTPLAN_PATH = os.environ.get("TESTPLAN_PATH") or os.path.join(ROOT_DIR, "DemoData", "TestPlan.xlsx")
+
+
+# 錄製 / 重播的 HTTP 流量（每個環境一個子目錄）
+REPLAY_DIR = os.environ.get("REPLAY_DIR") or os.path.join(ROOT_DIR, "replay")
+REPLAY_MODES = ("off", "record", "replay")
 
 
 # === 各環境個別設定 ===
@@ -37,7 +152,7 @@ DEV_CONFIG = EnvConfig(
     BASE_URL="https://www.saucedemo.com/",  # 這裡先都用同一個，之後你有真的 DEV/UAT 再改
     USERNAME="standard_user",
     PASSWORD="secret_sauce",
-    TESTPLANPATH= os.path.join(ROOT_DIR, "DemoData", "TestPlan.xlsx"),
+    TESTPLANPATH=TESTPLAN_PATH,
 )
 
 SIT_CONFIG = EnvConfig(
@@ -45,7 +160,7 @@ SIT_CONFIG = EnvConfig(
     BASE_URL="https://www.saucedemo.com/",
     USERNAME="standard_user",
     PASSWORD="secret_sauce",
-    TESTPLANPATH= os.path.join(ROOT_DIR, "DemoData", "TestPlan.xlsx"),
+    TESTPLANPATH=TESTPLAN_PATH,
 )
 
 UAT_CONFIG = EnvConfig(
@@ -53,7 +168,7 @@ UAT_CONFIG = EnvConfig(
     BASE_URL="https://www.saucedemo.com/",
     USERNAME="standard_user",
     PASSWORD="secret_sauce",
-    TESTPLANPATH= os.path.join(ROOT_DIR, "DemoData", "TestPlan.xlsx"),
+    TESTPLANPATH=TESTPLAN_PATH,
 )
 
 PROD_CONFIG = EnvConfig(
@@ -61,7 +176,19 @@ PROD_CONFIG = EnvConfig(
     BASE_URL="https://www.saucedemo.com/",
     USERNAME="standard_user",
     PASSWORD="secret_sauce",
-    TESTPLANPATH= os.path.join(ROOT_DIR, "DemoData", "TestPlan.xlsx"),
+    TESTPLANPATH=TESTPLAN_PATH,
+)
+
+
+# 本機替身站台（toolkit/local_site.py），用於 benchmark / 可重現的量測
+LOCAL_SITE_PORT = int(os.environ.get("LOCAL_SITE_PORT", "8765"))
+LOCAL_CONFIG = EnvConfig(
+    NAME="LOCAL",
+    BASE_URL=f"http://127.0.0.1:{LOCAL_SITE_PORT}/",
+    USERNAME="standard_user",
+    PASSWORD="secret_sauce",
+    TESTPLANPATH=TESTPLAN_PATH,
+    LOAD_PROFILE="light",
 )
 
 
@@ -71,6 +198,7 @@ ENVIRONMENTS = {
     "SIT": SIT_CONFIG,
     "UAT": UAT_CONFIG,
     "PROD": PROD_CONFIG,
+    "LOCAL": LOCAL_CONFIG,
 }
 
 
@@ -87,6 +215,44 @@ if ACTIVE_ENV_NAME not in ENVIRONMENTS:
 ACTIVE_CONFIG: EnvConfig = ENVIRONMENTS[ACTIVE_ENV_NAME]
 
 
+def get_env_config(name: str) -> EnvConfig:
+    """依名稱取得環境設定（不分大小寫）"""
+    key = name.strip().upper()
+    if key not in ENVIRONMENTS:
+        raise ValueError(f"Unknown TEST_ENV: {key!r}, "
+                         f"expected one of {list(ENVIRONMENTS.keys())}")
+    return ENVIRONMENTS[key]
+
+
+def screenshot_dir(env_name: str) -> str:
+    """每個環境各自的 screenshot 目錄（不存在就建立）"""
+    path = os.path.join(SCREENSHOT_ROOT, env_name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_load_profile(env_config: EnvConfig) -> LoadProfile:
+    """
+    取得環境對應的 LoadProfile。
+    優先順序：環境變數 LOAD_PROFILE > EnvConfig.LOAD_PROFILE
+    """
+    name = os.environ.get("LOAD_PROFILE", env_config.LOAD_PROFILE).lower()
+    if name not in LOAD_PROFILES:
+        raise ValueError(f"Unknown LOAD_PROFILE: {name!r}, "
+                         f"expected one of {list(LOAD_PROFILES.keys())}")
+    return LOAD_PROFILES[name]
+
+
+def get_replay_mode(env_config: EnvConfig) -> str:
+    """
+    取得環境的錄製 / 重播模式。
+    優先順序：環境變數 REPLAY_MODE > EnvConfig.REPLAY_MODE
+    """
+    mode = os.environ.get("REPLAY_MODE", env_config.REPLAY_MODE).lower()
+    if mode not in REPLAY_MODES:
+        raise ValueError(f"Unknown REPLAY_MODE: {mode!r}, expected one of {list(REPLAY_MODES)}")
+    return mode
+
+
 # === 依環境建立對應的 screenshot 目錄 ===
-SCREENSHOT_DIR = os.path.join(SCREENSHOT_ROOT, ACTIVE_CONFIG.NAME)
-os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+SCREENSHOT_DIR = screenshot_dir(ACTIVE_CONFIG.NAME)
@@ -0,0 +1,200 @@
+# engine/async_runner.py
+"""
+asyncio 版 flow runner：一個 process、一個 event loop 同時驅動多個 WebDriver session。
+
+流程幾乎都在等 chromedriver 回應（I/O bound），用 coroutine 取代多 process：
+- 只啟動一個 chromedriver，所有 session 共用一個 keep-alive HTTP 連線池
+- TestPlan 只解析一次，每個 task 拿一份 DataTable.clone()
+- 每個 task 由 asyncio.create_task 建立，會複製一份 contextvars，
+  因此 set_ctx() 只影響自己的 task，get_config() / get_datatable() 不會互相干擾
+- Action / Page Object 與同步版是同一份 @flow 流程（toolkit/flow.py），
+  掛在 AsyncBrowser 上時是 coroutine 就直接 await；其他同步方法則丟到 thread 執行，不阻塞 event loop
+- 資料驅動案例（TestDir DataSheet）在同一個 session 內逐列執行，列與列之間重設瀏覽器狀態
+
+用法：
+    python -m engine.async_runner --tests 正常購物流程 --repeat 20 --concurrency 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import inspect
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import config as C
+from base.async_browser import AsyncBrowser
+from engine.flow_runner import check_iterations, check_step_budgets, iteration_rows, should_measure
+from engine.multi_env import preload_plans
+from engine.results import IterationResult, StepResult, PASS, FAIL
+from engine.run_context import RunContext
+from engine.runtime import set_ctx
+from engine.step_translator import StepTranslator
+from engine.testplan_loader import load_test_plan, load_data_sheet, load_test_timeout, bind_params
+from toolkit.async_webdriver import create_http_pool
+from toolkit.deadline import check_deadline, deadline_scope
+from toolkit.driver_service import get_driver_services
+from toolkit.funlib import normalize
+from toolkit.governor import install_process_cleanup
+from toolkit.logger import get_logger
+from toolkit.types import DataRow, Step, StepList
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class FlowOutcome:
+    test_name: str
+    status: str = PASS
+    duration_ms: float = 0.0
+    error: Optional[str] = None
+    # 一般案例為各步驟結果；資料驅動案例為各資料列的 IterationResult
+    steps: List[StepResult] | List[IterationResult] = field(default_factory=list)
+
+
+async def execute_step_async(step: Step, translator: StepTranslator,
+                             data_row: Optional[DataRow] = None,
+                             row_index: Optional[int] = None) -> StepResult:
+    flow_name = normalize(step.get("FlowName"))
+    if not flow_name:
+        raise ValueError("TestPlan異常,FlowName不可為空")
+    params = step.get("Params") or {}
+    if data_row is not None:
+        params = bind_params(params, data_row)
+    logger.info(f"TestName: {step.get('TestName')}; StepNo: {step.get('StepNo')}; FlowName: {flow_name};")
+
+    func = translator.get_action(flow_name)
+    result = StepResult(test_name=step.get("TestName"), step_no=step.get("StepNo"),
+                        flow_name=flow_name, row_index=row_index)
+    measure = should_measure(step, translator.browser)
+    if measure:
+        await translator.browser.perf.prepare()
+    start = time.perf_counter()
+    try:
+        # 步驟時間預算：AsyncWait 的等待不超過剩餘預算（async 模式沒有 watchdog）
+        with deadline_scope(f"{step.get('TestName')} Step{step.get('StepNo')}",
+                            step.get("TimeoutSec") or C.STEP_TIMEOUT):
+            if inspect.iscoroutinefunction(func):
+                await func(**params)
+            else:
+                # 同步 Action：丟到 thread 執行（to_thread 會帶著目前 task 的 contextvars）
+                await asyncio.to_thread(func, **params)
+        result.duration_ms = (time.perf_counter() - start) * 1000
+        if measure:
+            result.metrics = await translator.browser.perf.collect()
+            check_step_budgets(step, result)
+    except Exception:
+        logger.exception("Step execution failed")
+        raise
+    return result
+
+
+async def run_iterations_async(test_name: str, steps: StepList, translator: StepTranslator,
+                               browser: AsyncBrowser, data_alias: str) -> List[IterationResult]:
+    """run_iterations 的 coroutine 版本：同一個 session 逐列執行，某一列失敗不影響後續列"""
+    results: List[IterationResult] = []
+    for row_index, row_count, data_row in iteration_rows(data_alias):
+        check_deadline()
+        if results:
+            await browser.reset_state()
+
+        logger.info(f"===== Iteration {row_index + 1}/{row_count}: {test_name} =====")
+        result = IterationResult(test_name=test_name, row_index=row_index)
+        start = time.perf_counter()
+        for step in steps:
+            try:
+                result.steps.append(await execute_step_async(step, translator, data_row, row_index))
+            except Exception as e:
+                result.status = FAIL
+                result.error = f"{type(e).__name__}: {e}"
+                break
+        result.duration_ms = (time.perf_counter() - start) * 1000
+        results.append(result)
+    return results
+
+
+async def run_test_flow_async(test_name: str, browser: AsyncBrowser,
+                              ctx: RunContext) -> List[StepResult] | List[IterationResult]:
+    """run_test_flow 的 coroutine 版本"""
+    set_ctx(ctx)
+
+    steps = load_test_plan(test_name)
+    translator = StepTranslator(browser)
+    with deadline_scope(test_name, load_test_timeout(test_name)):
+        data_alias = load_data_sheet(test_name)
+        if not data_alias:
+            return [await execute_step_async(step, translator) for step in steps]
+        results = await run_iterations_async(test_name, steps, translator, browser, data_alias)
+    check_iterations(test_name, results)
+    return results
+
+
+async def run_flows_async(test_names: List[str],
+                          env_config: Optional[C.EnvConfig] = None,
+                          concurrency: int = C.ASYNC_CONCURRENCY,
+                          executor_url: Optional[str] = None) -> List[FlowOutcome]:
+    """
+    並行執行多個流程（同一 TestName 可重複出現），最多同時 concurrency 個 browser session。
+    executor_url：WebDriver 端點，不指定時使用共用的 chromedriver。
+    """
+    if env_config is None:
+        env_config = C.ACTIVE_CONFIG
+
+    unique_names = list(dict.fromkeys(test_names))
+    plans = await asyncio.to_thread(preload_plans, [env_config], unique_names)
+    plan = plans[env_config.TESTPLANPATH]
+
+    # 與同步 Browser 共用同一組 chromedriver process（程式結束時才關閉）
+    service_url = executor_url or await asyncio.to_thread(get_driver_services().pick().ensure_running)
+    http = create_http_pool(limit=concurrency * 2)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(test_name: str) -> FlowOutcome:
+        async with semaphore:
+            outcome = FlowOutcome(test_name=test_name)
+            start = time.perf_counter()
+            browser: Optional[AsyncBrowser] = None
+            try:
+                browser = await AsyncBrowser.create(http, service_url, env_config)
+                outcome.steps = await run_test_flow_async(
+                    test_name, browser, RunContext(dt=plan.clone(), config=env_config))
+            except Exception as e:
+                outcome.status = FAIL
+                outcome.error = f"{type(e).__name__}: {e}"
+            finally:
+                if browser is not None:
+                    await browser.quit()
+            outcome.duration_ms = (time.perf_counter() - start) * 1000
+            return outcome
+
+    try:
+        return await asyncio.gather(*(asyncio.create_task(run_one(name)) for name in test_names))
+    finally:
+        await http.close()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="asyncio 並行執行流程")
+    parser.add_argument("--tests", default="正常購物流程", help="逗號分隔的 TestName")
+    parser.add_argument("--repeat", type=int, default=1, help="每個 TestName 執行幾次")
+    parser.add_argument("--concurrency", type=int, default=C.ASYNC_CONCURRENCY)
+    parser.add_argument("--env", default=C.ACTIVE_ENV_NAME)
+    args = parser.parse_args(argv)
+    install_process_cleanup()
+
+    names = [x.strip() for x in args.tests.split(",") if x.strip()] * args.repeat
+    start = time.perf_counter()
+    outcomes = asyncio.run(run_flows_async(names, C.get_env_config(args.env), args.concurrency))
+    elapsed = time.perf_counter() - start
+
+    failed = [o for o in outcomes if o.status != PASS]
+    for o in failed:
+        logger.error(f"FAIL {o.test_name}: {o.error}")
+    logger.info(f"完成 {len(outcomes)} 個流程，失敗 {len(failed)}，總耗時 {elapsed:.1f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# engine/checkpoint.py
+"""
+步驟層級的 checkpoint，讓長流程失敗時不必從 StepNo 1 重跑。
+
+TestPlan 的 Checkpoint 欄位（選填）：
+- Y       : 此步驟可直接重新開始（例如登入步驟，本身會建立所需狀態）
+- SESSION : 此步驟需要前面步驟累積的登入/頁面狀態，執行前會擷取 session 快照
+
+執行時每到 checkpoint 步驟就寫入 .checkpoints/<環境>_<TestName>.json（C.CHECKPOINT_DIR），
+測試全部通過後刪除；失敗時保留，供 retry 或 `python -m engine.resume` 使用。
+快照含登入 cookie，所以不放在 logs/（CI 會把 logs/ 上傳成 artifact）。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+import config as C
+from toolkit.logger import get_logger
+from toolkit.session_cache import SessionSnapshot, capture_session, inject_session
+from toolkit.types import Step
+from toolkit.web_toolkit import reset_browser_state
+
+logger = get_logger(__name__)
+
+CHECKPOINT_DIR = C.CHECKPOINT_DIR
+
+CHECKPOINT_RESTART = "Y"
+CHECKPOINT_SESSION = "SESSION"
+
+
+def is_checkpoint(step: Step) -> bool:
+    return step.get("Checkpoint") in (CHECKPOINT_RESTART, CHECKPOINT_SESSION)
+
+
+@dataclass
+class Checkpoint:
+    step_no: int
+    session: Optional[SessionSnapshot] = None
+    created_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    失敗後從最近的 checkpoint 重跑的策略。
+    - 只對暫時性錯誤（WebDriverException 家族：timeout / stale / 連線中斷）重試
+    - AssertionError 等業務驗證失敗不重試
+    """
+    max_retries: int = C.FLOW_RETRIES
+    retry_on: tuple = (WebDriverException,)
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        return attempt < self.max_retries and isinstance(error, self.retry_on)
+
+
+class CheckpointStore:
+    """
+    單一 (環境, TestName) 的 checkpoint 紀錄，存成 JSON 檔。
+    """
+
+    def __init__(self, test_name: str, env_name: str, directory: str = CHECKPOINT_DIR):
+        self.test_name = test_name
+        self.env_name = env_name
+        self.checkpoints: List[Checkpoint] = []
+        self.failed_step: Optional[int] = None
+        self.error: Optional[str] = None
+        os.makedirs(directory, exist_ok=True)
+        key = hashlib.sha1(f"{env_name}|{test_name}".encode("utf-8")).hexdigest()[:12]
+        self.path = os.path.join(directory, f"{env_name}_{key}.json")
+
+    def record(self, step: Step, driver) -> Checkpoint:
+        """在 checkpoint 步驟執行前呼叫"""
+        session = capture_session(driver) if step.get("Checkpoint") == CHECKPOINT_SESSION else None
+        checkpoint = Checkpoint(step_no=step["StepNo"], session=session)
+        # 重跑時同一個 StepNo 以最新的為準
+        self.checkpoints = [c for c in self.checkpoints if c.step_no < checkpoint.step_no]
+        self.checkpoints.append(checkpoint)
+        self._save()
+        return checkpoint
+
+    def mark_failed(self, step_no: int, error: BaseException) -> None:
+        self.failed_step = step_no
+        self.error = f"{type(error).__name__}: {error}"
+        self._save()
+
+    def latest(self, before_step: Optional[int] = None) -> Optional[Checkpoint]:
+        """取得 StepNo <= before_step 的最後一個 checkpoint（不指定則取最後一個）"""
+        candidates = [c for c in self.checkpoints if before_step is None or c.step_no <= before_step]
+        return candidates[-1] if candidates else None
+
+    def clear(self) -> None:
+        self.checkpoints = []
+        self.failed_step = None
+        self.error = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def load(self) -> bool:
+        """從檔案讀回上次的紀錄，檔案不存在回傳 False"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data: Dict[str, Any] = json.load(f)
+        except FileNotFoundError:
+            return False
+
+        self.failed_step = data.get("failed_step")
+        self.error = data.get("error")
+        self.checkpoints = [
+            Checkpoint(
+                step_no=c["step_no"],
+                session=SessionSnapshot(**c["session"]) if c.get("session") else None,
+                created_at=c["created_at"],
+            )
+            for c in data.get("checkpoints", [])
+        ]
+        return True
+
+    def _save(self) -> None:
+        data = {
+            "test_name": self.test_name,
+            "env": self.env_name,
+            "failed_step": self.failed_step,
+            "error": self.error,
+            "checkpoints": [asdict(c) for c in self.checkpoints],
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def restore_checkpoint(browser, checkpoint: Optional[Checkpoint], base_url: str) -> None:
+    """
+    把 browser 還原到 checkpoint 當下的狀態：
+    - driver 已經掛掉就重建
+    - 有 session 快照就注入並回到當時的頁面，否則清成乾淨狀態
+    """
+    if not browser.is_alive():
+        logger.warning("Browser 已無回應，重建 driver")
+        browser.restart()
+
+    if checkpoint is not None and checkpoint.session is not None:
+        inject_session(browser.driver, checkpoint.session, base_url)
+        browser.driver.get(checkpoint.session.url)
+    else:
+        reset_browser_state(browser.driver)
@@ -0,0 +1,453 @@
+# engine/daemon.py
+"""
+常駐模式（warm daemon / watch mode）：TestPlan 與 browser 常駐在記憶體，改完 Excel 直接重跑。
+
+- 每個環境預先開好 DAEMON_POOL_SIZE 個 browser，跑完只重設狀態（cookie / storage / 頁面）再放回池子，
+  session 掛掉時自動重建
+- TestPlan.xlsx 整本快取在記憶體（PlanCache），每次執行拿一份新的 DataTable，sheet 從快取複製，不再讀檔
+- 監看 TestPlan.xlsx 與 actions / pages 模組：
+  - Excel 存檔後只替換內容有變的 sheet
+  - .py 存檔後只 reload 變更的模組，以及引用到它們的模組（例如 engine.step_translator）
+  - 套用變更時等進行中的流程跑完（RunLock），不會在流程執行到一半時替換模組 / sheet
+- 以本機 TCP（一行一個 JSON 指令）接收指令，用 engine.daemon_client 送出
+
+用法：
+    python -m engine.daemon --envs DEV                     # 啟動 daemon（前景，Ctrl+C 結束）
+    python -m engine.daemon_client run 正常購物流程         # 另一個終端機送出執行指令
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import queue
+import socketserver
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import config as C
+from base.browser import Browser
+from engine.flow_runner import run_test_flow
+from engine.multi_env import TestOutcome, parse_env_names
+from engine.results import FAIL
+from engine.run_context import RunContext
+from engine.runtime import new_datatable
+from toolkit.sheet_sources import read_sheet as read_source_sheet, read_workbook, source_mtime
+from toolkit.governor import install_process_cleanup
+from toolkit.logger import get_logger
+from toolkit.web_toolkit import reset_browser_state, take_screenshot
+
+logger = get_logger(__name__)
+
+# 監看的套件（依相依順序：pages 先於 actions）
+WATCHED_PACKAGES = ("pages", "actions")
+# 不在監看目錄內、但會引用 actions 類別的模組；上游模組 reload 後要跟著 reload
+DEPENDENT_MODULES = ("engine.step_translator",)
+
+Rows = List[Dict[str, Any]]
+
+
+def _digest(rows: Rows) -> str:
+    return hashlib.sha1(repr(rows).encode("utf-8")).hexdigest()
+
+
+class PlanCache:
+    """
+    TestPlan 整本快取：{來源路徑: {sheet 名稱: 列資料}}。
+    read_sheet 可直接當作 DataTable 的 reader 使用，回傳的是複本，add_parameter 不會污染快取。
+    """
+
+    def __init__(self):
+        self._books: Dict[str, Dict[str, Rows]] = {}
+        self._digests: Dict[str, Dict[str, str]] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def watch(self, file_path: str) -> None:
+        """載入並開始監看一份 TestPlan（Excel 或 sheet 檔案目錄）"""
+        path = os.path.abspath(file_path)
+        with self._lock:
+            if path not in self._books:
+                self._load(path)
+
+    def read_sheet(self, file_path: str, sheet_name: str) -> Rows:
+        path = os.path.abspath(file_path)
+        with self._lock:
+            book = self._books.get(path)
+            if book is None:
+                # 沒有監看的檔案照常讀檔
+                return read_source_sheet(file_path, sheet_name)
+            rows = book.get(sheet_name)
+            if rows is None:
+                raise ValueError(f"TestPlan 不存在 sheet：'{sheet_name}' (source='{file_path}')")
+            return [dict(row) for row in rows]
+
+    def has_changes(self) -> bool:
+        """只比對修改時間，不讀檔"""
+        with self._lock:
+            for path, mtime in self._mtimes.items():
+                try:
+                    if source_mtime(path) != mtime:
+                        return True
+                except OSError:
+                    continue
+        return False
+
+    def refresh(self) -> List[str]:
+        """檢查各檔案的修改時間，有變更就重讀，回傳內容有變的 sheet（'檔名:sheet'）"""
+        changed: List[str] = []
+        with self._lock:
+            for path in list(self._books):
+                try:
+                    mtime = source_mtime(path)
+                except OSError:
+                    continue
+                if mtime != self._mtimes[path]:
+                    changed += self._load(path)
+        return changed
+
+    def _load(self, path: str) -> List[str]:
+        mtime = source_mtime(path)
+        try:
+            book = read_workbook(path)
+        except Exception as e:
+            # Excel 存檔到一半 / 檔案被鎖住：保留舊內容，下次輪詢再試
+            logger.warning(f"讀取 {path} 失敗，沿用快取內容：{type(e).__name__}: {e}")
+            return []
+
+        old_digests = self._digests.get(path, {})
+        digests = {name: _digest(rows) for name, rows in book.items()}
+        changed = [f"{os.path.basename(path)}:{name}" for name, d in digests.items()
+                   if old_digests.get(name) != d]
+        changed += [f"{os.path.basename(path)}:{name}" for name in old_digests if name not in digests]
+
+        old_book = self._books.get(path, {})
+        # 內容沒變的 sheet 沿用原本的物件
+        self._books[path] = {name: rows if old_digests.get(name) != digests[name] else old_book[name]
+                             for name, rows in book.items()}
+        self._digests[path] = digests
+        self._mtimes[path] = mtime
+        return changed
+
+
+def _module_file(module: ModuleType) -> Optional[str]:
+    path = getattr(module, "__file__", None)
+    return os.path.abspath(path) if path else None
+
+
+def _references(module: ModuleType, names: set[str]) -> bool:
+    """module 的全域名稱中，是否有來自 names 內模組的類別 / 函式 / 模組"""
+    for value in vars(module).values():
+        if isinstance(value, ModuleType):
+            if value.__name__ in names:
+                return True
+        elif getattr(value, "__module__", None) in names:
+            return True
+    return False
+
+
+class ModuleWatcher:
+    """
+    監看 actions / pages 的 .py 檔，變更時 importlib.reload。
+    reload 會在原本的 module 物件上重新執行，因此 `from x import Y` 的引用端也要 reload 才會拿到新的 Y。
+    """
+
+    def __init__(self, packages: Tuple[str, ...] = WATCHED_PACKAGES,
+                 dependents: Tuple[str, ...] = DEPENDENT_MODULES):
+        self.packages = packages
+        self.dependents = dependents
+        self._mtimes: Dict[str, float] = self._scan()
+
+    def _scan(self) -> Dict[str, float]:
+        mtimes: Dict[str, float] = {}
+        for package in self.packages:
+            directory = os.path.join(C.ROOT_DIR, package)
+            for name in os.listdir(directory):
+                if name.endswith(".py"):
+                    path = os.path.join(directory, name)
+                    mtimes[path] = os.path.getmtime(path)
+        return mtimes
+
+    def _candidates(self) -> List[ModuleType]:
+        """已載入的監看模組（依 WATCHED_PACKAGES 順序），最後是 DEPENDENT_MODULES"""
+        modules = [m for m in list(sys.modules.values())
+                   if isinstance(m, ModuleType) and m.__name__.split(".")[0] in self.packages]
+        modules.sort(key=lambda m: (self.packages.index(m.__name__.split(".")[0]), m.__name__))
+        return modules + [sys.modules[name] for name in self.dependents if name in sys.modules]
+
+    def has_changes(self) -> bool:
+        return self._scan() != self._mtimes
+
+    def refresh(self) -> List[str]:
+        """reload 有變更的模組與其引用端，回傳實際 reload 的模組名稱"""
+        mtimes = self._scan()
+        changed_files = {path for path, mtime in mtimes.items() if self._mtimes.get(path) != mtime}
+        self._mtimes = mtimes
+        if not changed_files:
+            return []
+
+        reloaded: List[str] = []
+        names: set[str] = set()
+        for module in self._candidates():
+            if _module_file(module) in changed_files or _references(module, names):
+                try:
+                    importlib.reload(module)
+                except Exception:
+                    # 語法錯誤等：保留舊版本，等下一次存檔
+                    logger.exception(f"reload 失敗，沿用舊版本：{module.__name__}")
+                    continue
+                names.add(module.__name__)
+                reloaded.append(module.__name__)
+        return reloaded
+
+
+class RunLock:
+    """
+    執行 / 套用變更的讀寫鎖：流程執行時持有 shared（可多個並行），
+    reload 模組或替換 TestPlan 時持有 exclusive，等進行中的流程全部結束才開始。
+    有 exclusive 在排隊時新的流程先等，避免流程不斷進來時變更永遠套用不到。
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._running = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        with self._cond:
+            while self._writing or self._writers_waiting:
+                self._cond.wait()
+            self._running += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                while self._writing or self._running:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+
+class BrowserPool:
+    """單一環境的預熱 browser 池"""
+
+    def __init__(self, env_config: C.EnvConfig, size: int):
+        self.env_config = env_config
+        self._idle: "queue.Queue[Browser]" = queue.Queue()
+        self._all: List[Browser] = []
+        for _ in range(max(size, 1)):
+            browser = Browser(env_config=env_config)
+            self._all.append(browser)
+            self._idle.put(browser)
+
+    @contextmanager
+    def acquire(self) -> Iterator[Browser]:
+        browser = self._idle.get()
+        try:
+            if not browser.is_alive():
+                logger.warning(f"[{self.env_config.NAME}] browser session 已失效，重新建立")
+                browser.restart()
+            yield browser
+        finally:
+            try:
+                reset_browser_state(browser.driver)
+            except Exception:
+                logger.warning(f"[{self.env_config.NAME}] 重設 browser 狀態失敗，重新建立")
+                try:
+                    browser.restart()
+                except Exception:
+                    logger.exception(f"[{self.env_config.NAME}] 重新建立 browser 失敗")
+            self._idle.put(browser)
+
+    @property
+    def size(self) -> int:
+        return len(self._all)
+
+    def close(self) -> None:
+        for browser in self._all:
+            try:
+                browser.quit()
+            except Exception:
+                pass
+
+
+class EngineDaemon:
+
+    def __init__(self, env_names: List[str], pool_size: int = C.DAEMON_POOL_SIZE):
+        self.env_configs: Dict[str, C.EnvConfig] = {name: C.get_env_config(name) for name in env_names}
+        self.default_env = env_names[0]
+
+        self.plans = PlanCache()
+        for env_config in self.env_configs.values():
+            self.plans.watch(env_config.TESTPLANPATH)
+        self.modules = ModuleWatcher()
+
+        self.pools: Dict[str, BrowserPool] = {
+            name: BrowserPool(env_config, pool_size) for name, env_config in self.env_configs.items()
+        }
+        self._run_lock = RunLock()
+        self._stop = threading.Event()
+        self.runs = 0
+
+    def check_changes(self) -> Dict[str, List[str]]:
+        # 沒有變更時不必等進行中的流程
+        if not (self.plans.has_changes() or self.modules.has_changes()):
+            return {"sheets": [], "modules": []}
+        with self._run_lock.exclusive():
+            changes = {"sheets": self.plans.refresh(), "modules": self.modules.refresh()}
+        if changes["sheets"]:
+            logger.info(f"TestPlan 已更新：{', '.join(changes['sheets'])}")
+        if changes["modules"]:
+            logger.info(f"模組已重新載入：{', '.join(changes['modules'])}")
+        return changes
+
+    def run(self, test_name: str, env_name: Optional[str] = None) -> Dict[str, Any]:
+        received = time.perf_counter()
+        env_name = (env_name or self.default_env).upper()
+        if env_name not in self.pools:
+            raise ValueError(f"daemon 沒有啟動環境 {env_name}，可用：{list(self.pools)}")
+        env_config = self.env_configs[env_name]
+
+        # 執行前再檢查一次，確保剛存檔的內容一定會生效
+        self.check_changes()
+
+        outcome = TestOutcome(test_name=test_name)
+        with self._run_lock.shared(), self.pools[env_name].acquire() as browser:
+            start = time.perf_counter()
+            try:
+                run_test_flow(test_name, browser,
+                              ctx=RunContext(dt=new_datatable(reader=self.plans.read_sheet), config=env_config))
+            except Exception as e:
+                outcome.status = FAIL
+                outcome.error = f"{type(e).__name__}: {e}"
+                logger.exception(f"[{env_name}] {test_name} 失敗")
+                try:
+                    outcome.screenshot = take_screenshot(browser.driver, name_prefix=f"FAIL_{test_name}",
+                                                         env_name=env_name)
+                except Exception:
+                    logger.warning(f"[{env_name}] 截圖失敗")
+            outcome.duration_ms = (time.perf_counter() - start) * 1000
+
+        self.runs += 1
+        result = asdict(outcome)
+        result["env"] = env_name
+        # 從收到指令到開始執行流程的時間（檢查變更 + 取得 browser）
+        result["overhead_ms"] = round((start - received) * 1000, 1)
+        return result
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "envs": list(self.pools),
+            "pool_size": {name: pool.size for name, pool in self.pools.items()},
+            "runs": self.runs,
+        }
+
+    def watch_forever(self, interval: float = C.DAEMON_POLL_INTERVAL) -> None:
+        """背景輪詢檔案變更，讓存檔後的 log 立即反映（執行前也會再檢查一次）"""
+        while not self._stop.wait(interval):
+            try:
+                self.check_changes()
+            except Exception:
+                logger.exception("檢查檔案變更失敗")
+
+    def close(self) -> None:
+        self._stop.set()
+        for pool in self.pools.values():
+            pool.close()
+
+
+class _CommandHandler(socketserver.StreamRequestHandler):
+    """
+    一行一個 JSON 指令，回傳一行 JSON：
+        {"cmd": "run", "tests": ["正常購物流程"], "env": "DEV"}
+        {"cmd": "status"} / {"cmd": "reload"} / {"cmd": "stop"}
+    """
+
+    def handle(self) -> None:
+        engine: EngineDaemon = self.server.engine  # type: ignore[attr-defined]
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                command = json.loads(line)
+                response = self._dispatch(engine, command)
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+    def _dispatch(self, engine: EngineDaemon, command: Dict[str, Any]) -> Dict[str, Any]:
+        cmd = command.get("cmd")
+        if cmd == "run":
+            results = [engine.run(test_name, command.get("env")) for test_name in command.get("tests", [])]
+            return {"ok": all(r["status"] != FAIL for r in results), "results": results}
+        if cmd == "status":
+            return {"ok": True, **engine.status()}
+        if cmd == "reload":
+            return {"ok": True, **engine.check_changes()}
+        if cmd == "stop":
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return {"ok": True}
+        raise ValueError(f"未知的指令：{cmd!r}")
+
+
+class DaemonServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, engine: EngineDaemon, port: int = C.DAEMON_PORT):
+        # 只聽本機，不對外開放
+        super().__init__(("127.0.0.1", port), _CommandHandler)
+        self.engine = engine
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="常駐執行引擎（預熱 browser / 快取 TestPlan）")
+    parser.add_argument("--envs", default=None, help="例如 DEV,SIT（預設讀 TEST_ENVS / TEST_ENV）")
+    parser.add_argument("--pool-size", type=int, default=C.DAEMON_POOL_SIZE)
+    parser.add_argument("--port", type=int, default=C.DAEMON_PORT)
+    args = parser.parse_args(argv)
+    install_process_cleanup()
+
+    daemon = EngineDaemon(parse_env_names(args.envs), pool_size=args.pool_size)
+    server = DaemonServer(daemon, args.port)
+    watcher = threading.Thread(target=daemon.watch_forever, name="daemon-watch", daemon=True)
+    watcher.start()
+    logger.info(f"daemon 已啟動：127.0.0.1:{args.port}（環境 {', '.join(daemon.pools)}）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.close()
+        logger.info("daemon 已結束")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+# engine/daemon_client.py
+"""
+engine.daemon 的指令端。只用標準函式庫，啟動成本很低（不載入 selenium / openpyxl）。
+
+用法：
+    python -m engine.daemon_client run 正常購物流程 資料驅動購物流程 [--env SIT]
+    python -m engine.daemon_client status
+    python -m engine.daemon_client reload     # 立即檢查檔案變更
+    python -m engine.daemon_client stop
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import sys
+from typing import Any, Dict, Optional
+
+from config import DAEMON_PORT
+
+
+def send_command(command: Dict[str, Any], port: int = DAEMON_PORT,
+                 timeout: Optional[float] = None) -> Dict[str, Any]:
+    """送出一個指令並等待回應（run 會等到所有測試跑完）"""
+    with socket.create_connection(("127.0.0.1", port), timeout=timeout) as sock:
+        sock.sendall((json.dumps(command, ensure_ascii=False) + "\n").encode("utf-8"))
+        with sock.makefile("r", encoding="utf-8") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError("daemon 沒有回應")
+    return json.loads(line)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="送指令給 engine.daemon")
+    parser.add_argument("cmd", choices=["run", "status", "reload", "stop"])
+    parser.add_argument("tests", nargs="*", help="TestName（cmd=run）")
+    parser.add_argument("--env", default=None)
+    parser.add_argument("--port", type=int, default=DAEMON_PORT)
+    args = parser.parse_args(argv)
+
+    command: Dict[str, Any] = {"cmd": args.cmd}
+    if args.cmd == "run":
+        if not args.tests:
+            parser.error("run 需要至少一個 TestName")
+        command.update(tests=args.tests, env=args.env)
+
+    try:
+        response = send_command(command, args.port)
+    except OSError as e:
+        print(f"無法連線到 daemon（port {args.port}）：{e}", file=sys.stderr)
+        return 2
+
+    if args.cmd == "run" and "results" in response:
+        for r in response["results"]:
+            print(f"{r['status']}  [{r['env']}] {r['test_name']} "
+                  f"({r['duration_ms']:.0f} ms, overhead {r['overhead_ms']:.0f} ms)"
+                  + (f" - {r['error']}" if r["error"] else ""))
+    else:
+        print(json.dumps(response, ensure_ascii=False, indent=2))
+    return 0 if response.get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
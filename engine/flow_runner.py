@@ -1,43 +1,289 @@
 # engine/flow_runner.py
+import time
+from contextlib import AbstractContextManager
+from typing import Iterator, List, Optional, Tuple
+
 from base.browser import Browser
-from engine.runtime import set_ctx
+from engine.runtime import set_ctx, get_datatable, get_config, new_datatable
 from engine.run_context import RunContext
-from engine.testplan_loader import load_test_plan
+from engine.testplan_loader import load_test_plan, load_data_sheet, load_test_timeout, bind_params
 from engine.step_translator import StepTranslator
+from engine.results import StepResult, IterationResult, PASS, FAIL
+from engine.listeners import notify_step, notify_test_end
+from engine.checkpoint import CheckpointStore, RetryPolicy, is_checkpoint, restore_checkpoint
+from engine.profiler import profile_step, profile_test
+from toolkit.deadline import Deadline, check_deadline, deadline_scope
+from toolkit.perf_metrics import PerfBudgetExceeded, check_budgets
 from toolkit.logger import get_logger
 from toolkit.funlib import normalize
-from toolkit.types import Step
-from toolkit.datatable import DataTable
+from toolkit.types import Step, StepList, ActionFunc, DataRow
+from toolkit.web_toolkit import abort_driver, reset_browser_state
 import config
 
 logger = get_logger(__name__)
 
-def execute_step(step: Step, translator: StepTranslator) -> None:
+# 編譯後的流程：(step, 已解析的 action function)
+CompiledFlow = List[Tuple[Step, ActionFunc]]
+
+
+def compile_flow(steps: StepList, translator: StepTranslator) -> CompiledFlow:
+    """
+    事先把每個步驟的 FlowName 解析成 action function。
+    - 未知 FlowName 會在執行任何步驟前就報錯
+    - 資料驅動模式下每列不必重複查表
+    """
+    compiled: CompiledFlow = []
+    for step in steps:
+        flow_name = normalize(step.get("FlowName"))
+        if not flow_name:
+            raise ValueError("TestPlan異常,FlowName不可為空")
+        compiled.append((step, translator.get_action(flow_name)))
+    return compiled
+
+
+def _deadline(label: str, seconds: Optional[float],
+              browser: Optional[Browser]) -> AbstractContextManager[Optional[Deadline]]:
+    """時間預算；有 browser 時超時由 watchdog 關掉它，卡住的 WebDriver 呼叫會立即失敗"""
+    on_expire = (lambda: abort_driver(browser.driver)) if browser is not None else None
+    return deadline_scope(label, seconds, on_expire=on_expire)
+
+
+def deadline_for_test(test_name: str, browser: Browser) -> AbstractContextManager[Optional[Deadline]]:
+    """整個測試的時間預算（TestDir TestTimeoutSec / TEST_TIMEOUT）"""
+    return _deadline(test_name, load_test_timeout(test_name), browser)
+
+
+def should_measure(step: Step, browser: Optional[Browser]) -> bool:
+    """PERF_METRICS 或步驟有設定預算時才收集頁面效能指標"""
+    return getattr(browser, "perf", None) is not None and bool(config.PERF_METRICS or step.get("Budgets"))
+
+
+def check_step_budgets(step: Step, result: StepResult) -> None:
+    """檢查已收集的指標是否超過 TestPlan 預算（同步 / asyncio runner 共用）"""
+    logger.info(f"Metrics: {result.metrics}")
+    violations = check_budgets(result.metrics, step.get("Budgets") or {})
+    if violations:
+        raise PerfBudgetExceeded(f"{result.flow_name} 效能預算未達標：{'; '.join(violations)}")
+
+
+def _measure(step: Step, result: StepResult, browser: Optional[Browser]) -> None:
+    if not should_measure(step, browser):
+        return
+    result.metrics = browser.perf.collect()
+    check_step_budgets(step, result)
+
+
+def _run_step(step: Step, func: ActionFunc, data_row: Optional[DataRow] = None,
+              row_index: Optional[int] = None,
+              browser: Optional[Browser] = None) -> StepResult:
     flow_name = normalize(step.get("FlowName"))
-    if not flow_name:
-        raise ValueError("TestPlan異常,FlowName不可為空")
     params = step.get("Params") or {}
+    if data_row is not None:
+        params = bind_params(params, data_row)
     step_no = step.get("StepNo")
     test_name = step.get("TestName")
     logger.info(f"TestName: {test_name}; StepNo: {step_no}; FlowName: {flow_name};")
     logger.info(f"Params: {params}")
     logger.info("Start execution")
 
-    func = translator.get_action(flow_name)
+    recorder = getattr(browser, "recorder", None)
+    if recorder is not None:
+        recorder.mark_step(step)
 
+    result = StepResult(test_name=test_name, step_no=step_no, flow_name=flow_name, row_index=row_index)
+    if should_measure(step, browser):
+        browser.perf.prepare()
+    start = time.perf_counter()
     try:
-        func(**params)
-    except Exception:
+        try:
+            with _deadline(f"{test_name} Step{step_no}", step.get("TimeoutSec") or config.STEP_TIMEOUT,
+                           browser), profile_step(step):
+                func(**params)
+        finally:
+            result.duration_ms = (time.perf_counter() - start) * 1000
+        _measure(step, result, browser)
+    except Exception as e:
         logger.exception("Step execution failed")
+        result.status = FAIL
+        result.error = f"{type(e).__name__}: {e}"
+        if recorder is not None:
+            recorder.dump(step, e, row_index)
         raise
+    finally:
+        notify_step(result)
+    return result
+
 
-def run_test_flow(test_name: str, browser: Browser) -> None:
-    # 建立執行期 Context（dt/config）
-    ctx = RunContext(dt=DataTable(), config=config.ACTIVE_CONFIG)
+def execute_step(step: Step, translator: StepTranslator, data_row: Optional[DataRow] = None) -> StepResult:
+    flow_name = normalize(step.get("FlowName"))
+    if not flow_name:
+        raise ValueError("TestPlan異常,FlowName不可為空")
+    func = translator.get_action(flow_name)
+    return _run_step(step, func, data_row, browser=translator.browser)
+
+
+def run_steps(test_name: str,
+              steps: StepList,
+              translator: StepTranslator,
+              browser: Browser,
+              retry_policy: Optional[RetryPolicy] = None,
+              store: Optional[CheckpointStore] = None,
+              start_index: int = 0) -> List[StepResult]:
+    """
+    依序執行步驟，並在 checkpoint 步驟記錄可重跑點。
+    - 暫時性錯誤且 retry_policy 允許時，只從最近的 checkpoint 重跑（沒有 checkpoint 則從頭）
+    - 全部通過後清除 checkpoint 檔；失敗時保留，供 engine.resume 使用
+    - start_index: 從第幾個步驟開始（resume 用）
+    """
+    if retry_policy is None:
+        retry_policy = RetryPolicy()
+    if store is None:
+        store = CheckpointStore(test_name, get_config().NAME)
+        store.clear()
+
+    results: List[StepResult] = []
+    attempt = 0
+    index = start_index
+    while index < len(steps):
+        step = steps[index]
+        try:
+            check_deadline()
+            if is_checkpoint(step):
+                store.record(step, browser.driver)
+            results.append(execute_step(step, translator))
+            index += 1
+        except Exception as e:
+            store.mark_failed(step["StepNo"], e)
+            if not retry_policy.should_retry(e, attempt):
+                raise
+            attempt += 1
+
+            checkpoint = store.latest()
+            restart_no = checkpoint.step_no if checkpoint else steps[start_index]["StepNo"]
+            logger.warning(f"StepNo {step['StepNo']} 暫時性失敗，第 {attempt} 次重試，"
+                           f"從 StepNo {restart_no} 重跑")
+            restore_checkpoint(browser, checkpoint, get_config().BASE_URL)
+            index = next(i for i, s in enumerate(steps) if s["StepNo"] == restart_no)
+            results = [r for r in results if r.step_no < restart_no]
+
+    store.clear()
+    return results
+
+
+def split_rows(row_count: int, shard: Optional[Tuple[int, int]] = None) -> range:
+    """
+    把資料列分給多個 worker：shard=(index, total)，以交錯方式分配。
+    例如 10 列、total=3：worker0 → 0,3,6,9；worker1 → 1,4,7；worker2 → 2,5,8
+    """
+    if shard is None:
+        return range(row_count)
+    index, total = shard
+    if total < 1 or not 0 <= index < total:
+        raise ValueError(f"shard 設定錯誤：index={index}, total={total}")
+    return range(index, row_count, total)
+
+
+def iteration_rows(data_alias: str,
+                   shard: Optional[Tuple[int, int]] = None) -> Iterator[Tuple[int, int, DataRow]]:
+    """
+    資料驅動模式要跑的資料列：(row_index, 總列數, 資料列)，每列開始前移動 DataTable 游標。
+    Excel 尾端的空白列不算 iteration。同步 / asyncio runner 共用。
+    """
+    dt = get_datatable()
+    row_count = dt.get_row_count(data_alias)
+    for row_index in split_rows(row_count, shard):
+        dt.set_current_row(data_alias, row_index)
+        data_row = dt.get_row_data(data_alias)
+        if all(v is None or normalize(v) == "" for v in data_row.values()):
+            continue
+        yield row_index, row_count, data_row
+
+
+def check_iterations(test_name: str, results: List[IterationResult]) -> None:
+    """彙總 iteration 結果，有失敗的資料列就丟 AssertionError"""
+    failed = [r for r in results if r.status != PASS]
+    logger.info(f"Iteration 結果：{len(results) - len(failed)}/{len(results)} 通過")
+    if failed:
+        detail = "; ".join(f"row {r.row_index + 1}: {r.error}" for r in failed)
+        raise AssertionError(f"{test_name} 有 {len(failed)} 個 iteration 失敗 - {detail}")
+
+
+def run_iterations(test_name: str,
+                   flow: CompiledFlow,
+                   browser: Browser,
+                   data_alias: str,
+                   shard: Optional[Tuple[int, int]] = None) -> List[IterationResult]:
+    """
+    資料驅動模式（類似 UFT Global iteration）：
+    同一個 browser session 內，對資料 sheet 的每一列跑一次整個流程。
+    - 每列開始前會移動 DataTable 游標，並重設瀏覽器狀態（cookie / storage / 頁面）
+    - 某一列失敗不影響後續列，結果逐列回報
+    """
+    results: List[IterationResult] = []
+    for row_index, row_count, data_row in iteration_rows(data_alias, shard):
+        check_deadline()
+        if results:
+            if not browser.is_alive():
+                # 上一列被 watchdog 中止
+                browser.restart()
+            reset_browser_state(browser.driver)
+
+        logger.info(f"===== Iteration {row_index + 1}/{row_count}: {test_name} =====")
+        result = IterationResult(test_name=test_name, row_index=row_index)
+        start = time.perf_counter()
+        for step, func in flow:
+            try:
+                result.steps.append(_run_step(step, func, data_row, row_index, browser))
+            except Exception as e:
+                result.status = FAIL
+                result.error = f"{type(e).__name__}: {e}"
+                result.steps.append(StepResult(
+                    test_name=test_name,
+                    step_no=step.get("StepNo"),
+                    flow_name=normalize(step.get("FlowName")),
+                    status=FAIL,
+                    error=result.error,
+                    row_index=row_index,
+                ))
+                break
+        result.duration_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Iteration {row_index + 1} {result.status} ({result.duration_ms:.0f} ms)")
+        results.append(result)
+
+    return results
+
+
+def run_test_flow(test_name: str, browser: Browser,
+                  shard: Optional[Tuple[int, int]] = None,
+                  ctx: Optional[RunContext] = None) -> List[StepResult] | List[IterationResult]:
+    # 建立執行期 Context（dt/config）；多環境執行時由呼叫端傳入各自的 ctx
+    if ctx is None:
+        ctx = RunContext(dt=new_datatable(), config=config.ACTIVE_CONFIG)
     set_ctx(ctx)
 
+    error: Optional[BaseException] = None
+    try:
+        with deadline_for_test(test_name, browser), profile_test(test_name):
+            return _run_test_flow(test_name, browser, shard)
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        notify_test_end(test_name, ctx.dt, error)
+
+
+def _run_test_flow(test_name: str, browser: Browser,
+                   shard: Optional[Tuple[int, int]]) -> List[StepResult] | List[IterationResult]:
     steps = load_test_plan(test_name)
     translator = StepTranslator(browser)
 
-    for step in steps:
-        execute_step(step, translator)
+    data_alias = load_data_sheet(test_name)
+    if not data_alias:
+        if shard is not None and shard[0] != 0:
+            logger.info(f"{test_name} 非資料驅動案例，只在 shard 0 執行")
+            return []
+        return run_steps(test_name, steps, translator, browser)
+
+    results = run_iterations(test_name, compile_flow(steps, translator), browser, data_alias, shard)
+    check_iterations(test_name, results)
+    return results
@@ -0,0 +1,61 @@
+# engine/listeners.py
+"""
+執行事件監聽：讓報告 / 匯出 / 統計等「輸出層」掛在 flow runner 上，而不必改動執行邏輯。
+
+    class MyListener(RunListener):
+        def on_step(self, result): ...
+
+    add_listener(MyListener())
+
+監聽器在執行步驟的同一個 thread / task 內被呼叫，可以使用 get_config() / get_datatable()；
+多環境或並行執行時會被同時呼叫，實作需自行處理 thread-safety。
+"""
+from __future__ import annotations
+import threading
+from typing import List, Optional
+
+from engine.results import StepResult
+from toolkit.datatable import DataTable
+from toolkit.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RunListener:
+    def on_step(self, result: StepResult) -> None:
+        """每個步驟結束（通過或失敗）後呼叫"""
+
+    def on_test_end(self, test_name: str, dt: DataTable, error: Optional[BaseException]) -> None:
+        """每個 TestName 結束後呼叫，error 為 None 代表通過"""
+
+
+_listeners: List[RunListener] = []
+_lock = threading.Lock()
+
+
+def add_listener(listener: RunListener) -> None:
+    with _lock:
+        _listeners.append(listener)
+
+
+def remove_listener(listener: RunListener) -> None:
+    with _lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def notify_step(result: StepResult) -> None:
+    for listener in list(_listeners):
+        try:
+            listener.on_step(result)
+        except Exception:
+            # 輸出層的錯誤不應影響測試結果
+            logger.exception(f"{type(listener).__name__}.on_step 失敗")
+
+
+def notify_test_end(test_name: str, dt: DataTable, error: Optional[BaseException]) -> None:
+    for listener in list(_listeners):
+        try:
+            listener.on_test_end(test_name, dt, error)
+        except Exception:
+            logger.exception(f"{type(listener).__name__}.on_test_end 失敗")
@@ -0,0 +1,257 @@
+# engine/load_runner.py
+"""
+壓測模式：把 TestPlan 的流程當成虛擬使用者的腳本，不另外維護一套壓測工具。
+
+- N 個虛擬使用者（headless browser session），在 ramp-up 秒內平均啟動
+- 每個使用者在 duration 秒內重複執行同一個 TestName；每輪之間重設 cookie / storage，
+  失敗時關掉 session 重開，下一輪從乾淨狀態開始
+- 沿用 async runner：一個 process、一個 event loop、共用 chromedriver 與 HTTP 連線池
+- 結果：各步驟延遲 p50 / p90 / p95 / p99、每秒完成流程數（throughput）、錯誤率，
+  輸出到 log 與 logs/load/<TestName>_<時間>.json
+- 預設對本機替身站台（toolkit/local_site.py）施壓，量測結果可重現；--env 可指定其他環境
+
+用法：
+    python -m engine.load_runner --test 正常購物流程 --users 10 --ramp-up 20 --duration 60
+    python -m engine.load_runner --test 正常購物流程 --users 5 --duration 30 --env SIT
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+import config as C
+from base.async_browser import AsyncBrowser
+from engine.async_runner import execute_step_async
+from engine.multi_env import preload_plans
+from engine.perf_report import percentile
+from engine.run_context import RunContext
+from engine.runtime import set_ctx
+from engine.step_translator import StepTranslator
+from engine.testplan_loader import load_test_plan, load_data_sheet
+from toolkit.async_webdriver import create_http_pool
+from toolkit.driver_service import get_driver_services
+from toolkit.governor import get_governor, install_process_cleanup
+from toolkit.local_site import serve_local_site
+from toolkit.logger import LOG_DIR, get_logger
+from toolkit.types import StepList
+
+logger = get_logger(__name__)
+
+LOAD_DIR = os.path.join(LOG_DIR, "load")
+
+# (StepNo, FlowName)
+StepKey = Tuple[int, str]
+
+
+@dataclass
+class LoadStats:
+    """整場壓測的原始數據（單一 event loop 內累積，不需要 lock）"""
+    step_latencies: Dict[StepKey, List[float]] = field(default_factory=dict)
+    step_errors: Counter = field(default_factory=Counter)
+    iteration_latencies: List[float] = field(default_factory=list)
+    failed_iterations: int = 0
+    errors: Counter = field(default_factory=Counter)
+    started_at: float = 0.0
+    finished_at: float = 0.0
+
+    def record_step(self, key: StepKey, duration_ms: float) -> None:
+        self.step_latencies.setdefault(key, []).append(duration_ms)
+
+    @property
+    def iterations(self) -> int:
+        return len(self.iteration_latencies) + self.failed_iterations
+
+
+def _latency_summary(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "p50": round(percentile(ordered, 50), 1),
+        "p90": round(percentile(ordered, 90), 1),
+        "p95": round(percentile(ordered, 95), 1),
+        "p99": round(percentile(ordered, 99), 1),
+        "max": round(ordered[-1], 1),
+    }
+
+
+def build_report(test_name: str, users: int, ramp_up: float, duration: float,
+                 stats: LoadStats) -> Dict[str, Any]:
+    elapsed = max(stats.finished_at - stats.started_at, 1e-9)
+    completed = len(stats.iteration_latencies)
+    steps = []
+    for (step_no, flow_name), values in sorted(stats.step_latencies.items()):
+        errors = stats.step_errors[(step_no, flow_name)]
+        steps.append({
+            "step_no": step_no,
+            "flow_name": flow_name,
+            "errors": errors,
+            "error_rate": round(errors / (len(values) + errors), 4) if values or errors else 0.0,
+            **_latency_summary(values),
+        })
+    # 只失敗、從沒成功過的步驟
+    for (step_no, flow_name), errors in stats.step_errors.items():
+        if (step_no, flow_name) not in stats.step_latencies:
+            steps.append({"step_no": step_no, "flow_name": flow_name, "errors": errors,
+                          "error_rate": 1.0, "count": 0})
+    steps.sort(key=lambda s: s["step_no"])
+
+    return {
+        "test_name": test_name,
+        "users": users,
+        "ramp_up_s": ramp_up,
+        "duration_s": duration,
+        "elapsed_s": round(elapsed, 2),
+        "iterations": stats.iterations,
+        "completed": completed,
+        "failed": stats.failed_iterations,
+        "error_rate": round(stats.failed_iterations / stats.iterations, 4) if stats.iterations else 0.0,
+        "throughput_per_s": round(completed / elapsed, 3),
+        "iteration_latency_ms": _latency_summary(stats.iteration_latencies),
+        "steps": steps,
+        "top_errors": stats.errors.most_common(10),
+    }
+
+
+async def _virtual_user(user_no: int, steps: StepList, plan, env_config: C.EnvConfig,
+                        http, service_url: str, start_delay: float, deadline: float,
+                        stats: LoadStats) -> None:
+    await asyncio.sleep(start_delay)
+    browser: Optional[AsyncBrowser] = None
+    translator: Optional[StepTranslator] = None
+    try:
+        while time.perf_counter() < deadline:
+            # 每輪一份新的 DataTable，add_parameter 不會帶到下一輪
+            set_ctx(RunContext(dt=plan.clone(), config=env_config))
+            iteration_start = time.perf_counter()
+            current: Optional[StepKey] = None
+            try:
+                if browser is None:
+                    browser = await AsyncBrowser.create(http, service_url, env_config, headless=True)
+                    translator = StepTranslator(browser)
+                for step in steps:
+                    current = (step["StepNo"], step["FlowName"])
+                    result = await execute_step_async(step, translator)
+                    stats.record_step(current, result.duration_ms)
+                stats.iteration_latencies.append((time.perf_counter() - iteration_start) * 1000)
+                await browser.reset_state()
+            except Exception as e:
+                stats.failed_iterations += 1
+                stats.errors[f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"] += 1
+                if current is not None:
+                    stats.step_errors[current] += 1
+                logger.warning(f"[user {user_no}] 第 {stats.iterations} 輪失敗：{type(e).__name__}")
+                # 狀態不明，重開 session
+                if browser is not None:
+                    try:
+                        await browser.quit()
+                    except Exception:
+                        pass
+                browser = None
+    finally:
+        if browser is not None:
+            await browser.quit()
+
+
+async def run_load(test_name: str, users: int, ramp_up: float, duration: float,
+                   env_config: C.EnvConfig) -> Dict[str, Any]:
+    plans = await asyncio.to_thread(preload_plans, [env_config], [test_name])
+    plan = plans[env_config.TESTPLANPATH]
+
+    set_ctx(RunContext(dt=plan.clone(), config=env_config))
+    steps = load_test_plan(test_name)
+    if load_data_sheet(test_name):
+        raise ValueError(f"壓測模式尚未支援資料驅動案例：{test_name}")
+
+    capacity = get_governor().capacity
+    if users > capacity:
+        logger.warning(f"虛擬使用者 {users} 個超過 browser 名額 {capacity}，超出的使用者會排隊等待"
+                       f"（可調整 MAX_BROWSERS）")
+
+    service_url = await asyncio.to_thread(get_driver_services().pick().ensure_running)
+    http = create_http_pool(limit=users * 2)
+    stats = LoadStats()
+    stats.started_at = time.perf_counter()
+    deadline = stats.started_at + ramp_up + duration
+    interval = ramp_up / users if users > 1 else 0.0
+    try:
+        await asyncio.gather(*(
+            asyncio.create_task(_virtual_user(i + 1, steps, plan, env_config, http, service_url,
+                                              i * interval, deadline, stats))
+            for i in range(users)
+        ))
+    finally:
+        stats.finished_at = time.perf_counter()
+        await http.close()
+    return build_report(test_name, users, ramp_up, duration, stats)
+
+
+def log_report(report: Dict[str, Any]) -> None:
+    logger.info(f"===== 壓測結果：{report['test_name']}（{report['users']} users，{report['elapsed_s']}s）=====")
+    logger.info(f"  流程 {report['iterations']} 輪，成功 {report['completed']}，失敗 {report['failed']}"
+                f"（錯誤率 {report['error_rate']:.2%}），throughput {report['throughput_per_s']:.2f} 輪/秒")
+    it = report["iteration_latency_ms"]
+    if it.get("count"):
+        logger.info(f"  整輪延遲 p50={it['p50']} p95={it['p95']} p99={it['p99']} max={it['max']} ms")
+    for s in report["steps"]:
+        if s.get("count"):
+            logger.info(f"  Step{s['step_no']:<3} {s['flow_name']:<12} n={s['count']:<6} "
+                        f"p50={s['p50']:<8} p90={s['p90']:<8} p95={s['p95']:<8} p99={s['p99']:<8} "
+                        f"errors={s['errors']}")
+        else:
+            logger.info(f"  Step{s['step_no']:<3} {s['flow_name']:<12} 全部失敗 errors={s['errors']}")
+    for message, count in report["top_errors"]:
+        logger.info(f"  {count:>5} × {message}")
+
+
+def write_report(report: Dict[str, Any]) -> str:
+    os.makedirs(LOAD_DIR, exist_ok=True)
+    path = os.path.join(LOAD_DIR, f"{report['test_name']}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="以 TestPlan 流程進行壓測")
+    parser.add_argument("--test", default="正常購物流程", help="TestName")
+    parser.add_argument("--users", type=int, default=10, help="同時的虛擬使用者數")
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="所有使用者在幾秒內啟動完畢")
+    parser.add_argument("--duration", type=float, default=60.0, help="全部啟動後持續施壓的秒數")
+    parser.add_argument("--env", default="LOCAL", help="LOCAL（預設，自動啟動替身站台）/ DEV / SIT ...")
+    parser.add_argument("--asset-delay-ms", type=int, default=None, help="替身站台的資源延遲")
+    parser.add_argument("--verbose", action="store_true", help="顯示每個步驟的 log")
+    args = parser.parse_args(argv)
+
+    if args.users < 1:
+        parser.error("--users 至少為 1")
+    install_process_cleanup()
+    if not args.verbose:
+        # 每個步驟一行 log，壓測時量太大
+        logging.getLogger("engine.async_runner").setLevel(logging.WARNING)
+
+    env_config = C.get_env_config(args.env)
+    with ExitStack() as stack:
+        if env_config.NAME == C.LOCAL_CONFIG.NAME:
+            site_kwargs = {} if args.asset_delay_ms is None else {"asset_delay_ms": args.asset_delay_ms}
+            base_url = stack.enter_context(serve_local_site(port=0, **site_kwargs))
+            env_config = replace(env_config, BASE_URL=base_url)
+        report = asyncio.run(run_load(args.test, args.users, args.ramp_up, args.duration, env_config))
+
+    log_report(report)
+    logger.info(f"報告：{write_report(report)}")
+    return 0 if report["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
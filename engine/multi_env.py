@@ -0,0 +1,177 @@
+# engine/multi_env.py
+"""
+同一次執行內，多個環境（DEV / SIT / UAT ...）並行跑同一批 TestName。
+
+- TestPlan 只解析一次（同一個 TESTPLANPATH 的環境共用），每個測試拿一份 DataTable.clone()
+- 每個環境一個 thread，各自的 RunContext / EnvConfig / Browser / screenshot 目錄
+  （RunContext 放在 ContextVar，thread 之間互不影響，get_config() 會拿到自己環境的設定）
+- 結果依環境分段輸出到 log 與 logs/multi_env_report.json
+
+用法：
+    TEST_ENVS=DEV,SIT,UAT python -m engine.multi_env
+    python -m engine.multi_env --envs DEV,SIT --tests 正常購物流程,資料驅動購物流程
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+import config as C
+from base.browser import Browser
+from engine.flow_runner import run_test_flow
+from engine.results import PASS, FAIL
+from engine.run_context import RunContext
+from engine.runtime import set_ctx, new_datatable
+from engine.testplan_loader import load_test_plan
+from toolkit.datatable import DataTable
+from toolkit.governor import install_process_cleanup
+from toolkit.logger import LOG_DIR, get_logger
+from toolkit.web_toolkit import take_screenshot
+
+logger = get_logger(__name__)
+
+REPORT_PATH = os.path.join(LOG_DIR, "multi_env_report.json")
+
+
+@dataclass
+class TestOutcome:
+    test_name: str
+    status: str = PASS
+    duration_ms: float = 0.0
+    error: Optional[str] = None
+    screenshot: Optional[str] = None
+
+
+@dataclass
+class EnvReport:
+    env_name: str
+    outcomes: List[TestOutcome] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return all(o.status == PASS for o in self.outcomes)
+
+
+def parse_env_names(raw: Optional[str] = None) -> List[str]:
+    """TEST_ENVS="DEV,SIT,UAT"；未設定時只跑 ACTIVE_ENV_NAME"""
+    raw = raw if raw is not None else os.environ.get("TEST_ENVS", "")
+    names = [x.strip().upper() for x in raw.split(",") if x.strip()]
+    return names or [C.ACTIVE_ENV_NAME]
+
+
+def preload_plans(env_configs: List[C.EnvConfig], test_names: List[str]) -> Dict[str, DataTable]:
+    """
+    依 TESTPLANPATH 各解析一次 TestDir / Translate / 各 FunctionalClassification sheet。
+    回傳 {TESTPLANPATH: 已載入的 DataTable}，執行時再 clone 給每個測試。
+    """
+    plans: Dict[str, DataTable] = {}
+    for env_config in env_configs:
+        path = env_config.TESTPLANPATH
+        if path in plans:
+            continue
+
+        dt = new_datatable()
+        set_ctx(RunContext(dt=dt, config=env_config))
+        dt.add_sheet_from_excel("Translate", path, "Translate")
+        for test_name in test_names:
+            load_test_plan(test_name)
+        plans[path] = dt
+    return plans
+
+
+def run_env(env_config: C.EnvConfig, test_names: List[str], plan: DataTable) -> EnvReport:
+    """在目前 thread 內依序跑完一個環境的所有測試"""
+    report = EnvReport(env_name=env_config.NAME)
+    for test_name in test_names:
+        outcome = TestOutcome(test_name=test_name)
+        start = time.perf_counter()
+        browser = Browser(env_config=env_config)
+        try:
+            run_test_flow(test_name, browser, ctx=RunContext(dt=plan.clone(), config=env_config))
+        except Exception as e:
+            outcome.status = FAIL
+            outcome.error = f"{type(e).__name__}: {e}"
+            logger.exception(f"[{env_config.NAME}] {test_name} 失敗")
+            try:
+                outcome.screenshot = take_screenshot(browser.driver, name_prefix=f"FAIL_{test_name}",
+                                                     env_name=env_config.NAME)
+            except Exception:
+                logger.warning(f"[{env_config.NAME}] 截圖失敗")
+        finally:
+            browser.quit()
+        outcome.duration_ms = (time.perf_counter() - start) * 1000
+        report.outcomes.append(outcome)
+    return report
+
+
+def run_multi_env(env_names: List[str], test_names: List[str]) -> List[EnvReport]:
+    env_configs = [C.get_env_config(name) for name in env_names]
+    plans = preload_plans(env_configs, test_names)
+
+    reports: Dict[str, EnvReport] = {}
+
+    runner = run_env
+    if C.SHARE_PREFIX:
+        # prefix_scheduler 依賴本模組的 TestOutcome / EnvReport，只能在這裡 import
+        from engine.prefix_scheduler import run_env_shared
+        runner = run_env_shared
+
+    def worker(env_config: C.EnvConfig) -> None:
+        try:
+            reports[env_config.NAME] = runner(env_config, test_names, plans[env_config.TESTPLANPATH])
+        except Exception as e:
+            # Browser 起不來等環境層級的錯誤：整個環境的測試都記為失敗
+            logger.exception(f"[{env_config.NAME}] 環境執行失敗")
+            reports[env_config.NAME] = EnvReport(
+                env_name=env_config.NAME,
+                outcomes=[TestOutcome(test_name=t, status=FAIL, error=f"{type(e).__name__}: {e}")
+                          for t in test_names],
+            )
+
+    threads = [
+        threading.Thread(target=worker, args=(env_config,), name=f"env-{env_config.NAME}")
+        for env_config in env_configs
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    ordered = [reports[c.NAME] for c in env_configs]
+    write_report(ordered)
+    return ordered
+
+
+def write_report(reports: List[EnvReport], path: str = REPORT_PATH) -> None:
+    """依環境分段輸出結果"""
+    for report in reports:
+        logger.info(f"===== [{report.env_name}] {'PASS' if report.passed else 'FAIL'} =====")
+        for o in report.outcomes:
+            logger.info(f"  {o.status}  {o.test_name} ({o.duration_ms:.0f} ms)"
+                        + (f" - {o.error}" if o.error else ""))
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({r.env_name: [asdict(o) for o in r.outcomes] for r in reports},
+                  f, ensure_ascii=False, indent=2)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="多環境並行執行")
+    parser.add_argument("--envs", default=None, help="例如 DEV,SIT,UAT（預設讀 TEST_ENVS）")
+    parser.add_argument("--tests", default=os.environ.get("TEST_NAMES", "正常購物流程"))
+    args = parser.parse_args(argv)
+    install_process_cleanup()
+
+    test_names = [x.strip() for x in args.tests.split(",") if x.strip()]
+    reports = run_multi_env(parse_env_names(args.envs), test_names)
+    return 0 if all(r.passed for r in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
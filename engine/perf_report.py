@@ -0,0 +1,156 @@
+# engine/perf_report.py
+"""
+頁面效能指標的歷史紀錄與彙總（依 FlowName）。
+
+- PerfHistory（RunListener）：有指標的步驟逐筆 append 到 logs/perf/metrics.jsonl，跨多次執行累積
+  （path=None 時只留在記憶體；檔案超過 PERF_HISTORY_MAX_BYTES 時輪替成 metrics.jsonl.1）
+- summarize()：依 FlowName 彙總各指標的次數 / p50 / p95 / 最大值，看得出哪個流程的頁面變慢
+
+用法：
+    python -m engine.perf_report                    # 全部歷史
+    python -m engine.perf_report --last 200 --env SIT
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import config as C
+from engine.listeners import RunListener
+from engine.results import StepResult
+from engine.runtime import get_config
+from toolkit.logger import LOG_DIR, get_logger
+
+logger = get_logger(__name__)
+
+PERF_DIR = os.path.join(LOG_DIR, "perf")
+HISTORY_PATH = os.path.join(PERF_DIR, "metrics.jsonl")
+
+# 彙總時略過的非數值欄位
+_NON_METRIC_KEYS = {"url", "Navigated"}
+
+FlowSummary = Dict[str, Dict[str, float]]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """已排序數列的百分位數（nearest-rank：第 ceil(pct% × N) 小的值）"""
+    rank = math.ceil(pct * len(sorted_values) / 100)
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+class PerfHistory(RunListener):
+
+    def __init__(self, path: Optional[str] = HISTORY_PATH, max_bytes: int = C.PERF_HISTORY_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # 本次執行的紀錄（結束時輸出彙總）
+        self.records: List[Dict[str, Any]] = []
+
+    def on_step(self, result: StepResult) -> None:
+        if not result.metrics:
+            return
+        record = {
+            "ts": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "env": get_config().NAME,
+            "test_name": result.test_name,
+            "step_no": result.step_no,
+            "flow_name": result.flow_name,
+            "row": None if result.row_index is None else result.row_index + 1,
+            "status": result.status,
+            "metrics": result.metrics,
+        }
+        with self._lock:
+            self.records.append(record)
+            if self.path is not None:
+                self._append(json.dumps(record, ensure_ascii=False))
+
+    def _append(self, line: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        try:
+            if os.path.getsize(self.path) >= self.max_bytes:
+                os.replace(self.path, self.path + ".1")
+        except FileNotFoundError:
+            pass
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def log_summary(self) -> None:
+        if self.records:
+            log_summary(summarize(self.records), title="本次執行效能指標")
+
+
+def load_history(path: str = HISTORY_PATH, env: Optional[str] = None,
+                 last: Optional[int] = None) -> List[Dict[str, Any]]:
+    """讀取歷史紀錄（含輪替出去的 .1 舊檔），由舊到新"""
+    records: List[Dict[str, Any]] = []
+    for file_path in (path + ".1", path):
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if env is None or record.get("env") == env:
+                    records.append(record)
+    return records[-last:] if last else records
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, FlowSummary]:
+    """{FlowName: {指標: {count, p50, p95, max}}}"""
+    values: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+    for record in records:
+        for key, value in record["metrics"].items():
+            if key in _NON_METRIC_KEYS or not isinstance(value, (int, float)):
+                continue
+            values[record["flow_name"]][key].append(float(value))
+
+    summary: Dict[str, FlowSummary] = {}
+    for flow_name, metrics in values.items():
+        summary[flow_name] = {}
+        for key, series in metrics.items():
+            series.sort()
+            summary[flow_name][key] = {
+                "count": len(series),
+                "p50": percentile(series, 50),
+                "p95": percentile(series, 95),
+                "max": series[-1],
+            }
+    return summary
+
+
+def log_summary(summary: Dict[str, FlowSummary], title: str = "效能指標彙總") -> None:
+    logger.info(f"===== {title} =====")
+    for flow_name, metrics in summary.items():
+        logger.info(f"  {flow_name}")
+        for key, stats in metrics.items():
+            logger.info(f"    {key:<20} n={stats['count']:<5.0f} p50={stats['p50']:<9.1f} "
+                        f"p95={stats['p95']:<9.1f} max={stats['max']:.1f}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="依 FlowName 彙總頁面效能指標歷史")
+    parser.add_argument("--path", default=HISTORY_PATH)
+    parser.add_argument("--env", default=None)
+    parser.add_argument("--last", type=int, default=None, help="只看最近 N 筆")
+    parser.add_argument("--json", action="store_true", help="輸出 JSON")
+    args = parser.parse_args(argv)
+
+    summary = summarize(load_history(args.path, args.env, args.last))
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        log_summary(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
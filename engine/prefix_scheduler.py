@@ -0,0 +1,257 @@
+# engine/prefix_scheduler.py
+"""
+共用前置步驟排程（SHARE_PREFIX=true）。
+
+很多案例開頭都是同樣的步驟（登入 → 檢查首頁），各自開新 session 重跑一次。
+這裡先分析 load_test_plan 的步驟清單，把「開頭步驟相同」的案例排在一起：
+
+- 只有 TestPlan Shareable=Y 的步驟可以共用；開頭連續的 Shareable 步驟中，
+  FlowName / Params / 效能預算完全相同的部分就是共用前置（prefix）；
+  先讓共同部分最長的案例成組，其他案例不會縮短它們共用的步驟數
+- 同一組的案例共用一個 browser session：prefix 只執行一次，擷取 session 快照與 DataTable，
+  之後每個案例都從這個狀態（注入快照、回到當時頁面）接著跑自己剩下的步驟
+- 案例失敗後 session 狀態不明：下一個案例先清空 browser、重新執行 prefix
+- 接續點同時當作 checkpoint，暫時性錯誤重試（FLOW_RETRIES）時會回到 prefix 結束的狀態
+- 資料驅動案例、沒有可共用步驟的案例照原本方式各自執行
+
+注意：同一組的案例會排在一起執行，順序可能與 TEST_NAMES 不同。
+
+用法：
+    SHARE_PREFIX=true TEST_ENVS=DEV,SIT python -m engine.multi_env
+    python -m engine.prefix_scheduler --tests 正常購物流程,流程B --dry-run   # 只看分組
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import config as C
+from base.browser import Browser
+from engine.checkpoint import Checkpoint, CheckpointStore, restore_checkpoint
+from engine.flow_runner import run_steps, run_test_flow, deadline_for_test
+from engine.listeners import notify_test_end
+from engine.multi_env import EnvReport, TestOutcome, preload_plans, write_report
+from engine.profiler import profile_test
+from engine.results import FAIL
+from engine.run_context import RunContext
+from engine.runtime import set_ctx
+from engine.step_translator import StepTranslator
+from engine.testplan_loader import load_test_plan, load_data_sheet
+from toolkit.datatable import DataTable
+from toolkit.governor import install_process_cleanup
+from toolkit.logger import get_logger
+from toolkit.session_cache import SessionSnapshot, capture_session
+from toolkit.types import Step, StepList
+from toolkit.web_toolkit import take_screenshot
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PrefixGroup:
+    """開頭步驟相同的一組案例；prefix_length=0 代表不共用（單獨執行）"""
+    test_names: List[str]
+    prefix_length: int = 0
+    prefix_flows: Tuple[str, ...] = ()
+
+
+@dataclass
+class SharedState:
+    """prefix 執行完的狀態：同組後續案例從這裡接續"""
+    dt: DataTable
+    session: SessionSnapshot
+
+
+def step_signature(step: Step) -> Tuple[Any, ...]:
+    """判斷兩個步驟是否「相同」：FlowName + Params + 效能預算"""
+    return (
+        step["FlowName"],
+        tuple(sorted((k, repr(v)) for k, v in (step.get("Params") or {}).items())),
+        tuple(sorted((step.get("Budgets") or {}).items())),
+    )
+
+
+def shareable_prefix(steps: StepList) -> StepList:
+    """開頭連續的 Shareable 步驟"""
+    prefix: StepList = []
+    for step in steps:
+        if not step.get("Shareable"):
+            break
+        prefix.append(step)
+    return prefix
+
+
+@dataclass
+class _PrefixNode:
+    """共用前置步驟的 trie 節點：children 依步驟簽章分支，ending 為 prefix 剛好走到這裡的案例"""
+    children: Dict[Any, "_PrefixNode"] = field(default_factory=dict)
+    ending: List[str] = field(default_factory=list)
+
+
+def _collect_groups(node: _PrefixNode, depth: int, prefixes: Dict[str, StepList],
+                    groups: List[PrefixGroup]) -> List[str]:
+    """
+    由深到淺分組：子樹內能湊成兩個以上的案例先在最深的共同節點成組，
+    湊不成組的案例往上交給較淺的節點，回傳最後仍未分組的案例。
+    """
+    pending = list(node.ending)
+    for child in node.children.values():
+        pending.extend(_collect_groups(child, depth + 1, prefixes, groups))
+    if depth == 0 or len(pending) < 2:
+        return pending
+    flows = tuple(s["FlowName"] for s in prefixes[pending[0]][:depth])
+    groups.append(PrefixGroup(test_names=pending, prefix_length=depth, prefix_flows=flows))
+    return []
+
+
+def plan_groups(test_names: List[str]) -> List[PrefixGroup]:
+    """
+    把 Shareable prefix 放進 trie，每組取組內案例的最長共同 prefix
+    （例如 A、B 共用兩步、C 只和它們共用第一步時，A、B 一組共用兩步，不會因為 C 縮短）。
+    需要在 RunContext 內呼叫（讀 TestPlan）；群組順序依各組第一個案例在 test_names 的順序。
+    """
+    root = _PrefixNode()
+    prefixes: Dict[str, StepList] = {}
+    for test_name in test_names:
+        prefix = [] if load_data_sheet(test_name) else shareable_prefix(load_test_plan(test_name))
+        prefixes[test_name] = prefix
+        node = root
+        for step in prefix:
+            node = node.children.setdefault(step_signature(step), _PrefixNode())
+        node.ending.append(test_name)
+
+    groups: List[PrefixGroup] = []
+    # 沒有可共用步驟、或找不到同伴的案例各自執行
+    groups.extend(PrefixGroup(test_names=[name]) for name in _collect_groups(root, 0, prefixes, groups))
+
+    order = {name: i for i, name in enumerate(test_names)}
+    for group in groups:
+        group.test_names.sort(key=order.__getitem__)
+    groups.sort(key=lambda g: order[g.test_names[0]])
+    return groups
+
+
+def _run_from_prefix(test_name: str, prefix_length: int, browser: Browser, env_config: C.EnvConfig,
+                     plan: DataTable, state: Optional[SharedState]) -> SharedState:
+    """
+    state 為 None：執行 prefix 並擷取狀態；否則還原到 prefix 結束時的狀態。
+    接著執行剩下的步驟，回傳（可能是新建立的）共用狀態。
+    """
+    ctx = RunContext(dt=(state.dt if state is not None else plan).clone(), config=env_config)
+    set_ctx(ctx)
+
+    error: Optional[BaseException] = None
+    try:
+        with deadline_for_test(test_name, browser), profile_test(test_name):
+            return _continue_from_prefix(test_name, prefix_length, browser, env_config, ctx, state)
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        notify_test_end(test_name, ctx.dt, error)
+
+
+def _continue_from_prefix(test_name: str, prefix_length: int, browser: Browser, env_config: C.EnvConfig,
+                          ctx: RunContext, state: Optional[SharedState]) -> SharedState:
+    steps = load_test_plan(test_name)
+    translator = StepTranslator(browser)
+    if state is None:
+        logger.info(f"執行共用前置步驟（{prefix_length} 步）：{test_name}")
+        run_steps(test_name, steps[:prefix_length], translator, browser)
+        state = SharedState(dt=ctx.dt.clone(), session=capture_session(browser.driver))
+    else:
+        logger.info(f"沿用共用前置步驟的狀態：{test_name}")
+        restore_checkpoint(browser, Checkpoint(step_no=steps[0]["StepNo"], session=state.session),
+                           env_config.BASE_URL)
+
+    # 接續點當作 checkpoint：重試時回到 prefix 結束的狀態，而不是清空重來
+    store = CheckpointStore(test_name, env_config.NAME)
+    store.clear()
+    if prefix_length < len(steps):
+        store.checkpoints.append(Checkpoint(step_no=steps[prefix_length]["StepNo"], session=state.session))
+    run_steps(test_name, steps, translator, browser, store=store, start_index=prefix_length)
+    return state
+
+
+def run_group(group: PrefixGroup, browser: Browser, env_config: C.EnvConfig,
+              plan: DataTable) -> List[TestOutcome]:
+    """在同一個 browser 內依序執行一組案例"""
+    if group.prefix_length:
+        logger.info(f"[{env_config.NAME}] 共用前置步驟 {' → '.join(group.prefix_flows)}："
+                    f"{', '.join(group.test_names)}")
+
+    outcomes: List[TestOutcome] = []
+    state: Optional[SharedState] = None
+    dirty = False
+    for test_name in group.test_names:
+        outcome = TestOutcome(test_name=test_name)
+        start = time.perf_counter()
+        try:
+            if not group.prefix_length:
+                run_test_flow(test_name, browser, ctx=RunContext(dt=plan.clone(), config=env_config))
+            else:
+                if state is None and dirty:
+                    # 上一個案例失敗，清空後重跑 prefix（browser 掛掉會重建）
+                    restore_checkpoint(browser, None, env_config.BASE_URL)
+                state = _run_from_prefix(test_name, group.prefix_length, browser, env_config, plan, state)
+        except Exception as e:
+            outcome.status = FAIL
+            outcome.error = f"{type(e).__name__}: {e}"
+            logger.exception(f"[{env_config.NAME}] {test_name} 失敗")
+            try:
+                outcome.screenshot = take_screenshot(browser.driver, name_prefix=f"FAIL_{test_name}",
+                                                     env_name=env_config.NAME)
+            except Exception:
+                logger.warning(f"[{env_config.NAME}] 截圖失敗")
+            state = None
+        dirty = True
+        outcome.duration_ms = (time.perf_counter() - start) * 1000
+        outcomes.append(outcome)
+    return outcomes
+
+
+def run_env_shared(env_config: C.EnvConfig, test_names: List[str], plan: DataTable) -> EnvReport:
+    """multi_env.run_env 的共用前置版本：每組一個 browser，結果依 test_names 的順序回報"""
+    set_ctx(RunContext(dt=plan.clone(), config=env_config))
+    groups = plan_groups(test_names)
+
+    outcomes: Dict[str, TestOutcome] = {}
+    for group in groups:
+        browser = Browser(env_config=env_config)
+        try:
+            for outcome in run_group(group, browser, env_config, plan):
+                outcomes[outcome.test_name] = outcome
+        finally:
+            browser.quit()
+    return EnvReport(env_name=env_config.NAME, outcomes=[outcomes[name] for name in test_names])
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="共用前置步驟排程")
+    parser.add_argument("--tests", required=True, help="逗號分隔的 TestName")
+    parser.add_argument("--env", default=C.ACTIVE_ENV_NAME)
+    parser.add_argument("--dry-run", action="store_true", help="只列出分組，不執行")
+    args = parser.parse_args(argv)
+    install_process_cleanup()
+
+    test_names = [x.strip() for x in args.tests.split(",") if x.strip()]
+    env_config = C.get_env_config(args.env)
+    plan = preload_plans([env_config], test_names)[env_config.TESTPLANPATH]
+
+    if args.dry_run:
+        set_ctx(RunContext(dt=plan.clone(), config=env_config))
+        for group in plan_groups(test_names):
+            shared = " → ".join(group.prefix_flows) if group.prefix_length else "（不共用）"
+            logger.info(f"{shared}: {', '.join(group.test_names)}")
+        return 0
+
+    report = run_env_shared(env_config, test_names, plan)
+    write_report([report])
+    return 0 if report.passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
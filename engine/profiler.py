@@ -0,0 +1,150 @@
+# engine/profiler.py
+"""
+引擎本身的 Python 取樣 profiler（PROFILE_TARGETS）。
+
+- PROFILE_TARGETS 列出 TestName 或 FlowName（* = 全部）
+    TestName 命中：整個測試取樣（含 TestPlan / DataTable 載入、parse_params、StepTranslator 建立）
+    FlowName 命中：只在該步驟的 Action 執行期間取樣
+- 背景 thread 每 PROFILE_INTERVAL_MS 以 sys._current_frames() 取一次執行中 thread 的 stack
+  （wall-clock：等待 chromedriver 回應的時間也會算在發出呼叫的那一層）
+- 結束時寫到 logs/profile/<名稱>_<時間>.folded（collapsed stack：「frame;frame;... 次數」），
+  可直接丟進 speedscope 或 flamegraph.pl 產生火焰圖；log 另外列出最耗時的函式
+- 未設定 PROFILE_TARGETS 時不建立任何 thread，只多一次 set 判斷
+
+用法：
+    PROFILE_TARGETS=正常購物流程 python -m pytest
+    PROFILE_TARGETS=加入一個商品 PROFILE_INTERVAL_MS=2 python -m pytest
+    flamegraph.pl logs/profile/正常購物流程_20250101_120000.folded > flame.svg
+"""
+from __future__ import annotations
+
+import os
+import re
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import ContextManager, List, Optional, Tuple
+
+import config as C
+from toolkit.logger import LOG_DIR, get_logger
+from toolkit.types import Step
+
+logger = get_logger(__name__)
+
+PROFILE_DIR = os.path.join(LOG_DIR, "profile")
+
+_UNSAFE_NAME_CHARS = re.compile(r'[\\/:*?"<>|\s]+')
+_SITE_PACKAGES = f"site-packages{os.sep}"
+_STDLIB_DIR = sysconfig.get_paths()["stdlib"]
+
+# 同一個 thread 已經在取樣時（測試層級包住步驟層級），不再重複啟動
+_active: ContextVar[Optional["SamplingProfiler"]] = ContextVar("profiler", default=None)
+
+
+def _frame_label(code) -> str:
+    path = code.co_filename
+    if path.startswith(C.ROOT_DIR):
+        path = os.path.relpath(path, C.ROOT_DIR)
+    elif _SITE_PACKAGES in path:
+        path = path.split(_SITE_PACKAGES, 1)[1]
+    elif path.startswith(_STDLIB_DIR):
+        path = os.path.relpath(path, _STDLIB_DIR)
+    # collapsed 格式以 ; 分隔 frame
+    return f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ",")
+
+
+class SamplingProfiler:
+    """對單一 thread 週期性取樣 stack，累積成 collapsed stack 計數"""
+
+    def __init__(self, label: str, interval_ms: float = C.PROFILE_INTERVAL_MS,
+                 thread_id: Optional[int] = None):
+        self.label = label
+        self.interval = max(interval_ms, 0.1) / 1000
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = 0.0
+
+    def sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        labels: List[str] = []
+        while frame is not None:
+            labels.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        self.stacks[";".join(reversed(labels))] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self) -> "SamplingProfiler":
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.label}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self._started_at
+
+    def top_functions(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """依「位於 stack 最上層」的次數排序（self time）"""
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(limit)
+
+    def write(self, directory: str = PROFILE_DIR) -> str:
+        os.makedirs(directory, exist_ok=True)
+        name = _UNSAFE_NAME_CHARS.sub("_", self.label)
+        path = os.path.join(directory, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def __enter__(self) -> "SamplingProfiler":
+        self._token = _active.set(self)
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+        _active.reset(self._token)
+        try:
+            path = self.write()
+        except OSError:
+            logger.warning(f"profile 寫出失敗：{self.label}", exc_info=True)
+            return
+        logger.info(f"Profile {self.label}：{self.samples} 次取樣 / {self.elapsed * 1000:.0f} ms → {path}")
+        for frame, count in self.top_functions(5):
+            logger.info(f"  {count * 100 / max(self.samples, 1):5.1f}%  {frame}")
+
+
+def _selected(*names: Optional[str]) -> bool:
+    return "*" in C.PROFILE_TARGETS or any(n in C.PROFILE_TARGETS for n in names if n)
+
+
+def profile_test(test_name: str) -> ContextManager:
+    """TestName 在 PROFILE_TARGETS 內時，取樣整個測試"""
+    if not C.PROFILE_TARGETS or _active.get() is not None or not _selected(test_name):
+        return nullcontext()
+    return SamplingProfiler(test_name)
+
+
+def profile_step(step: Step) -> ContextManager:
+    """FlowName（或 *）在 PROFILE_TARGETS 內時，取樣這個步驟的 Action"""
+    if not C.PROFILE_TARGETS or _active.get() is not None or not _selected(step.get("FlowName")):
+        return nullcontext()
+    return SamplingProfiler(f"{step.get('TestName')}_Step{step.get('StepNo')}_{step.get('FlowName')}")
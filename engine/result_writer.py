@@ -0,0 +1,149 @@
+# engine/result_writer.py
+"""
+執行結果匯出成 Excel（類似 UFT 跑完後的 Run-time DataTable / Results）。
+
+- 使用 openpyxl write-only 模式：每一列 append 後就寫進暫存檔，不留在記憶體，
+  10 萬列結果也只佔固定記憶體
+- 不會改動來源 TestPlan.xlsx，一律寫到新的結果檔
+- StepResults sheet：每個步驟一列（環境 / TestName / StepNo / FlowName / 狀態 / 耗時 / 錯誤）
+- 每個 TestName 結束時，把 add_parameter 寫過的 sheet（runtime 參數）各匯出成一個 sheet
+
+用法（pytest 由 conftest 依 RESULTS_XLSX 自動掛上）：
+    writer = ResultWriter("logs/results.xlsx")
+    add_listener(writer)
+    ...
+    writer.close()
+"""
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from typing import Any, List, Optional, Set
+
+from openpyxl import Workbook
+
+from engine.listeners import RunListener
+from engine.results import StepResult
+from engine.runtime import get_config
+from toolkit.datatable import DataTable, SheetData
+from toolkit.logger import LOG_DIR, get_logger
+
+logger = get_logger(__name__)
+
+STEP_RESULT_HEADERS = ["Env", "TestName", "Row", "StepNo", "FlowName", "Status",
+                       "DurationMs", "Error", "FinishedAt"]
+
+# Excel sheet 名稱限制：最長 31 字、不可含 []:*?/\
+_INVALID_TITLE_CHARS = re.compile(r"[\[\]:*?/\\]")
+_MAX_TITLE_LEN = 31
+
+
+def _cell_value(value: Any) -> Any:
+    """write-only 模式只接受基本型別，其餘轉成字串"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+class ResultWriter(RunListener):
+
+    def __init__(self, path: str):
+        self.path = path
+        self._wb = Workbook(write_only=True)
+        self._steps_ws = self._wb.create_sheet("StepResults")
+        self._steps_ws.append(STEP_RESULT_HEADERS)
+        self._titles: Set[str] = {"StepResults"}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.rows_written = 0
+
+    # === RunListener ===
+
+    def on_step(self, result: StepResult) -> None:
+        self.write_step(result, env_name=get_config().NAME)
+
+    def on_test_end(self, test_name: str, dt: DataTable, error: Optional[BaseException]) -> None:
+        self.write_datatable(dt, prefix=test_name, only_dirty=True)
+
+    # === 寫入 ===
+
+    def write_step(self, result: StepResult, env_name: str = "") -> None:
+        row = [
+            env_name,
+            result.test_name,
+            None if result.row_index is None else result.row_index + 1,
+            result.step_no,
+            result.flow_name,
+            result.status,
+            round(result.duration_ms, 1),
+            result.error,
+            time.strftime("%Y-%m-%d %H:%M:%S"),
+        ]
+        with self._lock:
+            self._steps_ws.append(row)
+            self.rows_written += 1
+
+    def write_sheet(self, title: str, sheet: SheetData) -> str:
+        """
+        把單一 SheetData 匯出成新的 sheet，回傳實際使用的 sheet 名稱。
+        欄位以所有列出現過的欄位聯集為準（add_parameter 新增的欄位也會包含）。
+        """
+        headers: List[str] = []
+        seen: Set[str] = set()
+        for row in sheet.rows:
+            for col in row:
+                if col not in seen:
+                    seen.add(col)
+                    headers.append(col)
+
+        with self._lock:
+            title = self._unique_title(title)
+            ws = self._wb.create_sheet(title)
+            ws.append(headers)
+            for row in sheet.rows:
+                ws.append([_cell_value(row.get(col)) for col in headers])
+                self.rows_written += 1
+        return title
+
+    def write_datatable(self, dt: DataTable, prefix: str = "", only_dirty: bool = False) -> List[str]:
+        titles: List[str] = []
+        for alias in (dt.dirty_aliases() if only_dirty else dt.aliases()):
+            sheet = dt.get_sheet(alias)
+            titles.append(self.write_sheet(f"{prefix}-{alias}" if prefix else alias, sheet))
+        return titles
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._wb.save(self.path)
+        logger.info(f"執行結果已匯出：{self.path}（{self.rows_written} 列）")
+
+    def _unique_title(self, title: str) -> str:
+        base = _INVALID_TITLE_CHARS.sub("_", title)[:_MAX_TITLE_LEN] or "Sheet"
+        candidate, n = base, 1
+        while candidate in self._titles:
+            n += 1
+            suffix = f"~{n}"
+            candidate = base[:_MAX_TITLE_LEN - len(suffix)] + suffix
+        self._titles.add(candidate)
+        return candidate
+
+
+def default_results_path() -> Optional[str]:
+    """
+    RESULTS_XLSX 環境變數：
+    - 未設定 / 空字串：不匯出
+    - "true"：寫到 logs/results_<時間>.xlsx
+    - 其他值：當作輸出路徑
+    """
+    raw = os.environ.get("RESULTS_XLSX", "").strip()
+    if not raw or raw.lower() == "false":
+        return None
+    if raw.lower() == "true":
+        return os.path.join(LOG_DIR, f"results_{time.strftime('%Y%m%d_%H%M%S')}.xlsx")
+    return raw
@@ -0,0 +1,38 @@
+# engine/results.py
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+PASS = "PASS"
+FAIL = "FAIL"
+
+
+@dataclass
+class StepResult:
+    """單一步驟的執行結果"""
+    test_name: str
+    step_no: int
+    flow_name: str
+    status: str = PASS
+    duration_ms: float = 0.0
+    error: Optional[str] = None
+    row_index: Optional[int] = None  # 資料驅動模式下的資料列索引
+    metrics: Dict[str, Any] = field(default_factory=dict)  # 頁面效能指標（toolkit/perf_metrics.py）
+
+
+@dataclass
+class IterationResult:
+    """
+    資料驅動模式下，單一資料列（iteration）的執行結果。
+    row_index 為資料 sheet 的列索引（0-based，不含表頭）。
+    """
+    test_name: str
+    row_index: int
+    status: str = PASS
+    duration_ms: float = 0.0
+    steps: List[StepResult] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def passed(self) -> bool:
+        return self.status == PASS
@@ -0,0 +1,86 @@
+# engine/resume.py
+"""
+從指定 StepNo 續跑失敗的測試（不必從 StepNo 1 重來）。
+
+用法：
+    python -m engine.resume --test 正常購物流程                 # 從上次失敗前最近的 checkpoint 續跑
+    python -m engine.resume --test 正常購物流程 --from-step 3   # 從 StepNo 3 續跑
+    python -m engine.resume --test 正常購物流程 --env SIT
+
+若 StepNo 之前有帶 session 快照的 checkpoint，會先注入該狀態再開始。
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Optional
+
+import config as C
+from base.browser import Browser
+from engine.checkpoint import CheckpointStore, RetryPolicy, restore_checkpoint
+from engine.flow_runner import run_steps
+from engine.run_context import RunContext
+from engine.runtime import set_ctx, new_datatable
+from engine.step_translator import StepTranslator
+from engine.testplan_loader import load_test_plan
+from toolkit.governor import install_process_cleanup
+from toolkit.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def resume_test_flow(test_name: str, browser: Browser, env_config: C.EnvConfig,
+                     from_step: Optional[int] = None) -> None:
+    set_ctx(RunContext(dt=new_datatable(), config=env_config))
+
+    steps = load_test_plan(test_name)
+    translator = StepTranslator(browser)
+
+    store = CheckpointStore(test_name, env_config.NAME)
+    store.load()
+
+    if from_step is None:
+        latest = store.latest(store.failed_step)
+        if latest is None:
+            raise ValueError(f"{test_name} 沒有可用的 checkpoint，請以 --from-step 指定 StepNo")
+        from_step = latest.step_no
+
+    start_index = next((i for i, s in enumerate(steps) if s["StepNo"] >= from_step), None)
+    if start_index is None:
+        raise ValueError(f"{test_name} 找不到 StepNo >= {from_step} 的步驟")
+
+    checkpoint = store.latest(from_step)
+    if checkpoint is not None and checkpoint.step_no != steps[start_index]["StepNo"]:
+        logger.warning(f"StepNo {steps[start_index]['StepNo']} 之前最近的 checkpoint 是 "
+                       f"StepNo {checkpoint.step_no}，中間步驟的狀態不會被還原")
+    restore_checkpoint(browser, checkpoint, env_config.BASE_URL)
+
+    logger.info(f"從 StepNo {steps[start_index]['StepNo']} 續跑：{test_name}")
+    run_steps(test_name, steps, translator, browser,
+              retry_policy=RetryPolicy(), store=store, start_index=start_index)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="從 checkpoint / 指定 StepNo 續跑測試")
+    parser.add_argument("--test", required=True, help="TestName")
+    parser.add_argument("--from-step", type=int, default=None, help="從此 StepNo 開始")
+    parser.add_argument("--env", default=C.ACTIVE_ENV_NAME, help="DEV / SIT / UAT / PROD / LOCAL")
+    args = parser.parse_args(argv)
+    install_process_cleanup()
+
+    env_config = C.ENVIRONMENTS[args.env.upper()]
+    browser = Browser(env_config=env_config)
+    try:
+        resume_test_flow(args.test, browser, env_config, args.from_step)
+    except Exception:
+        logger.exception(f"續跑失敗：{args.test}")
+        return 1
+    finally:
+        browser.quit()
+
+    logger.info(f"續跑完成：{args.test}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
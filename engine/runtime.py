@@ -2,9 +2,10 @@
 from __future__ import annotations
 from contextvars import ContextVar
 from typing import Optional
-from toolkit.datatable import DataTable
+from toolkit.datatable import DataTable, SheetReader
+from toolkit.sheet_sources import read_sheet
 from engine.run_context import RunContext
-from config import EnvConfig
+from config import EnvConfig, DATATABLE_MAX_BYTES
 _ctx_var: ContextVar[Optional[RunContext]] = ContextVar("run_ctx", default=None)
 
 def set_ctx(ctx: RunContext) -> None:
@@ -21,3 +22,10 @@ def get_datatable() -> DataTable:
 
 def get_config()->EnvConfig:
     return get_ctx().config
+
+def new_datatable(reader: Optional[SheetReader] = None) -> DataTable:
+    """
+    建立執行用的 DataTable（套用 DATATABLE_MAX_BYTES 記憶體預算）。
+    預設依 TESTPLANPATH 的型態讀取（Excel 或 CSV / JSON lines / Parquet 目錄）。
+    """
+    return DataTable(max_bytes=DATATABLE_MAX_BYTES or None, reader=reader or read_sheet)
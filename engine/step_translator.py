@@ -1,6 +1,6 @@
 # engine/step_translator.py
 from __future__ import annotations
-from typing import Callable
+from typing import Any, Callable, Dict, Optional
 from toolkit.types import ActionFunc
 from base.browser import Browser
 from actions.login_actions import LoginActions
@@ -9,12 +9,19 @@ from toolkit.types import ActionMap
 from toolkit.funlib import normalize
 from engine.runtime import get_datatable, get_config
 
+def build_actions(browser: Browser) -> Dict[str, Any]:
+    """Translate sheet 的 ActionKey → Action 物件"""
+    return {
+        "login": LoginActions(browser),
+        "inventory": InventoryActions(browser),
+    }
+
+
 class StepTranslator:
-    def __init__(self, browser: Browser):
-        self.actions = {
-            "login": LoginActions(browser),
-            "inventory": InventoryActions(browser),
-        }
+    def __init__(self, browser: Browser, actions: Optional[Dict[str, Any]] = None):
+        self.browser = browser
+        # actions 可由呼叫端提供（例如單元測試換成替身）；同步 / AsyncBrowser 都用 build_actions
+        self.actions = actions if actions is not None else build_actions(browser)
         C = get_config()
         self._mapping: ActionMap = self._build_action_map_from_excel(C.TESTPLANPATH)
 
@@ -3,6 +3,8 @@ from __future__ import annotations
 from toolkit.types import Step, StepList
 from toolkit.funlib import normalize
 from engine.runtime import get_datatable, get_config
+from toolkit.perf_metrics import BUDGET_COLUMNS
+import config
 from typing import Any
 
 def _infer_type(value: str) -> Any:
@@ -46,7 +48,32 @@ def parse_params(param_str: str | None) -> dict[str, Any]:
         result[normalize(key)] = _infer_type(value)
     return result
 
-def load_testplan_dir(test_name: str) -> str:
+# 資料驅動模式：Params 值以 @ 開頭代表綁定資料 sheet 的欄位，例如 index=@ItemIndex
+PARAM_BINDING_PREFIX = "@"
+
+# 資料驅動模式下，資料 sheet 在 DataTable 中的 alias（對應 UFT 的 Global sheet）
+GLOBAL_SHEET = "Global"
+
+
+def bind_params(params: dict[str, Any], data_row: dict[str, Any]) -> dict[str, Any]:
+    """
+    把 Params 中以 @ 開頭的值替換成資料列對應欄位的值。
+    - Excel 讀到的字串一樣走 _infer_type，與 parse_params 的型別推斷一致
+    """
+    bound: dict[str, Any] = {}
+    for key, value in params.items():
+        if isinstance(value, str) and value.startswith(PARAM_BINDING_PREFIX) and len(value) > 1:
+            col_name = value[len(PARAM_BINDING_PREFIX):]
+            if col_name not in data_row:
+                raise ValueError(f"資料 sheet 找不到欄位：'{col_name}'（Params {key}={value}）")
+            value = data_row[col_name]
+            if isinstance(value, str):
+                value = _infer_type(value)
+        bound[key] = value
+    return bound
+
+
+def _find_testdir_row(test_name: str) -> dict[str, Any]:
     C = get_config()
     dt = get_datatable()
 
@@ -57,16 +84,71 @@ def load_testplan_dir(test_name: str) -> str:
     sheet = dt.get_sheet("TestDir")
 
     for row in sheet.rows:
-        if normalize(row.get("TestName")) != test_name:
-            continue
-
-        fc = normalize(row.get("FunctionalClassification"))
-        if not fc:
-            raise ValueError(f"TestDir FunctionalClassification 為空，TestName='{test_name}'")
-        return fc
+        if normalize(row.get("TestName")) == test_name:
+            return row
 
     raise ValueError(f"TestDir 找不到 TestName='{test_name}'")
 
+
+def load_testplan_dir(test_name: str) -> str:
+    row = _find_testdir_row(test_name)
+    fc = normalize(row.get("FunctionalClassification"))
+    if not fc:
+        raise ValueError(f"TestDir FunctionalClassification 為空，TestName='{test_name}'")
+    return fc
+
+
+def load_data_sheet(test_name: str) -> str:
+    """
+    讀取 TestDir 的 DataSheet 欄位（選填）。
+    有值代表此案例為資料驅動模式：把該 sheet 載入為 Global，回傳 alias；否則回傳空字串。
+    """
+    sheet_name = normalize(_find_testdir_row(test_name).get("DataSheet"))
+    if not sheet_name:
+        return ""
+
+    C = get_config()
+    dt = get_datatable()
+    if not dt.has_sheet(GLOBAL_SHEET):
+        dt.add_sheet_from_excel(GLOBAL_SHEET, C.TESTPLANPATH, sheet_name)
+    return GLOBAL_SHEET
+
+def parse_seconds(row: dict[str, Any], column: str) -> float | None:
+    """讀取秒數欄位（TimeoutSec 等，選填），空白回傳 None"""
+    value = normalize(row.get(column))
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"TestPlan異常,{column} 必須是數字：'{value}'（TestName='{normalize(row.get('TestName'))}'）")
+
+
+def load_test_timeout(test_name: str) -> float | None:
+    """
+    TestDir 的 TestTimeoutSec 欄位（選填）；未設定時使用 config.TEST_TIMEOUT（0 = 不限制 → None）。
+    """
+    seconds = parse_seconds(_find_testdir_row(test_name), "TestTimeoutSec")
+    if seconds is None:
+        seconds = config.TEST_TIMEOUT
+    return seconds or None
+
+
+def parse_budgets(row: dict[str, Any]) -> dict[str, float]:
+    """
+    讀取效能預算欄位（MaxLoadMs 等，選填），回傳 {指標名稱: 上限 ms}。
+    """
+    budgets: dict[str, float] = {}
+    for column, metric in BUDGET_COLUMNS.items():
+        value = normalize(row.get(column))
+        if not value:
+            continue
+        try:
+            budgets[metric] = float(value)
+        except ValueError:
+            raise ValueError(f"TestPlan異常,{column} 必須是數字：'{value}'（TestName='{normalize(row.get('TestName'))}'）")
+    return budgets
+
 def load_test_plan(test_name: str) -> StepList:
     C = get_config()
     dt = get_datatable()
@@ -94,6 +176,12 @@ def load_test_plan(test_name: str) -> StepList:
             "StepNo": int(row.get("StepNo") or 0),
             "FlowName": flow_name,
             "Params": parse_params(row.get("Params")),
+            "Checkpoint": normalize(row.get("Checkpoint")).upper(),
+            "Budgets": parse_budgets(row),
+            # 步驟時間預算（秒），空白時使用 config.STEP_TIMEOUT
+            "TimeoutSec": parse_seconds(row, "TimeoutSec"),
+            # Shareable=Y：與其他案例相同的開頭步驟可共用同一次執行結果（engine/prefix_scheduler.py）
+            "Shareable": normalize(row.get("Shareable")).upper() == "Y",
         }
         steps.append(step)
 
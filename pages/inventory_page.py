@@ -2,6 +2,8 @@
 from selenium.webdriver.common.by import By
 
 from base.base_page import BasePage
+from base.async_base_page import AsyncBasePage
+from toolkit.flow import flow
 from toolkit.types import Locator
 
 
@@ -25,45 +27,53 @@ class InventoryPage(BasePage):
     # 購物車右上角徽章
     CART_BADGE: Locator = (By.CSS_SELECTOR, ".shopping_cart_badge")
 
-    def get_all_item_names(self) -> list[str]:
+    @flow
+    def get_all_item_names(self):
         """
         回傳目前頁面上所有商品名稱（list[str]）。
         """
-        return self.get_all_texts(
+        return (yield self.get_all_texts(
             items_locator=self.ITEM_CARD,
             text_locator=self.ITEM_NAME,
-        )
+        ))
 
-    def get_item_count(self) -> int:
+    @flow
+    def get_item_count(self):
         """
         回傳商品卡片數量。
         """
-        return self.elements_count(self.ITEM_CARD)
+        return (yield self.elements_count(self.ITEM_CARD))
 
-    def add_item_to_cart_by_index(self, index: int) -> None:
+    @flow
+    def add_item_to_cart_by_index(self, index: int):
         """
         依照索引（從 0 開始）點擊該商品的「加入購物車」按鈕。
         """
-        cards = self.find_all(self.ITEM_CARD)
+        cards = yield self.find_all(self.ITEM_CARD)
         total = len(cards)
 
         if index < 0 or index >= total:
             raise IndexError(f"索引 {index} 超出範圍，商品數量為 {total}")
 
         card = cards[index]
-        add_button = self.find_element(card,self.ITEM_ADD_BUTTON)
-        add_button.click()
+        add_button = yield self.find_element(card,self.ITEM_ADD_BUTTON)
+        yield add_button.click()
 
-    def get_cart_badge_count(self) -> int:
+    @flow
+    def get_cart_badge_count(self):
         """
-        讀取右上角購物車徽章數字，沒顯示時回傳 0。
+        讀取右上角購物車徽章數字，沒顯示時回傳 0（徽章不存在時不等待）。
         """
-        badges_text = self.get_all_texts(items_locator=self.CART_BADGE)
-        if not badges_text:
+        badges = yield self.find_existing(self.CART_BADGE)
+        if not badges:
             return 0
 
-        text = badges_text[0]
+        text = yield badges[0].text
         try:
-            return int(text)
+            return int(text.strip())
         except ValueError:
             return 0
+
+
+class AsyncInventoryPage(AsyncBasePage, InventoryPage):
+    """InventoryPage 的 asyncio 版本：locator 與流程沿用 InventoryPage，基本操作由 AsyncBasePage 提供"""
@@ -1,7 +1,9 @@
 # pages/login_page.py
 from selenium.webdriver.common.by import By
+from toolkit.flow import flow
 from toolkit.types import Locator
 from base.base_page import BasePage
+from base.async_base_page import AsyncBasePage
 
 
 class LoginPage(BasePage):
@@ -9,11 +11,17 @@ class LoginPage(BasePage):
     PASSWORD_INPUT: Locator = (By.ID, "password")
     LOGIN_BUTTON:   Locator = (By.ID, "login-button")
 
-    def open(self, base_url: str) -> "LoginPage":
-        self.driver.get(base_url)
+    @flow
+    def open(self, base_url: str):
+        yield self.driver.get(base_url)
         return self
 
-    def login(self, username: str, password: str) -> None:
-        self.type(self.USERNAME_INPUT, username)
-        self.type(self.PASSWORD_INPUT, password)
-        self.click(self.LOGIN_BUTTON)
+    @flow
+    def login(self, username: str, password: str):
+        yield self.type(self.USERNAME_INPUT, username)
+        yield self.type(self.PASSWORD_INPUT, password)
+        yield self.click(self.LOGIN_BUTTON)
+
+
+class AsyncLoginPage(AsyncBasePage, LoginPage):
+    """LoginPage 的 asyncio 版本：locator 與流程沿用 LoginPage，基本操作由 AsyncBasePage 提供"""
@@ -7,6 +7,12 @@ from toolkit.logger import get_logger
 from toolkit.web_toolkit import take_screenshot
 from toolkit.datatable import DataTable
 from base.browser import Browser
+from engine.listeners import add_listener, remove_listener
+from engine.result_writer import ResultWriter, default_results_path
+import config as C
+from engine.perf_report import HISTORY_PATH, PerfHistory
+from toolkit.governor import install_process_cleanup
+from toolkit.replay_proxy import rewind_replay_proxies
 
 logger = get_logger(__name__)
 
@@ -27,6 +33,52 @@ def browser() -> Generator[Browser, None, None]:
         browser.quit()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def process_cleanup() -> None:
+    """pytest 也是 CLI 入口：清除上次執行殘留的 Chrome，SIGTERM 時回收 browser"""
+    install_process_cleanup()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def replay_rewind() -> None:
+    """REPLAY_MODE=replay 時每個測試都從第一筆錄製內容開始回放"""
+    rewind_replay_proxies()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def result_writer() -> Generator[ResultWriter | None, None, None]:
+    """
+    設定 RESULTS_XLSX 時，整個 session 的步驟結果與 runtime 參數會串流寫入結果 Excel。
+    """
+    path = default_results_path()
+    if path is None:
+        yield None
+        return
+
+    writer = ResultWriter(path)
+    add_listener(writer)
+    try:
+        yield writer
+    finally:
+        remove_listener(writer)
+        writer.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def perf_history() -> Generator[PerfHistory, None, None]:
+    """
+    有收集效能指標的步驟（PERF_METRICS 或 TestPlan 預算欄位）在 session 結束時依 FlowName 輸出本次彙總；
+    只有 PERF_METRICS=true 時才累積到 logs/perf/metrics.jsonl。
+    """
+    history = PerfHistory(HISTORY_PATH if C.PERF_METRICS else None)
+    add_listener(history)
+    try:
+        yield history
+    finally:
+        remove_listener(history)
+        history.log_summary()
+
+
 # 單元測試用
 @pytest.fixture(scope="function")
 def datatable():
@@ -52,4 +104,5 @@ def pytest_runtest_makereport(item, call):
 
         if browser and getattr(browser, "driver", None):
             logger.error(f"測試失敗，自動截圖：{item.name}")
-            take_screenshot(browser.driver, name_prefix=f"FAIL_{item.name}")
+            take_screenshot(browser.driver, name_prefix=f"FAIL_{item.name}",
+                            env_name=browser.env_config.NAME)
@@ -0,0 +1,193 @@
+# tests/fake_webdriver.py
+"""
+單元測試用的假 WebDriver 端點（W3C 協定子集），模擬 DemoData/site 的登入頁與商品列表頁。
+同一個 server 可同時給 Selenium（webdriver.Remote）與 AsyncWebDriver 使用，
+用來驗證 @flow 共用流程在兩種模式下行為一致，不需要 Chrome。
+"""
+from __future__ import annotations
+
+import itertools
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+ITEM_COUNT = 6
+
+
+@dataclass
+class _Session:
+    url: str = "about:blank"
+    typed: Dict[str, str] = field(default_factory=dict)
+    cookies: List[Dict[str, Any]] = field(default_factory=list)
+    cart: int = 0
+
+    @property
+    def logged_in(self) -> bool:
+        return any(c.get("name") == "session-username" for c in self.cookies)
+
+
+class FakeWebDriverServer:
+    """
+    with FakeWebDriverServer() as server:
+        AsyncWebDriver(http, server.url) / webdriver.Remote(server.url, options=...)
+    """
+
+    def __init__(self):
+        self.sessions: Dict[str, _Session] = {}
+        self.commands: List[Tuple[str, str]] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self) -> "FakeWebDriverServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    # === 頁面模型 ===
+
+    def _elements(self, session: _Session, using: str, value: str, parent: Optional[str]) -> List[str]:
+        page = session.url.rsplit("/", 1)[-1]
+        if parent is None:
+            if page in ("", "index.html") and value in ('[id="user-name"]', '[id="password"]', '[id="login-button"]'):
+                return [value.split('"')[1]]
+            if page == "inventory.html" and session.logged_in:
+                if value == ".inventory_item":
+                    return [f"card-{i}" for i in range(ITEM_COUNT)]
+                if value == ".shopping_cart_badge" and session.cart:
+                    return ["badge"]
+            return []
+        if parent.startswith("card-"):
+            i = parent.split("-")[1]
+            if value == "button.btn_inventory":
+                return [f"add-{i}"]
+            if value == ".inventory_item_name":
+                return [f"name-{i}"]
+        return []
+
+    def _click(self, session: _Session, element: str) -> None:
+        if element == "login-button":
+            if session.typed.get("user-name") == "standard_user" and session.typed.get("password") == "secret_sauce":
+                session.cookies.append({"name": "session-username", "value": "standard_user"})
+                session.url = session.url.rsplit("/", 1)[0] + "/inventory.html"
+        elif element.startswith("add-"):
+            session.cart += 1
+
+    def _text(self, session: _Session, element: str) -> str:
+        if element == "badge":
+            return str(session.cart)
+        if element.startswith("name-"):
+            return f"Item {element.split('-')[1]} "
+        return ""
+
+    def _script(self, session: _Session, script: str) -> Any:
+        if "isDisplayed" in script:
+            return True
+        if "localStorage.clear" in script:
+            session.cart = 0
+            return None
+        if "dump(window.localStorage)" in script:
+            return {"local": {}, "session": {}}
+        return None
+
+    # === W3C 路由 ===
+
+    def dispatch(self, method: str, path: str, body: Dict[str, Any]) -> Tuple[int, Any]:
+        self.commands.append((method, path))
+        if path == "/session" and method == "POST":
+            session_id = f"s{next(self._ids)}"
+            self.sessions[session_id] = _Session()
+            return 200, {"sessionId": session_id, "capabilities": {"browserName": "chrome"}}
+
+        match = re.fullmatch(r"/session/([^/]+)(/.*)?", path)
+        if not match or match.group(1) not in self.sessions:
+            return 404, {"error": "invalid session id", "message": path}
+        session_id, rest = match.group(1), match.group(2) or ""
+        session = self.sessions[session_id]
+
+        if rest == "" and method == "DELETE":
+            del self.sessions[session_id]
+            return 200, None
+        if rest == "/url":
+            if method == "POST":
+                session.url = body["url"]
+                return 200, None
+            return 200, session.url
+        if rest == "/execute/sync":
+            return 200, self._script(session, body.get("script", ""))
+        if rest == "/cookie":
+            if method == "GET":
+                return 200, session.cookies
+            if method == "POST":
+                session.cookies.append(body["cookie"])
+                return 200, None
+            session.cookies.clear()
+            return 200, None
+        if rest == "/goog/cdp/execute":
+            return 200, {}
+
+        element = re.fullmatch(r"(?:/element/([^/]+))?/(element|elements)", rest)
+        if element and method == "POST":
+            found = self._elements(session, body["using"], body["value"], element.group(1))
+            if element.group(2) == "elements":
+                return 200, [{ELEMENT_KEY: e} for e in found]
+            if not found:
+                return 404, {"error": "no such element", "message": body["value"]}
+            return 200, {ELEMENT_KEY: found[0]}
+
+        command = re.fullmatch(r"/element/([^/]+)/(\w+)", rest)
+        if command:
+            element_id, name = command.groups()
+            if name == "click":
+                self._click(session, element_id)
+                return 200, None
+            if name == "clear":
+                session.typed[element_id] = ""
+                return 200, None
+            if name == "value":
+                session.typed[element_id] = session.typed.get(element_id, "") + body["text"]
+                return 200, None
+            if name == "text":
+                return 200, self._text(session, element_id)
+            if name in ("displayed", "enabled"):
+                return 200, True
+        return 404, {"error": "unknown command", "message": f"{method} {rest}"}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _serve(self, method: str) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                body = json.loads(raw) if raw else {}
+                with server._lock:
+                    status, value = server.dispatch(method, self.path, body or {})
+                payload = json.dumps({"value": value}).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+            def do_DELETE(self):
+                self._serve("DELETE")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,117 @@
+# tests/test_async_runner.py
+import asyncio
+from dataclasses import replace
+
+import pytest
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+
+import config as C
+from actions.inventory_actions import InventoryActions
+from actions.login_actions import LoginActions
+from base.async_browser import AsyncBrowser
+from engine.async_runner import run_flows_async
+from engine.results import PASS
+from engine.run_context import RunContext
+from engine.runtime import set_ctx
+from tests.fake_webdriver import FakeWebDriverServer
+from toolkit.async_webdriver import AsyncWait, AsyncWebDriver, create_http_pool
+from toolkit.deadline import DeadlineExceeded, deadline_scope
+from toolkit.web_toolkit import DeadlineWait
+
+ENV = replace(C.LOCAL_CONFIG, BASE_URL="http://fake.test/")
+
+
+class _SyncBrowser:
+    def __init__(self, driver):
+        self.driver = driver
+        self.wait = DeadlineWait(driver, 2)
+
+
+@pytest.fixture
+def server():
+    with FakeWebDriverServer() as server:
+        yield server
+
+
+def test_async_wait_returns_value_times_out_and_honours_deadline():
+    async def scenario():
+        calls = []
+
+        async def ready_on_third(driver):
+            calls.append(1)
+            return "ok" if len(calls) == 3 else None
+
+        async def never(driver):
+            return None
+
+        wait = AsyncWait(driver=None, timeout=1, poll=0.01)
+        assert await wait.until(ready_on_third) == "ok"
+        with pytest.raises(TimeoutException):
+            await wait.until(never, timeout=0.05)
+        with deadline_scope("T", 0.05):
+            with pytest.raises(DeadlineExceeded):
+                await wait.until(never)
+
+    asyncio.run(scenario())
+
+
+def test_async_webdriver_round_trips_and_maps_errors(server):
+    async def scenario():
+        http = create_http_pool()
+        try:
+            driver = await AsyncWebDriver(http, server.url).start({})
+            await driver.get("http://fake.test/")
+            assert await driver.current_url == "http://fake.test/"
+            button = await driver.find_element(("id", "login-button"))
+            assert await button.is_displayed()
+            with pytest.raises(WebDriverException, match="no such element"):
+                await driver.find_element(("css selector", ".missing"))
+            await driver.quit()
+            with pytest.raises(WebDriverException):
+                await driver.get("http://fake.test/")
+        finally:
+            await http.close()
+
+    asyncio.run(scenario())
+    assert server.sessions == {}
+
+
+def test_same_flow_drives_selenium_and_async_sessions(server, datatable):
+    set_ctx(RunContext(dt=datatable, config=ENV))
+    driver = webdriver.Remote(command_executor=server.url, options=Options())
+    try:
+        browser = _SyncBrowser(driver)
+        LoginActions(browser).login_success()
+        InventoryActions(browser).add_item_to_cart(index=2)
+        assert InventoryActions(browser).inventory_page.get_item_count() == 6
+    finally:
+        driver.quit()
+
+    async def scenario():
+        http = create_http_pool()
+        try:
+            async_driver = await AsyncWebDriver(http, server.url).start({})
+            browser = AsyncBrowser(async_driver, AsyncWait(async_driver, 2), ENV)
+            await LoginActions(browser).login_success()
+            await InventoryActions(browser).add_item_to_cart(index=2)
+            names = await InventoryActions(browser).inventory_page.get_all_item_names()
+            await browser.reset_state()
+            await async_driver.quit()
+            return names
+        finally:
+            await http.close()
+
+    assert asyncio.run(scenario()) == [f"Item {i}" for i in range(6)]
+
+
+def test_run_flows_async_runs_plain_and_data_driven_tests(server):
+    outcomes = asyncio.run(run_flows_async(["正常購物流程", "資料驅動購物流程"], ENV,
+                                           concurrency=2, executor_url=server.url))
+
+    assert [o.status for o in outcomes] == [PASS, PASS], [o.error for o in outcomes]
+    assert [s.flow_name for s in outcomes[0].steps] == ["正常登入", "檢查商品列表", "加入一個商品"]
+    # Data001 三列，各自在重設過的 session 內加入一個商品
+    assert [r.row_index for r in outcomes[1].steps] == [0, 1, 2]
+    assert server.sessions == {}
@@ -0,0 +1,149 @@
+# tests/test_checkpoint.py
+import os
+
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+import config as C
+from engine.checkpoint import Checkpoint, CheckpointStore, RetryPolicy, restore_checkpoint
+from engine.flow_runner import run_steps
+from engine.run_context import RunContext
+from engine.runtime import set_ctx
+from engine.testplan_loader import load_test_plan
+from toolkit.deadline import Deadline, DeadlineExceeded
+from toolkit.logger import LOG_DIR
+from toolkit.session_cache import SessionSnapshot
+
+
+class _StubDriver:
+    def __init__(self):
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append("execute_script")
+
+    def delete_all_cookies(self):
+        self.calls.append("delete_all_cookies")
+
+    def add_cookie(self, cookie):
+        self.calls.append(f"add_cookie {cookie['name']}")
+
+    def get(self, url):
+        self.calls.append(f"get {url}")
+
+
+class _StubBrowser:
+    def __init__(self, alive: bool = True):
+        self.driver = _StubDriver()
+        self.alive = alive
+        self.restarts = 0
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+    def restart(self) -> None:
+        self.restarts += 1
+        self.alive = True
+        self.driver = _StubDriver()
+
+
+class _StubTranslator:
+    def __init__(self, browser, actions):
+        self.browser = browser
+        self.actions = actions
+
+    def get_action(self, flow_name):
+        return self.actions[flow_name]
+
+
+@pytest.mark.parametrize("error, attempt, expected", [
+    (TimeoutException("slow"), 0, True),
+    (StaleElementReferenceException("stale"), 1, True),
+    (TimeoutException("slow"), 2, False),                       # 次數用完
+    (AssertionError("徽章數量不對"), 0, False),                  # 業務驗證失敗
+    (DeadlineExceeded(Deadline("T", 1, 0)), 0, False),          # 超過時間預算
+])
+def test_retry_policy_only_retries_transient_errors(error, attempt, expected):
+    assert RetryPolicy(max_retries=2).should_retry(error, attempt) is expected
+
+
+def test_store_round_trips_session_checkpoints(tmp_path):
+    store = CheckpointStore("T", "LOCAL", directory=str(tmp_path))
+    store.record({"StepNo": 1, "Checkpoint": "Y"}, driver=None)
+    store.checkpoints.append(Checkpoint(step_no=3, session=SessionSnapshot(
+        url="http://127.0.0.1/inventory.html", cookies=[{"name": "session-username", "value": "u"}])))
+    store.mark_failed(4, TimeoutException("slow"))
+
+    loaded = CheckpointStore("T", "LOCAL", directory=str(tmp_path))
+    assert loaded.load()
+    assert loaded.failed_step == 4 and "TimeoutException" in loaded.error
+    assert [c.step_no for c in loaded.checkpoints] == [1, 3]
+    assert loaded.latest().session.url.endswith("inventory.html")
+    assert loaded.latest(before_step=2).step_no == 1
+    assert loaded.latest(before_step=0) is None
+
+    loaded.clear()
+    assert not CheckpointStore("T", "LOCAL", directory=str(tmp_path)).load()
+
+
+def test_restore_checkpoint_restarts_dead_browser_and_injects_session():
+    browser = _StubBrowser(alive=False)
+    snapshot = SessionSnapshot(url="http://127.0.0.1/cart.html",
+                               cookies=[{"name": "session-username", "value": "u", "expiry": 1.5}])
+
+    restore_checkpoint(browser, Checkpoint(step_no=3, session=snapshot), "http://127.0.0.1/")
+
+    assert browser.restarts == 1
+    assert browser.driver.calls[0] == "get http://127.0.0.1/"
+    assert "add_cookie session-username" in browser.driver.calls
+    assert browser.driver.calls[-1] == "get http://127.0.0.1/cart.html"
+
+    # 沒有 session 的 checkpoint：清成乾淨狀態
+    restore_checkpoint(browser, Checkpoint(step_no=1), "http://127.0.0.1/")
+    assert browser.driver.calls[-1] == "get about:blank"
+
+
+def test_run_steps_retries_from_latest_checkpoint(datatable, tmp_path):
+    set_ctx(RunContext(dt=datatable, config=C.LOCAL_CONFIG))
+    browser = _StubBrowser()
+    calls = []
+    failures = [TimeoutException("slow")]
+
+    def step3():
+        calls.append(3)
+        if failures:
+            raise failures.pop()
+
+    translator = _StubTranslator(browser, {
+        "一": lambda: calls.append(1),
+        "二": lambda: calls.append(2),
+        "三": step3,
+    })
+    steps = [
+        {"TestName": "T", "StepNo": 1, "FlowName": "一", "Checkpoint": "Y"},
+        {"TestName": "T", "StepNo": 2, "FlowName": "二", "Checkpoint": "Y"},
+        {"TestName": "T", "StepNo": 3, "FlowName": "三", "Checkpoint": ""},
+    ]
+    store = CheckpointStore("T", "LOCAL", directory=str(tmp_path))
+
+    results = run_steps("T", steps, translator, browser, RetryPolicy(max_retries=1), store)
+
+    assert calls == [1, 2, 3, 2, 3]
+    assert [r.step_no for r in results] == [1, 2, 3]
+    # 全部通過後 checkpoint 檔被清掉
+    assert not store.load()
+
+
+def test_demo_plan_marks_checkpoint_steps(datatable):
+    set_ctx(RunContext(dt=datatable, config=C.LOCAL_CONFIG))
+
+    steps = load_test_plan("正常購物流程")
+
+    assert [s["Checkpoint"] for s in steps] == ["Y", "", "SESSION"]
+
+
+def test_default_store_is_outside_uploaded_logs():
+    # 快照含 cookie：不能落在 CI 會上傳的 logs/ 底下
+    path = CheckpointStore("T", "LOCAL").path
+    assert os.path.dirname(path) == C.CHECKPOINT_DIR
+    assert os.path.commonpath([path, os.path.abspath(LOG_DIR)]) != os.path.abspath(LOG_DIR)
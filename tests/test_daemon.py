@@ -0,0 +1,211 @@
+# tests/test_daemon.py
+import json
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+from openpyxl import Workbook
+
+import engine.daemon as daemon
+from engine.daemon import DaemonServer, EngineDaemon, PlanCache, RunLock
+from engine.daemon_client import send_command
+from engine.results import FAIL, PASS
+
+
+def _write_plan(path, translate_key):
+    wb = Workbook()
+    wb.active.title = "TestDir"
+    wb["TestDir"].append(["TestName"])
+    wb["TestDir"].append(["正常購物流程"])
+    ws = wb.create_sheet("Translate")
+    ws.append(["ActionKey"])
+    ws.append([translate_key])
+    wb.save(path)
+
+
+def _touch_later(path, seconds=5):
+    mtime = os.path.getmtime(path) + seconds
+    os.utime(path, (mtime, mtime))
+
+
+def test_plan_cache_refreshes_only_changed_sheets(tmp_path):
+    path = str(tmp_path / "plan.xlsx")
+    _write_plan(path, "正常登入")
+    cache = PlanCache()
+    cache.watch(path)
+
+    rows = cache.read_sheet(path, "Translate")
+    rows[0]["ActionKey"] = "被改掉"
+    assert cache.read_sheet(path, "Translate") == [{"ActionKey": "正常登入"}]
+    assert not cache.has_changes()
+
+    _write_plan(path, "加入一個商品")
+    _touch_later(path)
+    assert cache.has_changes()
+    assert cache.refresh() == ["plan.xlsx:Translate"]
+    assert not cache.has_changes()
+    assert cache.read_sheet(path, "Translate") == [{"ActionKey": "加入一個商品"}]
+
+    with pytest.raises(ValueError, match="不存在 sheet"):
+        cache.read_sheet(path, "Missing")
+    # 沒有監看的檔案照常讀檔
+    other = str(tmp_path / "other.xlsx")
+    _write_plan(other, "X")
+    assert cache.read_sheet(other, "Translate") == [{"ActionKey": "X"}]
+
+
+def test_plan_cache_keeps_old_content_when_file_is_unreadable(tmp_path):
+    path = str(tmp_path / "plan.xlsx")
+    _write_plan(path, "正常登入")
+    cache = PlanCache()
+    cache.watch(path)
+
+    with open(path, "wb") as f:
+        f.write(b"half-saved")
+    _touch_later(path)
+
+    assert cache.refresh() == []
+    assert cache.read_sheet(path, "Translate") == [{"ActionKey": "正常登入"}]
+
+
+def test_run_lock_exclusive_waits_for_runs_and_blocks_new_ones():
+    lock = RunLock()
+    order = []
+    run_started, release_run = threading.Event(), threading.Event()
+
+    def run(name, started=None, release=None):
+        with lock.shared():
+            order.append(f"{name} start")
+            if started:
+                started.set()
+                release.wait(5)
+            order.append(f"{name} end")
+
+    def reload():
+        with lock.exclusive():
+            order.append("reload")
+
+    first = threading.Thread(target=run, args=("run1", run_started, release_run))
+    first.start()
+    assert run_started.wait(5)
+    writer = threading.Thread(target=reload)
+    writer.start()
+    while not lock._writers_waiting:
+        time.sleep(0.01)
+    second = threading.Thread(target=run, args=("run2",))
+    second.start()
+
+    release_run.set()
+    for t in (first, writer, second):
+        t.join(5)
+
+    assert order == ["run1 start", "run1 end", "reload", "run2 start", "run2 end"]
+
+
+class _StubBrowser:
+    driver = None
+
+
+class _StubPool:
+    def __init__(self, env_config, size):
+        self.size = size
+
+    @contextmanager
+    def acquire(self):
+        yield _StubBrowser()
+
+    def close(self):
+        pass
+
+
+class _StubWatcher:
+    def __init__(self, order):
+        self.order = order
+        self.pending = False
+
+    def has_changes(self):
+        return self.pending
+
+    def refresh(self):
+        self.pending = False
+        self.order.append("reload")
+        return ["actions.login_actions"]
+
+
+def test_module_reload_waits_for_in_flight_run(monkeypatch):
+    order = []
+    started, release = threading.Event(), threading.Event()
+
+    def run_test_flow(test_name, browser, ctx):
+        order.append("run start")
+        started.set()
+        release.wait(5)
+        order.append("run end")
+
+    monkeypatch.setattr(daemon, "BrowserPool", _StubPool)
+    monkeypatch.setattr(daemon, "run_test_flow", run_test_flow)
+    engine = EngineDaemon(["LOCAL"], pool_size=1)
+    engine.modules = _StubWatcher(order)
+
+    runner = threading.Thread(target=lambda: order.append(engine.run("正常購物流程")["status"]))
+    runner.start()
+    assert started.wait(5)
+
+    engine.modules.pending = True
+    checker = threading.Thread(target=engine.check_changes)
+    checker.start()
+    checker.join(0.2)
+    assert order == ["run start"]
+
+    release.set()
+    runner.join(5)
+    checker.join(5)
+    assert order == ["run start", "run end", PASS, "reload"]
+    assert engine.check_changes() == {"sheets": [], "modules": []}
+
+
+class _FakeEngine:
+    def __init__(self):
+        self.runs = []
+
+    def run(self, test_name, env_name=None):
+        self.runs.append((test_name, env_name))
+        return {"test_name": test_name, "status": FAIL if test_name == "壞掉" else PASS}
+
+    def status(self):
+        return {"envs": ["LOCAL"], "runs": len(self.runs)}
+
+    def check_changes(self):
+        return {"sheets": [], "modules": ["pages.login_page"]}
+
+
+def test_server_handles_commands_line_by_line():
+    engine = _FakeEngine()
+    server = DaemonServer(engine, port=0)
+    port = server.server_address[1]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert send_command({"cmd": "run", "tests": ["正常購物流程"], "env": "SIT"}, port, 5)["ok"]
+        failed = send_command({"cmd": "run", "tests": ["正常購物流程", "壞掉"]}, port, 5)
+        assert not failed["ok"] and [r["status"] for r in failed["results"]] == [PASS, FAIL]
+        assert send_command({"cmd": "status"}, port, 5) == {"ok": True, "envs": ["LOCAL"], "runs": 3}
+        assert send_command({"cmd": "reload"}, port, 5)["modules"] == ["pages.login_page"]
+        assert "未知的指令" in send_command({"cmd": "nope"}, port, 5)["error"]
+
+        # 同一條連線可連續送多行，格式錯誤的行不影響後續
+        with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+            sock.sendall(b'not json\n\n{"cmd": "status"}\n')
+            with sock.makefile("r", encoding="utf-8") as reader:
+                first, second = json.loads(reader.readline()), json.loads(reader.readline())
+        assert not first["ok"] and second["ok"]
+
+        assert engine.runs[0] == ("正常購物流程", "SIT")
+        assert send_command({"cmd": "stop"}, port, 5) == {"ok": True}
+        thread.join(5)
+        assert not thread.is_alive()
+    finally:
+        server.server_close()
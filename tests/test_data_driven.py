@@ -0,0 +1,81 @@
+# tests/test_data_driven.py
+import pytest
+
+import config as C
+from engine.flow_runner import run_iterations, split_rows
+from engine.run_context import RunContext
+from engine.runtime import set_ctx
+from engine.testplan_loader import bind_params, parse_params
+
+
+class _StubDriver:
+    """reset_browser_state 只需要這三個呼叫"""
+
+    def execute_script(self, script, *args):
+        return None
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        pass
+
+
+class _StubBrowser:
+    def __init__(self):
+        self.driver = _StubDriver()
+
+    def is_alive(self) -> bool:
+        return True
+
+
+def test_bind_params_replaces_column_references_with_inferred_types():
+    params = parse_params("index=@ItemIndex; name=@Name; literal=3; email=a@b")
+
+    bound = bind_params(params, {"ItemIndex": "2", "Name": "Backpack", "Unused": "x"})
+
+    assert bound == {"index": 2, "name": "Backpack", "literal": 3, "email": "a@b"}
+    # 非字串（Excel 數值）原樣傳入，空白儲存格為 None
+    assert bind_params({"index": "@ItemIndex"}, {"ItemIndex": 1}) == {"index": 1}
+    assert bind_params({"index": "@ItemIndex"}, {"ItemIndex": None}) == {"index": None}
+    # 只有 @ 不算綁定
+    assert bind_params({"v": "@"}, {}) == {"v": "@"}
+
+
+def test_bind_params_missing_column_names_the_param():
+    with pytest.raises(ValueError, match="ItemIndex.*index=@ItemIndex"):
+        bind_params({"index": "@ItemIndex"}, {"Other": "1"})
+
+
+def test_split_rows_interleaves_uneven_shards():
+    shards = [list(split_rows(10, (i, 3))) for i in range(3)]
+
+    assert shards == [[0, 3, 6, 9], [1, 4, 7], [2, 5, 8]]
+    assert sorted(sum(shards, [])) == list(range(10))
+    # worker 比資料列多時，多出來的 worker 分不到列
+    assert list(split_rows(2, (3, 4))) == []
+    assert list(split_rows(0, (0, 2))) == []
+    assert list(split_rows(3)) == [0, 1, 2]
+
+
+@pytest.mark.parametrize("shard", [(0, 0), (2, 2), (-1, 2)])
+def test_split_rows_rejects_invalid_shard(shard):
+    with pytest.raises(ValueError):
+        split_rows(5, shard)
+
+
+def test_run_iterations_skips_blank_rows_and_binds_each_row(datatable):
+    datatable.add_sheet_from_rows("Global", [
+        {"ItemIndex": "0", "Name": "A"},
+        {"ItemIndex": None, "Name": "  "},   # Excel 尾端的空白列
+        {"ItemIndex": "2", "Name": "C"},
+    ])
+    set_ctx(RunContext(dt=datatable, config=C.LOCAL_CONFIG))
+    calls = []
+    step = {"TestName": "T", "StepNo": 1, "FlowName": "記錄", "Params": {"index": "@ItemIndex"}}
+
+    results = run_iterations("T", [(step, lambda index: calls.append(index))], _StubBrowser(), "Global")
+
+    assert [r.row_index for r in results] == [0, 2]
+    assert calls == [0, 2]
+    assert all(r.passed for r in results)
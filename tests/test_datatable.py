@@ -0,0 +1,153 @@
+# tests/test_datatable.py
+import os
+
+import config as C
+from toolkit.datatable import DataTable, compare_sheets, read_excel_sheet, read_excel_workbook
+
+TESTPLAN = os.path.join(C.ROOT_DIR, "DemoData", "TestPlan.xlsx")
+
+
+def test_add_sheet_from_rows(datatable):
+    datatable.add_sheet_from_rows("Grid", [{"ID": "1", "Name": "A"}, {"ID": "2", "Name": "B"}])
+
+    assert datatable.has_sheet("Grid")
+    assert datatable.get_sheet("Grid").row_count == 2
+    assert datatable.get_data("Name", "Grid") == "A"
+
+
+def test_compare_sheets_reports_only_differences(datatable):
+    datatable.add_sheet_from_rows("Actual", [
+        {"ID": "1", "Name": "Backpack", "Price": "29.99"},
+        {"ID": "2", "Name": "Bike Light", "Price": "10.99"},
+        {"ID": "4", "Name": "Onesie", "Price": "7.99"},
+    ])
+    datatable.add_sheet_from_rows("Expected", [
+        {"ID": 1, "Name": "Backpack", "Price": 29.99},
+        {"ID": 2, "Name": "Bike Light", "Price": 9.99},
+        {"ID": 3, "Name": "Jacket", "Price": 49.99},
+    ])
+
+    diff = compare_sheets(datatable.get_sheet("Actual"), datatable.get_sheet("Expected"), key_cols=["ID"])
+
+    assert not diff.is_equal
+    assert diff.missing_keys == [("3",)]
+    assert diff.extra_keys == [("4",)]
+    assert [(m.key, m.column, m.expected, m.actual) for m in diff.mismatches] == [
+        (("2",), "Price", "9.99", "10.99"),
+    ]
+
+
+def test_compare_sheets_treats_integral_floats_as_ints(datatable):
+    datatable.add_sheet_from_rows("Actual", [{"ID": "1", "Qty": "3"}])
+    datatable.add_sheet_from_rows("Expected", [{"ID": 1.0, "Qty": 3.0}])
+
+    diff = compare_sheets(datatable.get_sheet("Actual"), datatable.get_sheet("Expected"), key_cols=["ID"])
+
+    assert diff.is_equal
+
+
+def test_budget_evicts_least_recently_used_clean_sheet():
+    dt = DataTable(max_bytes=1)
+    dt.add_sheet_from_rows("A", [{"v": i} for i in range(50)])
+    dt.add_sheet_from_rows("B", [{"v": i} for i in range(50)])
+
+    assert dt.evictions == 1
+    assert dt.stats()["sheets_evicted"] == 1
+    assert dt.has_sheet("A") and dt.get_sheet_count() == 2
+
+    # 再次存取時透明載回，游標位置保留
+    dt.set_current_row("B", 7)
+    assert dt.get_data("v", "A") == 0
+    assert dt.reloads == 1
+    assert dt.get_data("v", "B") == 7
+    assert dt.get_sheet("B").get_current_row() == 7
+
+
+def test_budget_never_evicts_sheet_changed_by_add_parameter():
+    dt = DataTable(max_bytes=1)
+    dt.add_sheet_from_rows("Runtime", [{"v": 1}])
+    dt.get_sheet("Runtime").add_parameter("Out", "x")
+    dt.add_sheet_from_rows("Other", [{"v": 2}])
+    dt.add_sheet_from_rows("Third", [{"v": 3}])
+
+    assert dt.get_sheet("Runtime").get("Out") == "x"
+    assert dt.reloads == 0
+
+
+def test_budget_reloads_excel_sheet_from_source():
+    dt = DataTable(max_bytes=1)
+    dt.add_sheet_from_excel("TestDir", TESTPLAN, "TestDir")
+    dt.add_sheet_from_excel("Translate", TESTPLAN, "Translate")
+
+    assert dt.evictions == 1
+    assert dt.get_data("TestName", "TestDir") == "正常購物流程"
+    assert dt.reloads == 1
+
+
+def test_custom_reader_serves_cached_workbook():
+    book = read_excel_workbook(TESTPLAN)
+    calls = []
+
+    def reader(file_path, sheet_name):
+        calls.append(sheet_name)
+        return [dict(row) for row in book[sheet_name]]
+
+    dt = DataTable(reader=reader)
+    dt.add_sheet_from_excel("TestDir", TESTPLAN, "TestDir")
+    dt.get_sheet("TestDir").add_parameter("Out", "x")
+
+    assert calls == ["TestDir"]
+    assert book["TestDir"] == read_excel_sheet(TESTPLAN, "TestDir")
+    assert dt.clone().reader is reader
+
+
+def test_eviction_keeps_sheet_identity_for_held_references():
+    dt = DataTable(max_bytes=1)
+    dt.add_sheet_from_rows("A", [{"v": i} for i in range(50)])
+    held = dt.get_sheet("A")
+    held.set_current_row(5)
+    dt.add_sheet_from_rows("B", [{"v": i} for i in range(50)])
+
+    assert dt.evictions == 1 and not held.loaded
+    # 透過舊參照存取會載回同一個物件，游標不變
+    assert held.get("v") == 5
+    assert dt.get_sheet("A") is held
+    assert dt.reloads == 1
+
+    held.add_parameter("Out", "x")
+    dt.add_sheet_from_rows("C", [{"v": i} for i in range(50)])
+    assert dt.get_data("Out", "A") == "x"
+    assert dt.dirty_aliases() == ["A"]
+    assert dt.stats()["sheets_in_memory"] == 2
+
+
+def test_cursor_survives_reload_through_datatable_accessors():
+    dt = DataTable(max_bytes=1)
+    dt.add_sheet_from_excel("TestDir", TESTPLAN, "TestDir")
+    dt.set_current_row("TestDir", 1)
+    row = dt.get_row_data("TestDir")
+    dt.add_sheet_from_rows("Other", [{"v": i} for i in range(50)])
+
+    assert dt.stats()["sheets_evicted"] == 1
+    assert dt.get_row_count("TestDir") == len(read_excel_sheet(TESTPLAN, "TestDir"))
+    assert dt.get_sheet("TestDir").get_current_row() == 1
+    assert dt.get_row_data("TestDir") == row
+
+    # clone 不載回已移出的 sheet，但游標一併複製
+    clone = dt.clone()
+    assert clone.stats()["sheets_evicted"] == 1
+    assert clone.get_data("TestName", "TestDir") == row["TestName"]
+
+
+def test_overwritten_alias_detaches_evicted_sheet():
+    dt = DataTable(max_bytes=1)
+    dt.add_sheet_from_rows("A", [{"v": "old"}] * 20)
+    old = dt.get_sheet("A")
+    dt.add_sheet_from_rows("B", [{"v": 0}] * 20)
+    assert not old.loaded
+
+    dt.add_sheet_from_rows("A", [{"v": "new"}])
+
+    assert old.get("v") == "old"
+    assert dt.get_data("v", "A") == "new"
+    assert dt.get_sheet_count() == 2
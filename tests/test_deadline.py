@@ -0,0 +1,35 @@
+# tests/test_deadline.py
+import threading
+import time
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from toolkit.deadline import DeadlineExceeded, clamp_timeout, current_deadline, deadline_scope
+
+
+def test_waits_are_clamped_to_the_earliest_deadline():
+    assert clamp_timeout(10) == 10
+    with deadline_scope("test", 5):
+        with deadline_scope("step", 1) as step:
+            assert current_deadline() is step
+            assert 0 < clamp_timeout(10) <= 1
+        assert 1 < clamp_timeout(10) <= 5
+    assert current_deadline() is None
+
+    with deadline_scope("step", 0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded, match="step 超過時間預算"):
+            clamp_timeout(10)
+
+
+def test_watchdog_aborts_hung_call_and_reports_deadline():
+    aborted = threading.Event()
+
+    with pytest.raises(DeadlineExceeded) as exc_info:
+        with deadline_scope("hung step", 0.05, on_expire=aborted.set, grace=0.05):
+            # 模擬卡住的 WebDriver 呼叫：browser 被關掉後才失敗
+            assert aborted.wait(5)
+            raise WebDriverException("chrome not reachable")
+
+    assert isinstance(exc_info.value.__cause__, WebDriverException)
@@ -2,7 +2,9 @@
 import os
 import pytest
 
+import config as C
 from engine.flow_runner import run_test_flow
+from engine.multi_env import run_multi_env, parse_env_names
 
 
 def _parse_test_names() -> list[str]:
@@ -20,9 +22,54 @@ def _parse_test_names() -> list[str]:
     return ["正常購物流程"]
 
 
-@pytest.mark.parametrize("test_name", _parse_test_names())
-def test_execution(browser, test_name: str):
+def _iteration_shards() -> int:
+    """
+    資料驅動案例的資料列要切成幾份（搭配 pytest-xdist 分給多個 worker）：
+        ITERATION_SHARDS=4
+    非資料驅動案例只會在 shard 0 執行。
+    """
+    return max(1, int(os.environ.get("ITERATION_SHARDS", "1")))
+
+
+def _test_cases() -> list:
+    # SHARE_PREFIX=true 時改由 test_shared_prefix 整批執行（共用開頭步驟需要同一個 session）
+    if C.SHARE_PREFIX:
+        return []
+    shards = _iteration_shards()
+    if shards == 1:
+        return [pytest.param(name, None, id=name) for name in _parse_test_names()]
+    return [
+        pytest.param(name, (i, shards), id=f"{name}-shard{i}")
+        for name in _parse_test_names()
+        for i in range(shards)
+    ]
+
+
+@pytest.mark.parametrize("test_name, shard", _test_cases())
+def test_execution(browser, test_name: str, shard):
     """
     測試入口不綁死案例名稱，由 CI 以 TEST_NAMES 控制順序與清單。
     """
-    run_test_flow(test_name, browser)
+    run_test_flow(test_name, browser, shard=shard)
+
+
+@pytest.mark.skipif(not os.environ.get("TEST_ENVS"), reason="未設定 TEST_ENVS")
+def test_multi_env():
+    """
+    TEST_ENVS="DEV,SIT,UAT" 時，同一次執行內並行跑多個環境。
+    """
+    reports = run_multi_env(parse_env_names(), _parse_test_names())
+    failed = [f"[{r.env_name}] {o.test_name}: {o.error}"
+              for r in reports for o in r.outcomes if o.error]
+    assert not failed, "\n".join(failed)
+
+
+@pytest.mark.skipif(not C.SHARE_PREFIX or bool(os.environ.get("TEST_ENVS")),
+                    reason="未設定 SHARE_PREFIX（或由 test_multi_env 執行）")
+def test_shared_prefix():
+    """
+    SHARE_PREFIX=true 時，開頭 Shareable 步驟相同的案例共用同一次執行結果。
+    """
+    reports = run_multi_env([C.ACTIVE_ENV_NAME], _parse_test_names())
+    failed = [f"{o.test_name}: {o.error}" for r in reports for o in r.outcomes if o.error]
+    assert not failed, "\n".join(failed)
@@ -0,0 +1,110 @@
+# tests/test_flight_recorder.py
+import json
+import os
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+import base.flight_recorder as flight_recorder
+import config as C
+from base.flight_recorder import FlightRecorder
+from toolkit.web_toolkit import build_chrome_options, enable_flight_logs
+
+
+def _perf(method, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}}), "timestamp": 1}
+
+
+class _StubDriver:
+    def __init__(self):
+        self.current_url = "http://127.0.0.1/index.html"
+        self.page_source = "<html>login</html>"
+        self.logs = {"performance": [], "browser": []}
+        self.dead = False
+
+    def get_log(self, kind):
+        if self.dead:
+            raise WebDriverException("session deleted")
+        entries, self.logs[kind] = self.logs[kind], []
+        return entries
+
+
+class _StubBrowser:
+    env_config = C.LOCAL_CONFIG
+
+    def __init__(self):
+        self.driver = _StubDriver()
+
+
+STEP = {"TestName": "正常購物流程", "StepNo": 2, "FlowName": "檢查商品列表", "Params": {}}
+
+
+def test_performance_log_is_only_enabled_for_recorder_sessions():
+    options = build_chrome_options(C.FULL_PROFILE, headless=True)
+    assert "goog:loggingPrefs" not in options.to_capabilities()
+
+    enable_flight_logs(options)
+    assert options.to_capabilities()["goog:loggingPrefs"]["performance"] == "ALL"
+
+
+def test_ring_buffer_keeps_latest_network_events_console_and_snapshots():
+    browser = _StubBrowser()
+    recorder = FlightRecorder(browser, max_events=2, max_snapshots=2)
+    browser.driver.logs["performance"] = [
+        _perf("Network.requestWillBeSent", requestId="1", request={"url": "a.js", "method": "GET"}),
+        _perf("Page.frameNavigated"),                                   # 非網路事件不保留
+        {"message": "not json"},
+        _perf("Network.responseReceived", requestId="1", response={"url": "a.js", "status": 500}),
+        _perf("Network.loadingFailed", requestId="2", errorText="net::ERR_FAILED"),
+    ]
+    browser.driver.logs["browser"] = [{"level": "SEVERE", "message": f"e{i}", "extra": "x"} for i in range(3)]
+
+    for step_no in range(1, 4):
+        recorder.mark_step({"StepNo": step_no, "FlowName": f"F{step_no}"})
+
+    assert [e["method"] for e in recorder.network] == ["Network.responseReceived", "Network.loadingFailed"]
+    assert recorder.network[0]["status"] == 500 and recorder.network[1]["errorText"] == "net::ERR_FAILED"
+    assert [c["message"] for c in recorder.console] == ["e1", "e2"]
+    assert "extra" not in recorder.console[0]
+    assert [s.label for s in recorder.snapshots] == ["Step2 F2", "Step3 F3"]
+
+    # 記錄器本身的錯誤不影響測試
+    browser.driver.dead = True
+    recorder.mark_step({"StepNo": 4})
+    assert len(recorder.snapshots) == 2
+
+
+def test_dump_writes_report_and_dom_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(flight_recorder, "FLIGHT_DIR", str(tmp_path))
+    browser = _StubBrowser()
+    recorder = FlightRecorder(browser)
+    recorder.mark_step(STEP)
+    browser.driver.page_source = "<html>inventory</html>"
+    browser.driver.logs["browser"] = [{"level": "SEVERE", "message": "boom"}]
+
+    directory = recorder.dump(STEP, TimeoutException("slow"), row_index=1)
+
+    assert os.path.basename(directory).startswith("正常購物流程_Step2_Row2_")
+    with open(os.path.join(directory, "flight.json"), encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["error"] == "TimeoutException: Message: slow\n"
+    assert report["env"] == "LOCAL" and report["row"] == 2
+    assert [s["html"] for s in report["snapshots"]] == ["dom_1.html", "dom_fail.html"]
+    assert report["console"][0]["message"] == "boom"
+    with open(os.path.join(directory, "dom_fail.html"), encoding="utf-8") as f:
+        assert f.read() == "<html>inventory</html>"
+
+
+def test_dump_writes_buffered_data_when_browser_is_gone(tmp_path, monkeypatch):
+    monkeypatch.setattr(flight_recorder, "FLIGHT_DIR", str(tmp_path))
+    browser = _StubBrowser()
+    recorder = FlightRecorder(browser)
+    recorder.mark_step(STEP)
+    browser.driver.dead = True
+
+    directory = recorder.dump(STEP, RuntimeError("chrome crashed"))
+
+    assert sorted(os.listdir(directory)) == ["dom_1.html", "flight.json"]
+
+    # 寫檔失敗只回傳 None
+    monkeypatch.setattr(flight_recorder, "FLIGHT_DIR", os.path.join(directory, "flight.json"))
+    assert recorder.dump(STEP, RuntimeError("x")) is None
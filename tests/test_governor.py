@@ -0,0 +1,64 @@
+# tests/test_governor.py
+import os
+import signal
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import toolkit.governor as governor_module
+from toolkit.governor import ResourceGovernor
+
+
+def test_acquire_waits_for_free_slot_and_release_removes_profile():
+    governor = ResourceGovernor(max_browsers=1, timeout=5)
+    first = governor.acquire()
+    assert os.path.isdir(first.profile_dir)
+
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(governor.acquire()))
+    waiter.start()
+    waiter.join(0.3)
+    assert not acquired
+
+    governor.release(first)
+    waiter.join(5)
+    assert not os.path.exists(first.profile_dir)
+    assert len(acquired) == 1 and governor.waits == 1
+    governor.reap_all()
+    assert not os.path.exists(acquired[0].profile_dir)
+
+
+def test_acquire_times_out_when_no_slot():
+    governor = ResourceGovernor(max_browsers=1, timeout=0.2)
+    lease = governor.acquire()
+    try:
+        with pytest.raises(RuntimeError, match="名額逾時"):
+            governor.acquire()
+    finally:
+        governor.release(lease)
+
+
+def test_get_governor_leaves_signals_and_other_processes_alone(monkeypatch):
+    calls = []
+    monkeypatch.setattr(governor_module, "_governor", None)
+    monkeypatch.setattr(governor_module, "_cleanup_installed", False)
+    monkeypatch.setattr(governor_module, "_install_signal_handlers", lambda: calls.append("signals"))
+    monkeypatch.setattr(ResourceGovernor, "reap_orphans", lambda self: calls.append("reap"))
+
+    governor = governor_module.get_governor()
+    assert calls == []
+
+    assert governor_module.install_process_cleanup() is governor
+    governor_module.install_process_cleanup()
+    assert calls == ["reap", "signals"]
+
+
+def test_kill_terminates_before_killing():
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        assert governor_module._kill({proc.pid, os.getpid()}, grace=2) == 1
+        assert proc.wait(5) == -signal.SIGTERM
+    finally:
+        proc.kill()
@@ -0,0 +1,18 @@
+# tests/test_load_profile.py
+import config as C
+from toolkit.web_toolkit import blocked_url_patterns, build_chrome_options
+
+
+def test_background_args_follow_profile_field_not_name():
+    custom = C.LoadProfile(NAME="full-quiet", DISABLE_BACKGROUND=True)
+
+    assert "--disable-extensions" in build_chrome_options(custom, headless=True).arguments
+    assert "--disable-extensions" in build_chrome_options(C.LIGHT_PROFILE, headless=True).arguments
+    assert "--disable-extensions" not in build_chrome_options(C.FULL_PROFILE, headless=True).arguments
+
+
+def test_blocked_url_patterns_expand_resource_types():
+    patterns = blocked_url_patterns(C.LIGHT_PROFILE)
+
+    assert "*.woff2" in patterns and "*doubleclick.net*" in patterns
+    assert blocked_url_patterns(C.FULL_PROFILE) == []
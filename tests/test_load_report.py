@@ -0,0 +1,62 @@
+# tests/test_load_report.py
+from collections import Counter
+
+import pytest
+
+from engine.load_runner import LoadStats, build_report
+from engine.perf_report import percentile
+
+
+@pytest.mark.parametrize("pct, expected", [(0, 1), (50, 50), (90, 90), (95, 95), (99, 99), (100, 100)])
+def test_percentile_is_nearest_rank(pct, expected):
+    assert percentile([float(v) for v in range(1, 101)], pct) == expected
+
+
+def test_percentile_small_samples():
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([1.0, 2.0, 3.0], 50) == 2.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+
+
+def test_build_report_latency_error_rate_and_throughput():
+    stats = LoadStats(
+        step_latencies={
+            (2, "檢查商品列表"): [30.0, 10.0, 20.0],
+            (1, "正常登入"): [float(v) for v in range(1, 101)],
+        },
+        step_errors=Counter({(2, "檢查商品列表"): 1, (3, "加入一個商品"): 2}),
+        iteration_latencies=[float(v) for v in range(100, 1100, 10)],
+        failed_iterations=3,
+        errors=Counter({"TimeoutException: slow": 2, "WebDriverException: gone": 1}),
+        started_at=10.0,
+        finished_at=60.0,
+    )
+
+    report = build_report("正常購物流程", users=5, ramp_up=2.0, duration=45.0, stats=stats)
+
+    assert report["iterations"] == 103 and report["completed"] == 100 and report["failed"] == 3
+    assert report["error_rate"] == round(3 / 103, 4)
+    assert report["elapsed_s"] == 50.0
+    assert report["throughput_per_s"] == 2.0
+    assert report["iteration_latency_ms"] == {"count": 100, "p50": 590.0, "p90": 990.0,
+                                              "p95": 1040.0, "p99": 1080.0, "max": 1090.0}
+
+    steps = report["steps"]
+    assert [(s["step_no"], s["errors"], s["error_rate"], s["count"]) for s in steps] == [
+        (1, 0, 0.0, 100),
+        (2, 1, 0.25, 3),
+        (3, 2, 1.0, 0),       # 從沒成功過的步驟
+    ]
+    assert (steps[0]["p50"], steps[0]["p99"], steps[0]["max"]) == (50.0, 99.0, 100.0)
+    assert (steps[1]["p50"], steps[1]["max"]) == (20.0, 30.0)
+    assert report["top_errors"][0] == ("TimeoutException: slow", 2)
+
+
+def test_build_report_with_no_iterations():
+    report = build_report("T", users=1, ramp_up=0, duration=1, stats=LoadStats())
+
+    assert report["iterations"] == 0
+    assert report["error_rate"] == 0.0
+    assert report["throughput_per_s"] == 0.0
+    assert report["iteration_latency_ms"] == {"count": 0}
+    assert report["steps"] == []
@@ -0,0 +1,172 @@
+# tests/test_perf_metrics.py
+import asyncio
+import os
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+import config as C
+from engine.async_runner import execute_step_async
+from engine.flow_runner import _run_step
+from engine.perf_report import PerfHistory, load_history, summarize
+from engine.results import StepResult
+from engine.run_context import RunContext
+from engine.runtime import set_ctx
+from engine.testplan_loader import load_test_plan, parse_budgets
+from toolkit.perf_metrics import PerfBudgetExceeded, PerfCollector, check_budgets
+
+
+def _raw(origin, long_tasks=(), load=850.04):
+    return {"origin": origin, "url": "http://127.0.0.1/inventory.html",
+            "nav": {"ttfb": 12.3, "dcl": 400, "load": load},
+            "firstPaint": 100, "fcp": 120.55, "longTasks": list(long_tasks)}
+
+
+class _ScriptDriver:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.cdp_calls = []
+
+    def execute_cdp_cmd(self, cmd, args):
+        self.cdp_calls.append(cmd)
+        return {}
+
+    def execute_script(self, script):
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class _Browser:
+    def __init__(self, driver):
+        self.driver = driver
+        self.perf = PerfCollector(self)
+
+
+class _AsyncScriptDriver(_ScriptDriver):
+    ASYNC = True
+
+    async def execute_cdp_cmd(self, cmd, args):
+        return super().execute_cdp_cmd(cmd, args)
+
+    async def execute_script(self, script):
+        return super().execute_script(script)
+
+
+class _AsyncBrowser(_Browser):
+    ASYNC = True
+
+
+def test_parse_budgets_reads_optional_columns():
+    row = {"TestName": "T", "MaxLoadMs": 3000, "MaxFCPMs": " 1500 ", "MaxTTFBMs": "", "MaxLongTaskMs": None}
+    assert parse_budgets(row) == {"LoadMs": 3000.0, "FCPMs": 1500.0}
+    assert parse_budgets({"TestName": "T"}) == {}
+    with pytest.raises(ValueError, match="MaxLoadMs.*TestName='T'"):
+        parse_budgets({"TestName": "T", "MaxLoadMs": "fast"})
+
+
+def test_check_budgets_reports_only_measured_violations():
+    metrics = {"LoadMs": 3200.4, "FCPMs": 900, "LongTaskMs": 0}
+    budgets = {"LoadMs": 3000, "FCPMs": 1000, "TTFBMs": 200, "LongTaskMs": 50}
+
+    assert check_budgets(metrics, budgets) == ["LoadMs=3200 超過預算 3000"]
+    # 沒有換頁的步驟量不到載入類指標：略過而不是失敗
+    assert check_budgets({"LongTaskMs": 0}, {"LoadMs": 1}) == []
+
+
+def test_perf_collector_reports_navigation_once_and_new_long_tasks_only():
+    browser = _Browser(_ScriptDriver(
+        _raw(1000.0, [60]),
+        _raw(1000.0, [60, 75.25]),                  # 同一頁：只回報新增的 long task
+        WebDriverException("session gone"),
+        None,                                       # about:blank
+        _raw(2000.0, [], load=0),                   # 新頁面、load 尚未結束
+    ))
+    perf = browser.perf
+
+    first = perf.collect()
+    assert first == {"url": "http://127.0.0.1/inventory.html", "Navigated": True, "TTFBMs": 12.3,
+                     "DomContentLoadedMs": 400.0, "LoadMs": 850.0, "FirstPaintMs": 100.0, "FCPMs": 120.5,
+                     "LongTaskCount": 1, "LongTaskMs": 60}
+    second = perf.collect()
+    assert second["Navigated"] is False and "LoadMs" not in second
+    assert (second["LongTaskCount"], second["LongTaskMs"]) == (1, 75.2)
+    assert perf.collect() == {}
+    assert perf.collect() == {}
+    third = perf.collect()
+    assert third["Navigated"] is True and "LoadMs" not in third
+
+
+def test_async_step_collects_metrics_and_enforces_budget():
+    browser = _AsyncBrowser(_AsyncScriptDriver(_raw(1000.0), _raw(1000.0)))
+    calls = []
+
+    class _Translator:
+        def __init__(self):
+            self.browser = browser
+
+        def get_action(self, flow_name):
+            async def action():
+                calls.append(flow_name)
+            return action
+
+    step = {"TestName": "T", "StepNo": 1, "FlowName": "正常登入", "Budgets": {"LoadMs": 5000}}
+    result = asyncio.run(execute_step_async(step, _Translator()))
+    assert result.metrics["LoadMs"] == 850.0
+
+    browser.perf.reset()
+    with pytest.raises(PerfBudgetExceeded, match="LoadMs=850"):
+        asyncio.run(execute_step_async(dict(step, Budgets={"LoadMs": 500}), _Translator()))
+    assert calls == ["正常登入", "正常登入"]
+    # reset（driver 重建）後重新注入一次
+    assert browser.driver.cdp_calls == ["Page.addScriptToEvaluateOnNewDocument"] * 2
+
+
+def test_observer_is_installed_only_for_measured_steps(monkeypatch):
+    monkeypatch.setattr(C, "PERF_METRICS", False)
+    browser = _Browser(_ScriptDriver(_raw(1000.0), _raw(1000.0)))
+    step = {"TestName": "T", "StepNo": 1, "FlowName": "正常登入", "Budgets": {}}
+
+    result = _run_step(step, lambda: None, browser=browser)
+    assert result.metrics == {}
+    assert browser.driver.cdp_calls == []
+    assert len(browser.driver.responses) == 2
+
+    # 有預算的步驟：第一次量測前注入，之後沿用
+    budgeted = dict(step, Budgets={"LoadMs": 5000})
+    _run_step(budgeted, lambda: None, browser=browser)
+    _run_step(budgeted, lambda: None, browser=browser)
+    assert browser.driver.cdp_calls == ["Page.addScriptToEvaluateOnNewDocument"]
+
+    monkeypatch.setattr(C, "PERF_METRICS", True)
+    browser = _Browser(_ScriptDriver(_raw(1000.0)))
+    assert _run_step(step, lambda: None, browser=browser).metrics["LoadMs"] == 850.0
+    assert browser.driver.cdp_calls == ["Page.addScriptToEvaluateOnNewDocument"]
+
+
+def test_perf_history_writes_only_with_path_and_rotates(tmp_path, datatable):
+    set_ctx(RunContext(dt=datatable, config=C.LOCAL_CONFIG))
+    result = StepResult("T", 1, "正常登入", metrics={"LoadMs": 100.0, "url": "u", "Navigated": True})
+
+    in_memory = PerfHistory(path=None)
+    in_memory.on_step(result)
+    in_memory.on_step(StepResult("T", 2, "沒有指標"))
+    assert len(in_memory.records) == 1 and not os.listdir(tmp_path)
+
+    path = str(tmp_path / "perf" / "metrics.jsonl")
+    history = PerfHistory(path=path, max_bytes=1)
+    for load in (100.0, 200.0, 300.0):
+        history.on_step(StepResult("T", 1, "正常登入", metrics={"LoadMs": load}))
+
+    assert sorted(os.listdir(tmp_path / "perf")) == ["metrics.jsonl", "metrics.jsonl.1"]
+    records = load_history(path)
+    assert [r["metrics"]["LoadMs"] for r in records] == [200.0, 300.0]
+    assert load_history(path, env="SIT") == []
+    assert summarize(load_history(path, last=1))["正常登入"]["LoadMs"]["max"] == 300.0
+
+
+def test_demo_plan_has_no_perf_budgets(datatable):
+    set_ctx(RunContext(dt=datatable, config=C.LOCAL_CONFIG))
+
+    assert all(step["Budgets"] == {} for step in load_test_plan("正常購物流程"))
@@ -0,0 +1,76 @@
+# tests/test_prefix_scheduler.py
+from dataclasses import replace
+
+import openpyxl
+
+import config as C
+from engine.prefix_scheduler import plan_groups
+from engine.run_context import RunContext
+from engine.runtime import set_ctx
+
+
+def _write_plan(path, steps):
+    wb = openpyxl.Workbook()
+    testdir = wb.active
+    testdir.title = "TestDir"
+    testdir.append(["FunctionalClassification", "TestName", "DataSheet"])
+    for test_name in dict.fromkeys(s[0] for s in steps):
+        testdir.append(["Fun001", test_name, None])
+    plan = wb.create_sheet("Fun001")
+    plan.append(["TestName", "StepNo", "FlowName", "Params", "Shareable"])
+    for row in steps:
+        plan.append(list(row))
+    wb.save(path)
+
+
+def test_plan_groups_shares_longest_common_shareable_prefix(datatable, tmp_path):
+    path = str(tmp_path / "TestPlan.xlsx")
+    _write_plan(path, [
+        ("A", 1, "正常登入", None, "Y"),
+        ("A", 2, "檢查商品列表", None, "Y"),
+        ("A", 3, "加入一個商品", "index=0", None),
+        ("B", 1, "正常登入", None, "Y"),
+        ("B", 2, "檢查商品列表", None, "Y"),
+        ("B", 3, "加入一個商品", "index=1", None),
+        ("C", 1, "正常登入", None, "Y"),
+        ("C", 2, "加入一個商品", "index=2", "Y"),
+        # 與 A 相同但沒有標 Shareable
+        ("D", 1, "正常登入", None, None),
+    ])
+    set_ctx(RunContext(dt=datatable, config=replace(C.LOCAL_CONFIG, TESTPLANPATH=path)))
+
+    # C 只和 A、B 共用第一步，不會讓 A、B 的共用前置縮短；C 找不到同伴就單獨執行
+    assert [(g.test_names, g.prefix_length) for g in plan_groups(["A", "B"])] == [(["A", "B"], 2)]
+    groups = plan_groups(["A", "D", "B", "C"])
+
+    assert [(g.test_names, g.prefix_length) for g in groups] == [
+        (["A", "B"], 2),
+        (["D"], 0),
+        (["C"], 0),
+    ]
+    assert groups[0].prefix_flows == ("正常登入", "檢查商品列表")
+
+
+def test_plan_groups_passes_leftovers_to_shallower_prefix(datatable, tmp_path):
+    path = str(tmp_path / "TestPlan.xlsx")
+    _write_plan(path, [
+        ("A", 1, "正常登入", None, "Y"),
+        ("A", 2, "檢查商品列表", None, "Y"),
+        ("A", 3, "加入一個商品", "index=0", "Y"),
+        ("B", 1, "正常登入", None, "Y"),
+        ("B", 2, "檢查商品列表", None, "Y"),
+        ("B", 3, "加入一個商品", "index=0", "Y"),
+        ("C", 1, "正常登入", None, "Y"),
+        ("C", 2, "檢查商品列表", None, "Y"),
+        ("C", 3, "加入一個商品", "index=1", "Y"),
+        ("E", 1, "正常登入", None, "Y"),
+    ])
+    set_ctx(RunContext(dt=datatable, config=replace(C.LOCAL_CONFIG, TESTPLANPATH=path)))
+
+    groups = plan_groups(["C", "A", "E", "B"])
+
+    # A、B 共用三步；C 在第三步分岔、湊不到同伴，往上和只有登入的 E 共用一步
+    assert [(g.test_names, g.prefix_length) for g in groups] == [
+        (["C", "E"], 1),
+        (["A", "B"], 3),
+    ]
@@ -0,0 +1,80 @@
+# tests/test_profiler.py
+import os
+import time
+from contextlib import nullcontext
+
+import pytest
+
+import config as C
+from engine import profiler as P
+from engine.flow_runner import _run_step
+from engine.profiler import SamplingProfiler, profile_step, profile_test
+
+STEP = {"TestName": "正常購物流程", "StepNo": 2, "FlowName": "加入一個商品"}
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    """profile 檔寫到 tmp_path，不留在 logs/profile"""
+    write = SamplingProfiler.write
+    monkeypatch.setattr(SamplingProfiler, "write", lambda self, directory=str(tmp_path): write(self, directory))
+    return tmp_path
+
+
+def _busy_wait(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampling_profiler_writes_collapsed_stacks(tmp_path):
+    profiler = SamplingProfiler("unit", interval_ms=1).start()
+    _busy_wait(0.2)
+    profiler.stop()
+
+    assert profiler.samples > 0
+    assert any("_busy_wait" in frame for frame, _ in profiler.top_functions(3))
+
+    path = profiler.write(str(tmp_path))
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert "test_sampling_profiler_writes_collapsed_stacks" in stack and int(count) > 0
+
+
+def test_hooks_are_no_ops_without_targets(monkeypatch):
+    monkeypatch.setattr(C, "PROFILE_TARGETS", frozenset())
+
+    assert isinstance(profile_test("正常購物流程"), nullcontext)
+    assert isinstance(profile_step(STEP), nullcontext)
+
+
+@pytest.mark.parametrize("targets, test_profiled, step_profiled", [
+    ({"正常購物流程"}, True, False),      # TestName 只選整個測試
+    ({"加入一個商品"}, False, True),      # FlowName 只選該步驟
+    ({"*"}, True, True),
+    ({"其他流程"}, False, False),
+])
+def test_targets_match_test_name_or_flow_name(monkeypatch, targets, test_profiled, step_profiled):
+    monkeypatch.setattr(C, "PROFILE_TARGETS", frozenset(targets))
+
+    assert isinstance(profile_test("正常購物流程"), SamplingProfiler) is test_profiled
+    assert isinstance(profile_step(STEP), SamplingProfiler) is step_profiled
+
+
+def test_step_profiler_runs_around_action_unless_test_is_profiled(monkeypatch, profile_dir):
+    monkeypatch.setattr(C, "PROFILE_TARGETS", frozenset({"正常購物流程", "加入一個商品"}))
+    active = []
+
+    def action():
+        active.append(P._active.get())
+
+    _run_step(STEP, action)
+    assert active[0].label == "正常購物流程_Step2_加入一個商品"
+    assert P._active.get() is None
+
+    # 整個測試已在取樣：步驟不再另開一個 profiler
+    with profile_test("正常購物流程") as test_profiler:
+        _run_step(STEP, action)
+    assert active[1] is test_profiler
+    assert len(os.listdir(profile_dir)) == 2
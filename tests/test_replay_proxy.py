@@ -0,0 +1,78 @@
+# tests/test_replay_proxy.py
+import http.client
+from dataclasses import replace
+
+import pytest
+
+import config as C
+
+from toolkit.local_site import serve_local_site
+from toolkit.replay_proxy import Cassette, ReplayProxy, get_replay_proxy
+
+
+def _get_via(proxy: ReplayProxy, url: str) -> http.client.HTTPResponse:
+    host, port = proxy.server_address
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    conn.request("GET", url)
+    response = conn.getresponse()
+    response.body = response.read()
+    conn.close()
+    return response
+
+
+def test_recorded_traffic_is_replayed_without_upstream(tmp_path):
+    cassette_dir = str(tmp_path / "LOCAL")
+    with serve_local_site(port=0, asset_delay_ms=0) as base_url:
+        cassette = Cassette(cassette_dir)
+        cassette.clear()
+        recorder = ReplayProxy(cassette, "record").start()
+        try:
+            recorded = _get_via(recorder, base_url)
+        finally:
+            recorder.stop()
+    assert recorded.status == 200 and recorder.stats["recorded"] == 1
+
+    # 站台已關閉：只能從錄製內容回應
+    replay_cassette = Cassette(cassette_dir)
+    assert replay_cassette.load() == 1
+    player = ReplayProxy(replay_cassette, "replay").start()
+    try:
+        replayed = _get_via(player, base_url)
+        missing = _get_via(player, base_url + "not-recorded.html")
+    finally:
+        player.stop()
+
+    assert replayed.status == 200
+    assert replayed.body == recorded.body
+    assert missing.status == 404 and missing.getheader("X-Replay-Miss") == "1"
+    assert player.stats == {"hits": 1, "misses": 1, "recorded": 0}
+
+
+def test_rewind_restarts_replay_order(tmp_path):
+    cassette = Cassette(str(tmp_path / "LOCAL"))
+    cassette.clear()
+    key = "GET http://example.test/api -"
+    cassette.record(key, 200, "OK", [], b"first")
+    cassette.record(key, 200, "OK", [], b"second")
+
+    served = [cassette.next_response(key)[1] for _ in range(3)]
+    cassette.rewind()
+
+    assert served == [b"first", b"second", b"second"]
+    assert cassette.next_response(key)[1] == b"first"
+
+
+def test_record_mode_refused_under_multiple_xdist_workers(tmp_path, monkeypatch):
+    cassette_dir = tmp_path / "replay" / "LOCAL"
+    (cassette_dir / "bodies").mkdir(parents=True)
+    (cassette_dir / "index.jsonl").write_text("{}\n", encoding="utf-8")
+    monkeypatch.setattr(C, "REPLAY_DIR", str(tmp_path / "replay"))
+    monkeypatch.delenv("REPLAY_MODE", raising=False)
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw1")
+    monkeypatch.setenv("PYTEST_XDIST_WORKER_COUNT", "2")
+
+    with pytest.raises(RuntimeError, match="xdist"):
+        get_replay_proxy(replace(C.LOCAL_CONFIG, REPLAY_MODE="record"))
+
+    # 其他 worker 的錄製內容沒有被清掉
+    assert (cassette_dir / "index.jsonl").exists()
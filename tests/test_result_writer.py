@@ -0,0 +1,52 @@
+# tests/test_result_writer.py
+from openpyxl import load_workbook
+
+import config as C
+from engine.result_writer import STEP_RESULT_HEADERS, ResultWriter
+from engine.results import FAIL, StepResult
+from engine.run_context import RunContext
+from engine.runtime import set_ctx
+from toolkit.datatable import DataTable
+
+
+def _read(path):
+    wb = load_workbook(path, read_only=True)
+    try:
+        return {ws.title: [list(r) for r in ws.iter_rows(values_only=True)] for ws in wb.worksheets}
+    finally:
+        wb.close()
+
+
+def test_streams_step_rows_and_runtime_parameters(tmp_path):
+    set_ctx(RunContext(dt=DataTable(), config=C.LOCAL_CONFIG))
+    path = str(tmp_path / "out" / "results.xlsx")
+    writer = ResultWriter(path)
+
+    writer.on_step(StepResult("正常購物流程", 1, "正常登入", duration_ms=12.34))
+    writer.on_step(StepResult("資料驅動購物流程", 2, "加入一個商品", status=FAIL,
+                              error="TimeoutException: slow", row_index=0))
+
+    dt = DataTable()
+    dt.add_sheet_from_rows("Runtime", [{"ID": 1}, {"ID": 2}])
+    dt.set_current_row("Runtime", 1)
+    dt.get_sheet("Runtime").add_parameter("OrderNo", {"no": 7})
+    dt.add_sheet_from_rows("Untouched", [{"ID": 1}])
+    writer.on_test_end("正常購物流程:[a/b]*", dt, None)
+    # 同名 sheet 不覆蓋，改加序號
+    assert writer.write_sheet("正常購物流程:[a/b]*-Runtime", dt.get_sheet("Runtime")) == "正常購物流程__a_b__-Runtime~2"
+    writer.close()
+    writer.close()
+
+    book = _read(path)
+    steps = book["StepResults"]
+    assert steps[0] == STEP_RESULT_HEADERS
+    assert [r[:7] for r in steps[1:]] == [
+        ["LOCAL", "正常購物流程", None, 1, "正常登入", "PASS", 12.3],
+        ["LOCAL", "資料驅動購物流程", 1, 2, "加入一個商品", "FAIL", 0],
+    ]
+    assert steps[2][7] == "TimeoutException: slow"
+
+    # 只匯出 add_parameter 寫過的 sheet，非法字元換成 _，非基本型別轉成字串
+    assert list(book) == ["StepResults", "正常購物流程__a_b__-Runtime", "正常購物流程__a_b__-Runtime~2"]
+    assert book["正常購物流程__a_b__-Runtime"] == [["ID", "OrderNo"], [1, None], [2, "{'no': 7}"]]
+    assert writer.rows_written == 6
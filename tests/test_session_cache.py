@@ -0,0 +1,53 @@
+# tests/test_session_cache.py
+import os
+import time
+
+from toolkit.session_cache import SessionCache, SessionSnapshot
+
+
+def _snapshot(**kwargs) -> SessionSnapshot:
+    return SessionSnapshot(url="https://example.test/inventory.html",
+                           cookies=[{"name": "session-username", "value": "standard_user"}], **kwargs)
+
+
+def test_put_then_get_from_another_cache_instance(tmp_path):
+    SessionCache(str(tmp_path), ttl=60).put("DEV", "standard_user", _snapshot())
+
+    # 另一個 process 只看得到磁碟上的檔案
+    snapshot = SessionCache(str(tmp_path), ttl=60).get("DEV", "standard_user")
+
+    assert snapshot is not None
+    assert snapshot.cookies[0]["value"] == "standard_user"
+    assert SessionCache(str(tmp_path), ttl=60).get("SIT", "standard_user") is None
+
+
+def test_expired_snapshot_is_removed(tmp_path):
+    cache = SessionCache(str(tmp_path), ttl=60)
+    cache.put("DEV", "standard_user", _snapshot(created_at=time.time() - 61))
+
+    assert cache.get("DEV", "standard_user") is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_invalidate_drops_memory_and_file(tmp_path):
+    cache = SessionCache(str(tmp_path), ttl=60)
+    cache.put("DEV", "standard_user", _snapshot())
+
+    cache.invalidate("DEV", "standard_user")
+
+    assert cache.get("DEV", "standard_user") is None
+    assert os.listdir(tmp_path) == []
+    # 沒有快照時 invalidate 不報錯
+    cache.invalidate("DEV", "standard_user")
+
+
+def test_corrupt_or_unreadable_file_counts_as_miss(tmp_path):
+    cache = SessionCache(str(tmp_path), ttl=60)
+    broken = cache._path(cache._key("DEV", "broken"))
+    with open(broken, "w", encoding="utf-8") as f:
+        f.write('{"url": "https://example.test/", "cookies": [')
+    # 路徑是目錄：open 會丟 OSError（root 也一樣，不靠檔案權限）
+    os.makedirs(cache._path(cache._key("DEV", "unreadable")))
+
+    assert cache.get("DEV", "broken") is None
+    assert cache.get("DEV", "unreadable") is None
@@ -0,0 +1,60 @@
+# tests/test_sheet_sources.py
+import os
+from dataclasses import replace
+
+import openpyxl
+import pytest
+
+import config as C
+from engine.run_context import RunContext
+from engine.runtime import set_ctx, new_datatable
+from engine.testplan_loader import load_test_plan, load_data_sheet
+from toolkit.sheet_sources import convert, read_sheet
+
+TESTPLAN = os.path.join(C.ROOT_DIR, "DemoData", "TestPlan.xlsx")
+
+
+def _load(source: str, test_name: str):
+    set_ctx(RunContext(dt=new_datatable(), config=replace(C.LOCAL_CONFIG, TESTPLANPATH=source)))
+    return load_test_plan(test_name), load_data_sheet(test_name)
+
+
+@pytest.mark.parametrize("extension", [".csv", ".jsonl", ".parquet"])
+def test_converted_plan_loads_same_steps_as_excel(tmp_path, extension):
+    if extension == ".parquet":
+        pytest.importorskip("pyarrow")
+    out_dir = str(tmp_path / "TestPlan")
+    written = convert(TESTPLAN, out_dir, extension)
+    assert {os.path.basename(p) for p in written} >= {f"TestDir{extension}", f"Fun001{extension}"}
+
+    for test_name in ("正常購物流程", "資料驅動購物流程"):
+        assert _load(out_dir, test_name) == _load(TESTPLAN, test_name)
+    assert read_sheet(out_dir, "Data001") == [
+        {k: (str(v) if extension == ".csv" and v is not None else v) for k, v in row.items()}
+        for row in read_sheet(TESTPLAN, "Data001")
+    ]
+
+
+def test_read_sheet_reports_missing_sheet(tmp_path):
+    convert(TESTPLAN, str(tmp_path), ".csv")
+    with pytest.raises(ValueError, match="不存在 sheet"):
+        read_sheet(str(tmp_path), "NoSuchSheet")
+
+
+def test_parquet_keeps_mixed_type_columns(tmp_path):
+    pytest.importorskip("pyarrow")
+    source = str(tmp_path / "Mixed.xlsx")
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    sheet.title = "Data001"
+    sheet.append(["Code", "Qty", "Empty"])
+    sheet.append(["A01", 1, None])
+    sheet.append([7, 2.5, None])
+    sheet.append([None, 3, None])
+    wb.save(source)
+
+    out_dir = str(tmp_path / "out")
+    convert(source, out_dir, ".parquet")
+
+    assert read_sheet(out_dir, "Data001") == read_sheet(source, "Data001")
+    assert [row["Code"] for row in read_sheet(out_dir, "Data001")] == ["A01", 7, None]
@@ -0,0 +1,140 @@
+# tests/test_table.py
+import pytest
+
+from toolkit import table as T
+from toolkit.datatable import DataTable
+from toolkit.table import TableAccessor, capture_table, clear_header_cache
+from toolkit.xpath import table_by_header
+
+
+class _TableDriver:
+    """以 Python list 模擬畫面上的 table，記錄每次 execute_script 與 current_url 讀取"""
+
+    def __init__(self, rows, url="http://127.0.0.1/list.html"):
+        self.rows = rows
+        self.url = url
+        self.scripts = []
+        self.url_reads = 0
+
+    @property
+    def current_url(self):
+        self.url_reads += 1
+        return self.url
+
+    def execute_script(self, script, by, value, *args):
+        self.scripts.append(script)
+        if script is T._READ_HEADER_JS:
+            return list(self.rows[0])
+        if script is T._READ_COLUMN_JS:
+            col, expected = args
+            if self.rows[0][col].strip() != expected:
+                return {"stale": True}
+            return [r[col] if col < len(r) else None for r in self.rows[1:]]
+        if script is T._READ_ROW_JS:
+            return {"header": list(self.rows[0]), "cells": list(self.rows[args[0]])}
+        if script is T._READ_ALL_JS:
+            return [list(r) for r in self.rows]
+        raise AssertionError(script)
+
+
+LOCATOR = table_by_header("文件類型")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_header_cache()
+    yield
+    clear_header_cache()
+
+
+def test_header_index_is_read_once_per_locator():
+    driver = _TableDriver([[" 文件類型 ", "狀態", "狀態"], ["A", "新", "x"]])
+    accessor = TableAccessor(driver, LOCATOR)
+
+    assert accessor.header_index() == {"文件類型": 1, "狀態": 2}   # 重複表頭取第一個
+    assert accessor.column_of("狀態") == 2
+    assert driver.scripts == [T._READ_HEADER_JS]
+
+
+def test_cached_lookups_make_no_browser_calls():
+    driver = _TableDriver([["文件類型", "狀態"], ["A", "新"]])
+    TableAccessor(driver, LOCATOR).header_index()
+    driver.scripts.clear()
+
+    accessor = TableAccessor(driver, LOCATOR)
+    for row in range(1, 1001):
+        accessor.cell_locator("狀態", row)
+        accessor.input_locator("狀態", row)
+        accessor.cell_in_table("文件類型", row)
+    accessor.invalidate()
+
+    assert driver.scripts == []
+    assert driver.url_reads == 0
+
+
+def test_cell_locators_check_header_of_cached_column():
+    driver = _TableDriver([["文件類型", "狀態"], ["A", "新"]])
+    accessor = TableAccessor(driver, LOCATOR)
+
+    by, xpath = accessor.cell_locator("狀態", 3)
+    assert by == "xpath"
+    assert xpath.startswith(LOCATOR[1] + "//tr[position()>1][3]/td[2][")
+    # 欄位換位置後找不到元素，而不是對到別欄
+    assert "(ancestor::table[1]//tr)[1]/*[2])=normalize-space('狀態')" in xpath
+
+    relative = accessor.cell_in_table("文件類型")[1]
+    assert relative.startswith(".//tr[position()>1][1]/td[1][")
+    assert relative.endswith("normalize-space('文件類型')]")
+
+    # 換頁 / 切換欄位後 invalidate 重讀表頭
+    driver.rows = [["狀態", "文件類型"], ["新", "A"]]
+    accessor.invalidate()
+    assert accessor.column_of("文件類型") == 2
+
+
+def test_cache_is_scoped_per_driver():
+    first = _TableDriver([["文件類型", "狀態"]])
+    second = _TableDriver([["狀態", "文件類型"]])
+
+    assert TableAccessor(first, LOCATOR).column_of("文件類型") == 1
+    assert TableAccessor(second, LOCATOR).column_of("文件類型") == 2
+
+    clear_header_cache(first)
+    TableAccessor(first, LOCATOR).header_index()
+    TableAccessor(second, LOCATOR).header_index()
+    assert first.scripts.count(T._READ_HEADER_JS) == 2
+    assert second.scripts.count(T._READ_HEADER_JS) == 1
+
+
+def test_read_column_rereads_header_when_columns_change_on_same_page():
+    driver = _TableDriver([["文件類型", "狀態"], ["A", "新"], ["B", "舊"]])
+    accessor = TableAccessor(driver, LOCATOR)
+    assert accessor.read_column("狀態") == ["新", "舊"]
+
+    # 同一頁切換欄位顯示：快取的索引已過期
+    driver.rows = [["狀態", "備註", "文件類型"], ["新", "", "A"], ["舊", "", "B"]]
+    assert accessor.read_column("文件類型") == ["A", "B"]
+    assert accessor.header_index() == {"狀態": 1, "備註": 2, "文件類型": 3}
+
+
+def test_read_row_uses_live_header():
+    driver = _TableDriver([["文件類型", "狀態"], ["A", " 新 "]])
+    accessor = TableAccessor(driver, LOCATOR)
+    accessor.header_index()
+
+    driver.rows = [["狀態", "文件類型"], ["舊", "B"]]
+    assert accessor.read_row(1) == {"狀態": "舊", "文件類型": "B"}
+    assert accessor.column_of("文件類型") == 2
+
+
+def test_capture_table_fills_datatable_and_rejects_unsupported_locator():
+    driver = _TableDriver([["文件類型", "狀態"], ["A", "新"], ["B"]])
+    dt = DataTable()
+
+    assert capture_table(driver, dt, "Captured", "文件類型") == 2
+    dt.set_current_row("Captured", 1)
+    assert dt.get_data("文件類型", "Captured") == "B"
+    assert dt.get_data("狀態", "Captured") == ""
+
+    with pytest.raises(ValueError):
+        TableAccessor(driver, ("id", "grid"))
@@ -0,0 +1,245 @@
+# toolkit/async_webdriver.py
+"""
+極簡的 asyncio 版 W3C WebDriver client。
+
+- 所有 session 共用同一個 aiohttp.ClientSession（keep-alive 連線池），
+  一個 event loop 就能同時驅動數十個 browser session
+- 只實作 Page Object / Action 會用到的指令，其餘需求可用 execute_script 補
+- locator 沿用 toolkit.types.Locator（By.ID / By.CSS_SELECTOR / By.XPATH ...）
+- current_url / text 與 Selenium 一樣是 property（回傳 awaitable），
+  toolkit.flow 的共用流程寫 `yield driver.current_url` 兩種模式都能用
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+
+import config as C
+from toolkit.deadline import DeadlineExceeded, clamp_timeout, current_deadline
+from toolkit.types import Locator
+
+if TYPE_CHECKING:
+    import aiohttp  # 只有 async runner 需要，同步流程不必安裝
+
+T = TypeVar("T")
+
+# W3C 規範的 element 識別 key
+_ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+# W3C 只支援 css / xpath / link text / tag name，其餘轉成 CSS
+_W3C_STRATEGIES = {By.CSS_SELECTOR, By.XPATH, By.LINK_TEXT, By.PARTIAL_LINK_TEXT, By.TAG_NAME}
+
+
+def _to_w3c(locator: Locator) -> Dict[str, str]:
+    by, value = locator
+    if by in _W3C_STRATEGIES:
+        return {"using": by, "value": value}
+    if by == By.ID:
+        return {"using": By.CSS_SELECTOR, "value": f'[id="{value}"]'}
+    if by == By.NAME:
+        return {"using": By.CSS_SELECTOR, "value": f'[name="{value}"]'}
+    if by == By.CLASS_NAME:
+        return {"using": By.CSS_SELECTOR, "value": f".{value}"}
+    raise ValueError(f"不支援的 locator 類型：{by}")
+
+
+def create_http_pool(limit: int = 100) -> "aiohttp.ClientSession":
+    """
+    建立共用的 HTTP 連線池。
+    同一個 chromedriver 的所有 session 都走這個 pool，連線會被 keep-alive 重用。
+    """
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(limit=limit, keepalive_timeout=60)
+    return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=120))
+
+
+class AsyncElement:
+    ASYNC = True  # toolkit.flow：以 asyncio 模式執行共用流程
+
+    def __init__(self, driver: "AsyncWebDriver", element_id: str):
+        self._driver = driver
+        self.id = element_id
+
+    async def click(self) -> None:
+        await self._driver.execute("POST", f"/element/{self.id}/click", {})
+
+    async def clear(self) -> None:
+        await self._driver.execute("POST", f"/element/{self.id}/clear", {})
+
+    async def send_keys(self, text: str) -> None:
+        await self._driver.execute("POST", f"/element/{self.id}/value", {"text": str(text)})
+
+    @property
+    def text(self) -> Awaitable[str]:
+        return self._driver.execute("GET", f"/element/{self.id}/text")
+
+    async def is_displayed(self) -> bool:
+        # W3C 沒有 displayed 端點，chromedriver 仍保留這個相容路徑
+        return await self._driver.execute("GET", f"/element/{self.id}/displayed")
+
+    async def is_enabled(self) -> bool:
+        return await self._driver.execute("GET", f"/element/{self.id}/enabled")
+
+    async def find_element(self, locator: Locator) -> "AsyncElement":
+        value = await self._driver.execute("POST", f"/element/{self.id}/element", _to_w3c(locator))
+        return AsyncElement(self._driver, value[_ELEMENT_KEY])
+
+    async def find_elements(self, locator: Locator) -> List["AsyncElement"]:
+        values = await self._driver.execute("POST", f"/element/{self.id}/elements", _to_w3c(locator))
+        return [AsyncElement(self._driver, v[_ELEMENT_KEY]) for v in values]
+
+
+class AsyncWebDriver:
+    """
+    單一 browser session。
+    executor_url 為 chromedriver 的位址（例如 http://127.0.0.1:9515）。
+    """
+    ASYNC = True
+
+    def __init__(self, http: "aiohttp.ClientSession", executor_url: str):
+        self._http = http
+        self._base = executor_url.rstrip("/")
+        self.session_id: Optional[str] = None
+
+    async def start(self, capabilities: Dict[str, Any]) -> "AsyncWebDriver":
+        payload = {"capabilities": {"alwaysMatch": capabilities}}
+        value = await self._request("POST", f"{self._base}/session", payload)
+        self.session_id = value["sessionId"]
+        return self
+
+    async def quit(self) -> None:
+        if self.session_id is None:
+            return
+        try:
+            await self.execute("DELETE", "")
+        finally:
+            self.session_id = None
+
+    async def execute(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Any:
+        if self.session_id is None:
+            raise WebDriverException("session 尚未建立或已關閉")
+        return await self._request(method, f"{self._base}/session/{self.session_id}{path}", payload)
+
+    async def _request(self, method: str, url: str, payload: Optional[Dict[str, Any]]) -> Any:
+        async with self._http.request(method, url, json=payload) as resp:
+            body = await resp.json(content_type=None)
+        value = (body or {}).get("value")
+        if resp.status >= 400:
+            error = value.get("error", "") if isinstance(value, dict) else ""
+            message = value.get("message", "") if isinstance(value, dict) else str(value)
+            if error == "timeout":
+                raise TimeoutException(message)
+            raise WebDriverException(f"{error}: {message}")
+        return value
+
+    # === 導頁 / 狀態 ===
+
+    async def get(self, url: str) -> None:
+        await self.execute("POST", "/url", {"url": url})
+
+    @property
+    def current_url(self) -> Awaitable[str]:
+        return self.execute("GET", "/url")
+
+    async def execute_script(self, script: str, *args: Any) -> Any:
+        return await self.execute("POST", "/execute/sync", {"script": script, "args": list(args)})
+
+    async def execute_cdp_cmd(self, cmd: str, params: Dict[str, Any]) -> Any:
+        """chromedriver 的 CDP 轉送端點，等同 Selenium 的 driver.execute_cdp_cmd"""
+        return await self.execute("POST", "/goog/cdp/execute", {"cmd": cmd, "params": params})
+
+    async def get_cookies(self) -> List[Dict[str, Any]]:
+        return await self.execute("GET", "/cookie")
+
+    async def add_cookie(self, cookie: Dict[str, Any]) -> None:
+        await self.execute("POST", "/cookie", {"cookie": cookie})
+
+    async def delete_all_cookies(self) -> None:
+        await self.execute("DELETE", "/cookie")
+
+    # === 找元素 ===
+
+    async def find_element(self, locator: Locator) -> AsyncElement:
+        value = await self.execute("POST", "/element", _to_w3c(locator))
+        return AsyncElement(self, value[_ELEMENT_KEY])
+
+    async def find_elements(self, locator: Locator) -> List[AsyncElement]:
+        values = await self.execute("POST", "/elements", _to_w3c(locator))
+        return [AsyncElement(self, v[_ELEMENT_KEY]) for v in values]
+
+
+class AsyncWait:
+    """
+    asyncio 版 WebDriverWait：輪詢條件直到回傳 truthy 值或逾時。
+    輪詢期間 await sleep，讓出 event loop 給其他 session。
+    """
+
+    def __init__(self, driver: AsyncWebDriver, timeout: float = C.DEFAULT_TIMEOUT, poll: float = 0.2):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll = poll
+
+    async def until(self, condition: Callable[[AsyncWebDriver], Awaitable[T]], timeout: Optional[float] = None) -> T:
+        requested = self.timeout if timeout is None else timeout
+        # 不超過目前 deadline 的剩餘預算
+        budget = clamp_timeout(requested)
+        end = time.monotonic() + budget
+        last_error: Optional[Exception] = None
+        while True:
+            try:
+                value = await condition(self.driver)
+                if value:
+                    return value
+            except WebDriverException as e:
+                # 找不到元素 / stale 等暫時狀態：繼續等
+                last_error = e
+            if time.monotonic() >= end:
+                if budget < requested:
+                    raise DeadlineExceeded(current_deadline())
+                raise TimeoutException(last_error.msg if last_error else "等待逾時")
+            await asyncio.sleep(self.poll)
+
+
+# === 常用條件（對應 selenium expected_conditions） ===
+
+def visibility_of_element_located(locator: Locator):
+    async def condition(driver: AsyncWebDriver):
+        elem = await driver.find_element(locator)
+        return elem if await elem.is_displayed() else None
+    return condition
+
+
+def visibility_of_all_elements_located(locator: Locator):
+    async def condition(driver: AsyncWebDriver):
+        elems = await driver.find_elements(locator)
+        if not elems:
+            return None
+        for elem in elems:
+            if not await elem.is_displayed():
+                return None
+        return elems
+    return condition
+
+
+def element_to_be_clickable(locator: Locator):
+    async def condition(driver: AsyncWebDriver):
+        elem = await driver.find_element(locator)
+        return elem if await elem.is_displayed() and await elem.is_enabled() else None
+    return condition
+
+
+def url_contains(expected: str):
+    async def condition(driver: AsyncWebDriver):
+        return expected in await driver.current_url
+    return condition
+
+
+def url_to_be(expected: str):
+    async def condition(driver: AsyncWebDriver):
+        return await driver.current_url == expected
+    return condition
@@ -1,7 +1,16 @@
 # toolkit/datatable.py
 from __future__ import annotations
 
-from typing import Any, Dict, List, Iterator, Tuple
+import hashlib
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Iterator, Optional, Sequence, Tuple
 from openpyxl import load_workbook
 
 from toolkit.funlib import normalize
@@ -12,11 +21,34 @@ class SheetData:
     封裝單一 Sheet 的資料列集合。
     每一列是一個 dict：{欄位名稱: 值}
     current_index 表示目前「游標」所在的列。
+
+    DataTable 超過記憶體預算時只會釋放列資料（rows），物件本身與游標不變；
+    之後第一次存取 rows 時透過 loader 重新載入，先前取得的參照照常可用。
     """
 
     def __init__(self, rows: List[Dict[str, Any]]):
-        self.rows = rows
+        self._rows: Optional[List[Dict[str, Any]]] = rows
+        self._loader: Optional[Callable[[], List[Dict[str, Any]]]] = None
         self.current_index = 0
+        # add_parameter 寫入過的 sheet 視為已修改，DataTable 不會把它移出記憶體
+        self.dirty = False
+
+    @property
+    def rows(self) -> List[Dict[str, Any]]:
+        if self._rows is None:
+            rows = self._loader()
+            self._rows, self._loader = rows, None
+            if rows and self.current_index >= len(rows):
+                # 來源檔在移出期間變短
+                self.current_index = len(rows) - 1
+        return self._rows
+
+    @property
+    def loaded(self) -> bool:
+        return self._rows is not None
+
+    def _unload(self, loader: Callable[[], List[Dict[str, Any]]]) -> None:
+        self._rows, self._loader = None, loader
 
     @property
     def row_count(self) -> int:
@@ -38,6 +70,7 @@ class SheetData:
         return self.current_index
 
     def add_parameter(self, col_name: str, value: Any | None = None) -> None:
+        self.dirty = True
         for row in self.rows:
             if col_name not in row:
                 row[col_name] = ""
@@ -53,14 +86,53 @@ class SheetData:
         return False
 
 
+def _estimate_size(rows: List[Dict[str, Any]]) -> int:
+    """
+    估算列資料佔用的記憶體（bytes）。
+    欄位名稱字串在各列間共用，只計算 list / dict 本身與值。
+    """
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        for value in row.values():
+            size += sys.getsizeof(value)
+    return size
+
+
+# (file_path, sheet_name) -> 列資料；DataTable 預設直接讀 Excel，daemon 會換成記憶體快取
+SheetReader = Callable[[str, str], List[Dict[str, Any]]]
+
+
+@dataclass
+class _EvictedSheet:
+    """列資料已從記憶體移出的 sheet：記錄重新載入的方式（游標留在 SheetData 上）"""
+    source: Optional[Tuple[str, str]] = None   # (file_path, sheet_name)
+    spill_path: Optional[str] = None            # 無來源檔的 sheet，暫存成 pickle
+
+
 class DataTable:
     """
     管理多個 SheetData，提供類似 UFT DataTable 的操作體驗。
     以 alias 作為每個 Sheet 的識別名稱。
+
+    max_bytes（選填）：記憶體預算。超過時以 LRU 順序把「未修改」sheet 的列資料移出記憶體，
+    再次存取時自動從來源 Excel（或暫存檔）重新載入；add_parameter 修改過的 sheet 不會被移出。
+    移出的只有列資料，get_sheet 取得的 SheetData 物件、游標與參照都不受影響。
+
+    reader（選填）：讀取來源 sheet 的函式，預設為直接讀 Excel。
     """
 
-    def __init__(self):
-        self._sheets: Dict[str, SheetData] = {}
+    def __init__(self, max_bytes: Optional[int] = None, reader: Optional[SheetReader] = None):
+        self.max_bytes = max_bytes
+        self.reader: SheetReader = reader or read_excel_sheet
+        # 所有 sheet（含列資料已移出的），順序 = 最近使用順序
+        self._sheets: "OrderedDict[str, SheetData]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}              # 列資料在記憶體中的 sheet
+        self._sources: Dict[str, Tuple[str, str]] = {}
+        self._evicted: Dict[str, _EvictedSheet] = {}
+        self._spill_dir: Optional[str] = None
+        self.evictions = 0
+        self.reloads = 0
 
     def add_sheet_from_excel(self, alias: str, file_path: str, sheet_name: str) -> None:
         """
@@ -69,50 +141,317 @@ class DataTable:
         - 第二列開始為資料列
         alias 重複載入将直接覆盖原本资料
         """
-        wb = load_workbook(file_path, data_only=True)
-        if sheet_name not in wb.sheetnames:
-            raise ValueError(f"Excel 不存在分頁：'{sheet_name}' (file='{file_path}')")
-
-        ws = wb[sheet_name]
-
-        # 第一列當欄位名稱（normalize 防 None/空白）
-        header_cells = next(ws.iter_rows(min_row=1, max_row=1))
-        headers: List[str] = [normalize(c.value) for c in header_cells]
-
-        # 欄位名稱防呆：不可空、不可重複
-        seen: set[str] = set()
-        for h in headers:
-            if not h:
-                raise ValueError(f"{sheet_name} sheet 錯誤：欄位名稱不可為空白")
-            if h in seen:
-                raise ValueError(f"{sheet_name} sheet 錯誤：欄位名稱重複：'{h}'")
-            seen.add(h)
+        rows = self.reader(file_path, sheet_name)
+        self._store(alias, SheetData(rows), source=(file_path, sheet_name))
 
-        rows: List[Dict[str, Any]] = []
-        for row_cells in ws.iter_rows(min_row=2):
-            data: Dict[str, Any] = {}
-            for header, cell in zip(headers, row_cells):
-                data[header] = cell.value
-            rows.append(data)
+    def add_sheet_from_rows(self, alias: str, rows: List[Dict[str, Any]]) -> None:
+        """
+        直接以列資料建立 sheet（例如從畫面擷取的 table）。
+        alias 重複會覆蓋原本資料。
+        """
+        self._store(alias, SheetData(rows))
 
-        self._sheets[alias] = SheetData(rows)
+    def clone(self) -> "DataTable":
+        """
+        複製一份獨立的 DataTable（列資料逐列複製，add_parameter 不會互相影響）。
+        用於「plan 只解析一次，多個執行環境各自使用」的情境。
+        已被移出記憶體的 sheet 只複製重新載入的方式，不會為了複製而載回。
+        """
+        other = DataTable(max_bytes=self.max_bytes, reader=self.reader)
+        for alias, sheet in self._sheets.items():
+            evicted = self._evicted.get(alias)
+            if evicted is not None and evicted.source is not None:
+                copy = SheetData([])
+                other._sheets[alias] = copy
+                other._sources[alias] = evicted.source
+                other._mark_evicted(alias, copy, _EvictedSheet(source=evicted.source))
+            else:
+                rows = self._load_spill(evicted) if evicted is not None else sheet.rows
+                copy = SheetData([dict(row) for row in rows])
+                copy.dirty = sheet.dirty
+                other._store(alias, copy, source=self._sources.get(alias))
+            copy.current_index = sheet.current_index
+        return other
 
     def get_sheet(self, sheet: str) -> SheetData:
-        return self._sheets[sheet]
+        return self._touch(sheet)
 
     def has_sheet(self, sheet_name: str) -> bool:
         return sheet_name in self._sheets
 
+    def aliases(self) -> List[str]:
+        """所有 sheet 的 alias（含已移出記憶體的）"""
+        return list(self._sheets)
+
+    def dirty_aliases(self) -> List[str]:
+        """add_parameter 寫過的 sheet（這類 sheet 不會被移出記憶體）"""
+        return [alias for alias, sheet in self._sheets.items() if sheet.dirty]
+
     def get_sheet_count(self) -> int:
         return len(self._sheets)
 
     def get_data(self, col_name: str, sheet: str) -> Any:
-        return self._sheets[sheet].get(col_name)
+        return self._touch(sheet).get(col_name)
+
+    def get_row_count(self, sheet: str) -> int:
+        return self._touch(sheet).row_count
+
+    def get_row_data(self, sheet: str) -> Dict[str, Any]:
+        """游標所在的整列資料"""
+        return self._touch(sheet).current_row
 
     def set_current_row(self, sheet: str, index: int = 0) -> None:
-        self._sheets[sheet].set_current_row(index)
+        self._touch(sheet).set_current_row(index)
 
     def iter_rows(self, sheet: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
-        sheet_data = self._sheets[sheet]
+        sheet_data = self._touch(sheet)
         for i, row in enumerate(sheet_data.rows):
             yield i, row
+
+    # === 記憶體預算 / LRU ===
+
+    @property
+    def memory_bytes(self) -> int:
+        """目前留在記憶體的 sheet 估算大小"""
+        return sum(self._sizes.values())
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sheets_in_memory": len(self._sizes),
+            "sheets_evicted": len(self._evicted),
+            "memory_bytes": self.memory_bytes,
+            "evictions": self.evictions,
+            "reloads": self.reloads,
+        }
+
+    def _store(self, alias: str, sheet: SheetData, source: Optional[Tuple[str, str]] = None) -> None:
+        # alias 覆蓋：舊物件若列資料已移出，之後由它自己的 loader 直接從來源載入，不再計入預算
+        self._evicted.pop(alias, None)
+        self._sheets.pop(alias, None)
+        self._sheets[alias] = sheet
+        self._sheets.move_to_end(alias)
+        self._sizes[alias] = _estimate_size(sheet.rows)
+        if source is not None:
+            self._sources[alias] = source
+        else:
+            self._sources.pop(alias, None)
+        self._enforce_budget(keep=alias)
+
+    def _touch(self, alias: str) -> SheetData:
+        sheet = self._sheets.get(alias)
+        if sheet is None:
+            raise KeyError(alias)
+        self._sheets.move_to_end(alias)
+        return sheet
+
+    def _enforce_budget(self, keep: str) -> None:
+        if self.max_bytes is None:
+            return
+        for alias in list(self._sheets):
+            if self.memory_bytes <= self.max_bytes:
+                return
+            sheet = self._sheets[alias]
+            if alias == keep or sheet.dirty or alias not in self._sizes:
+                continue
+            self._evict(alias, sheet)
+
+    def _evict(self, alias: str, sheet: SheetData) -> None:
+        source = self._sources.get(alias)
+        evicted = _EvictedSheet(source=source)
+        if source is None:
+            evicted.spill_path = self._spill(alias, sheet.rows)
+        del self._sizes[alias]
+        self._mark_evicted(alias, sheet, evicted)
+        self.evictions += 1
+
+    def _mark_evicted(self, alias: str, sheet: SheetData, evicted: _EvictedSheet) -> None:
+        """釋放 sheet 的列資料，第一次再存取 rows 時由 _reload 載回"""
+        self._evicted[alias] = evicted
+        ref = weakref.ref(self)
+        reader = self.reader
+
+        def load() -> List[Dict[str, Any]]:
+            dt = ref()
+            if dt is not None and dt._evicted.get(alias) is evicted:
+                return dt._reload(alias, evicted)
+            # DataTable 已回收或 alias 已被覆蓋：直接從來源載入
+            return reader(*evicted.source) if evicted.source else DataTable._load_spill(evicted)
+
+        sheet._unload(load)
+
+    def _reload(self, alias: str, evicted: _EvictedSheet) -> List[Dict[str, Any]]:
+        rows = self.reader(*evicted.source) if evicted.source else self._load_spill(evicted)
+        self._drop_evicted(alias)
+        self._sheets.move_to_end(alias)
+        self._sizes[alias] = _estimate_size(rows)
+        self.reloads += 1
+        self._enforce_budget(keep=alias)
+        return rows
+
+    def _spill(self, alias: str, rows: List[Dict[str, Any]]) -> str:
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="datatable-")
+            # DataTable 被回收時一併刪除暫存檔
+            weakref.finalize(self, shutil.rmtree, self._spill_dir, True)
+        name = hashlib.sha1(alias.encode("utf-8")).hexdigest()
+        path = os.path.join(self._spill_dir, f"{name}.pickle")
+        with open(path, "wb") as f:
+            pickle.dump(rows, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return path
+
+    @staticmethod
+    def _load_spill(evicted: _EvictedSheet) -> List[Dict[str, Any]]:
+        with open(evicted.spill_path, "rb") as f:
+            return pickle.load(f)
+
+    def _drop_evicted(self, alias: str) -> None:
+        evicted = self._evicted.pop(alias, None)
+        if evicted is not None and evicted.spill_path:
+            try:
+                os.remove(evicted.spill_path)
+            except FileNotFoundError:
+                pass
+
+
+def read_excel_sheet(file_path: str, sheet_name: str) -> List[Dict[str, Any]]:
+    # read-only 模式只解析需要的 sheet，不必把整本載入記憶體
+    wb = load_workbook(file_path, data_only=True, read_only=True)
+    try:
+        if sheet_name not in wb.sheetnames:
+            raise ValueError(f"Excel 不存在分頁：'{sheet_name}' (file='{file_path}')")
+        return rows_from_values(wb[sheet_name].iter_rows(values_only=True), sheet_name)
+    finally:
+        wb.close()
+
+
+def read_excel_workbook(file_path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    一次讀出整本 Excel 的所有 sheet：{sheet 名稱: 列資料}。
+    以 read-only 模式開檔，只走訪一次，適合需要整本快取的情境（例如 engine.daemon）。
+    """
+    wb = load_workbook(file_path, data_only=True, read_only=True)
+    try:
+        return {name: rows_from_values(wb[name].iter_rows(values_only=True), name) for name in wb.sheetnames}
+    finally:
+        wb.close()
+
+
+def rows_from_values(values: Iterable[Sequence[Any]], sheet_name: str) -> List[Dict[str, Any]]:
+    """
+    表格資料（第一列為欄位名稱）→ 列資料。
+    Excel 以外的來源（toolkit/sheet_sources.py）也走這裡，欄位檢查規則一致。
+    """
+    values = iter(values)
+
+    # 第一列當欄位名稱（normalize 防 None/空白）
+    headers: List[str] = [normalize(v) for v in next(values, ())]
+
+    # 欄位名稱防呆：不可空、不可重複
+    seen: set[str] = set()
+    for h in headers:
+        if not h:
+            raise ValueError(f"{sheet_name} sheet 錯誤：欄位名稱不可為空白")
+        if h in seen:
+            raise ValueError(f"{sheet_name} sheet 錯誤：欄位名稱重複：'{h}'")
+        seen.add(h)
+
+    rows: List[Dict[str, Any]] = []
+    for row_values in values:
+        # read-only 模式下，尾端空白儲存格不會出現在 row_values 中
+        data: Dict[str, Any] = dict.fromkeys(headers)
+        for header, value in zip(headers, row_values):
+            data[header] = value
+        rows.append(data)
+    return rows
+
+
+# === Sheet 比對 ===
+
+@dataclass
+class CellMismatch:
+    key: Tuple[str, ...]
+    column: str
+    expected: str
+    actual: str
+
+
+@dataclass
+class SheetDiff:
+    """
+    兩個 sheet 依 key 欄位比對的結果，只保留有差異的部分。
+    """
+    key_cols: Tuple[str, ...]
+    missing_keys: List[Tuple[str, ...]] = field(default_factory=list)  # 預期有、實際沒有
+    extra_keys: List[Tuple[str, ...]] = field(default_factory=list)    # 實際有、預期沒有
+    mismatches: List[CellMismatch] = field(default_factory=list)
+
+    @property
+    def is_equal(self) -> bool:
+        return not (self.missing_keys or self.extra_keys or self.mismatches)
+
+    def summary(self, limit: int = 20) -> str:
+        lines = [f"缺少 {len(self.missing_keys)} 列、多出 {len(self.extra_keys)} 列、"
+                 f"{len(self.mismatches)} 格不一致"]
+        lines += [f"  缺少 {k}" for k in self.missing_keys[:limit]]
+        lines += [f"  多出 {k}" for k in self.extra_keys[:limit]]
+        lines += [f"  {m.key} [{m.column}] 預期='{m.expected}' 實際='{m.actual}'"
+                  for m in self.mismatches[:limit]]
+        return "\n".join(lines)
+
+
+def _cell_text(value: Any) -> str:
+    """
+    比對用的正規化：Excel 讀到的數值與畫面文字統一成字串。
+    例如 Excel 的 3.0 與畫面的 "3" 視為相同。
+    """
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return normalize(value)
+
+
+def _row_digest(values: Sequence[str]) -> bytes:
+    return hashlib.blake2b("\x1f".join(values).encode("utf-8"), digest_size=16).digest()
+
+
+def compare_sheets(actual: SheetData,
+                   expected: SheetData,
+                   key_cols: Sequence[str],
+                   compare_cols: Optional[Sequence[str]] = None) -> SheetDiff:
+    """
+    以 key 欄位對齊兩個 sheet，逐列比較其餘欄位。
+    - 先比較整列的 hash，相同就略過；只有 hash 不同的列才逐格找出差異
+    - compare_cols 不指定時使用 expected 第一列的所有欄位（扣掉 key 欄位）
+    - key 重複時以第一筆為準
+    """
+    key_cols = tuple(key_cols)
+    if compare_cols is None:
+        compare_cols = [c for c in (expected.rows[0] if expected.rows else {}) if c not in key_cols]
+    compare_cols = tuple(compare_cols)
+
+    def index(sheet: SheetData) -> Dict[Tuple[str, ...], Tuple[bytes, Tuple[str, ...]]]:
+        out: Dict[Tuple[str, ...], Tuple[bytes, Tuple[str, ...]]] = {}
+        for row in sheet.rows:
+            key = tuple(_cell_text(row.get(c)) for c in key_cols)
+            if not any(key) or key in out:
+                continue
+            values = tuple(_cell_text(row.get(c)) for c in compare_cols)
+            out[key] = (_row_digest(values), values)
+        return out
+
+    actual_index = index(actual)
+    expected_index = index(expected)
+
+    diff = SheetDiff(key_cols=key_cols)
+    for key, (digest, expected_values) in expected_index.items():
+        found = actual_index.get(key)
+        if found is None:
+            diff.missing_keys.append(key)
+            continue
+        if found[0] == digest:
+            continue
+        for col, exp, act in zip(compare_cols, expected_values, found[1]):
+            if exp != act:
+                diff.mismatches.append(CellMismatch(key=key, column=col, expected=exp, actual=act))
+
+    diff.extra_keys = [key for key in actual_index if key not in expected_index]
+    return diff
@@ -0,0 +1,115 @@
+# toolkit/deadline.py
+"""
+時間預算（Deadline）傳遞與 watchdog。
+
+- deadline_scope(label, seconds)：進入後目前的執行緒 / task 帶著一個 deadline（ContextVar），可巢狀
+  （測試層級包住步驟層級，生效的是最早到期的那一個）
+- 所有等待（web_toolkit 的 DeadlineWait、wait_for_url、AsyncWait）都以 clamp_timeout 取
+  min(原本 timeout, 剩餘預算)；預算用完時丟 DeadlineExceeded，不會再等滿 DEFAULT_TIMEOUT
+- 指定 on_expire 時另外啟動 watchdog：超過 deadline + WATCHDOG_GRACE 秒仍未結束
+  （例如卡在不會逾時的 driver.get），呼叫 on_expire（通常是關掉 browser），
+  讓卡住的 WebDriver 呼叫立刻失敗、釋放 worker
+
+DeadlineExceeded 不屬於 WebDriverException，checkpoint 的 RetryPolicy 不會重試。
+"""
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional, Tuple
+
+from selenium.common.exceptions import WebDriverException
+
+import config as C
+from toolkit.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class Deadline:
+    label: str
+    seconds: float
+    expires_at: float  # time.monotonic()
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+
+class DeadlineExceeded(TimeoutError):
+    """測試 / 步驟超過時間預算"""
+
+    def __init__(self, deadline: Deadline):
+        super().__init__(f"{deadline.label} 超過時間預算 {deadline.seconds:g} 秒")
+        self.deadline = deadline
+
+
+_active: ContextVar[Tuple[Deadline, ...]] = ContextVar("deadlines", default=())
+
+
+def current_deadline() -> Optional[Deadline]:
+    """目前生效（最早到期）的 deadline；沒有設定時為 None"""
+    active = _active.get()
+    return min(active, key=lambda d: d.expires_at) if active else None
+
+
+def check_deadline() -> None:
+    """預算已用完就丟 DeadlineExceeded"""
+    deadline = current_deadline()
+    if deadline is not None and deadline.remaining() <= 0:
+        raise DeadlineExceeded(deadline)
+
+
+def clamp_timeout(timeout: float) -> float:
+    """等待時間不超過剩餘預算；預算已用完時丟 DeadlineExceeded"""
+    deadline = current_deadline()
+    if deadline is None:
+        return timeout
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded(deadline)
+    return min(timeout, remaining)
+
+
+@contextmanager
+def deadline_scope(label: str, seconds: Optional[float],
+                   on_expire: Optional[Callable[[], None]] = None,
+                   grace: float = C.WATCHDOG_GRACE) -> Iterator[Optional[Deadline]]:
+    """
+    seconds 為 None / 0 時不設限。
+    deadline 過後，因 browser 被 watchdog 關掉而出現的 WebDriverException 會轉成 DeadlineExceeded。
+    """
+    if not seconds:
+        yield None
+        return
+
+    deadline = Deadline(label=label, seconds=seconds, expires_at=time.monotonic() + seconds)
+    token = _active.set(_active.get() + (deadline,))
+    fired = threading.Event()
+
+    def fire() -> None:
+        fired.set()
+        logger.error(f"{label} 超過時間預算 {seconds:g} 秒仍未結束，watchdog 強制中止")
+        try:
+            on_expire()
+        except Exception:
+            logger.warning("watchdog 中止失敗", exc_info=True)
+
+    timer: Optional[threading.Timer] = None
+    if on_expire is not None:
+        timer = threading.Timer(seconds + grace, fire)
+        timer.daemon = True
+        timer.start()
+    try:
+        yield deadline
+    except WebDriverException as e:
+        if fired.is_set() or deadline.remaining() <= 0:
+            raise DeadlineExceeded(deadline) from e
+        raise
+    finally:
+        if timer is not None:
+            timer.cancel()
+        _active.reset(token)
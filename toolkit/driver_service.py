@@ -0,0 +1,179 @@
+# toolkit/driver_service.py
+"""
+共用 chromedriver service：一台機器上只開一個（或少數幾個）chromedriver process，
+所有 Browser 的 session 都掛在上面，不再每個 Browser 各開一個 chromedriver。
+
+- create_driver 透過 DriverServicePool.attach() 取得一個「掛在共用 process 上」的 Service：
+  webdriver.Chrome 仍照常建立（keep-alive 連線、execute_cdp_cmd 都能用），
+  但 start() 只確認共用 process 還活著，quit() 時也不會把共用 process 關掉
+- 每次 attach 前檢查 process 是否存活 / 可連線，掛掉就自動重啟（已在上面的 session 會隨之失效，
+  由 Browser.is_alive() / restart() 處理）
+- 多個 process 時（DRIVER_SERVICES=N），新 session 掛到目前 session 最少的那一個
+- 程式結束時（atexit）關閉所有共用 process
+
+SHARED_DRIVER_SERVICE=false 可退回「每個 Browser 各自一個 chromedriver」。
+"""
+from __future__ import annotations
+
+import atexit
+import functools
+import threading
+from typing import Dict, List, Optional
+
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+import config as C
+from toolkit.governor import owner_env
+from toolkit.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@functools.lru_cache(maxsize=1)
+def driver_path() -> str:
+    """chromedriver 路徑（webdriver-manager 只查一次）"""
+    return ChromeDriverManager().install()
+
+
+class _AttachedService(Service):
+    """
+    掛在 SharedDriverService 上的 Service。
+    webdriver.Chrome 會呼叫 start() / stop()，這裡改成「確認共用 process」與「登出 session 計數」。
+    """
+
+    def __init__(self, owner: "SharedDriverService"):
+        super().__init__(executable_path=owner.executable_path, port=owner.port)
+        self._owner = owner
+        self._attached = False
+
+    def start(self) -> None:
+        self._owner.ensure_running()
+        self._owner.register()
+        self.port = self._owner.port
+        self.process = self._owner.process
+        self._attached = True
+
+    def stop(self) -> None:
+        if self._attached:
+            self._attached = False
+            self._owner.release()
+
+
+class SharedDriverService:
+    """一個 chromedriver process，供多個 session 共用"""
+
+    def __init__(self, name: str, executable_path: Optional[str] = None):
+        self.name = name
+        self.executable_path = executable_path or driver_path()
+        self._service: Optional[Service] = None
+        self._lock = threading.Lock()
+        self.active_sessions = 0
+        self.total_sessions = 0
+        self.restarts = 0
+
+    @property
+    def port(self) -> int:
+        return self._service.port if self._service is not None else 0
+
+    @property
+    def process(self):
+        return self._service.process if self._service is not None else None
+
+    @property
+    def service_url(self) -> str:
+        return self.ensure_running()
+
+    def is_healthy(self) -> bool:
+        service = self._service
+        if service is None or service.process is None or service.process.poll() is not None:
+            return False
+        return service.is_connectable()
+
+    def ensure_running(self) -> str:
+        """確認 process 存活，必要時（重新）啟動；回傳 service URL"""
+        with self._lock:
+            if not self.is_healthy():
+                if self._service is not None:
+                    self.restarts += 1
+                    logger.warning(f"chromedriver [{self.name}] 已停止回應，重新啟動"
+                                   f"（第 {self.restarts} 次，掛在上面的 session 會失效）")
+                    self._stop_process()
+                # 標記 owner pid：本 process 被強制結束時，下次執行可辨認並清掉殘留的 chromedriver / Chrome
+                self._service = Service(executable_path=self.executable_path, env=owner_env())
+                self._service.start()
+                logger.info(f"chromedriver [{self.name}] 已啟動：{self._service.service_url}"
+                            f"（pid {self._service.process.pid}）")
+            return self._service.service_url
+
+    def attach(self) -> Service:
+        """取得給 webdriver.Chrome(service=...) 使用的 Service"""
+        return _AttachedService(self)
+
+    def register(self) -> None:
+        with self._lock:
+            self.active_sessions += 1
+            self.total_sessions += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self.active_sessions = max(self.active_sessions - 1, 0)
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stop_process()
+
+    def _stop_process(self) -> None:
+        if self._service is None:
+            return
+        try:
+            self._service.stop()
+        except Exception:
+            logger.warning(f"關閉 chromedriver [{self.name}] 失敗")
+        self._service = None
+
+
+class DriverServicePool:
+    """同一台機器上的共用 chromedriver process 集合"""
+
+    def __init__(self, size: int = C.DRIVER_SERVICES):
+        self.services: List[SharedDriverService] = [
+            SharedDriverService(name=f"svc-{i + 1}") for i in range(max(size, 1))
+        ]
+        self._lock = threading.Lock()
+
+    def pick(self) -> SharedDriverService:
+        """目前 session 最少的 process"""
+        with self._lock:
+            return min(self.services, key=lambda s: s.active_sessions)
+
+    def attach(self) -> Service:
+        return self.pick().attach()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            s.name: {
+                "active_sessions": s.active_sessions,
+                "total_sessions": s.total_sessions,
+                "restarts": s.restarts,
+            }
+            for s in self.services
+        }
+
+    def stop_all(self) -> None:
+        for service in self.services:
+            service.stop()
+
+
+_pool: Optional[DriverServicePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_services() -> DriverServicePool:
+    """整個 process 共用的 DriverServicePool（第一次使用時建立，結束時自動關閉）"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverServicePool()
+            atexit.register(_pool.stop_all)
+        return _pool
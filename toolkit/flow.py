@@ -0,0 +1,89 @@
+# toolkit/flow.py
+"""
+同步 / asyncio 共用的流程寫法：Page Object / Action / toolkit 的邏輯只寫一次。
+
+流程寫成 generator，每個會碰到 driver 的呼叫前面加 yield：
+
+    @flow
+    def login(self, username, password):
+        yield self.type(self.USERNAME_INPUT, username)
+        yield self.click(self.LOGIN_BUTTON)
+
+- 第一個參數（self 或 driver）的 ASYNC 為 False（Selenium / BasePage）：
+  呼叫時直接執行完，yield 出來的已經是結果，原樣送回 generator
+- ASYNC 為 True（AsyncWebDriver / AsyncBasePage / AsyncBrowser）：
+  呼叫後得到 coroutine，yield 出來的 awaitable 逐一 await 後送回
+- await 時發生的例外會丟回 generator，流程內的 try / except 兩種模式行為一致
+
+忘了加 yield 的呼叫在同步模式下照常執行，asyncio 模式下只會建立 coroutine 而不執行，
+所以新增流程時兩種模式都要有測試覆蓋（tests/test_async_runner.py）。
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+from typing import Any, Callable, Generator
+
+FlowGen = Generator[Any, Any, Any]
+
+
+def is_async(owner: Any) -> bool:
+    return getattr(owner, "ASYNC", False)
+
+
+def run_sync(gen: FlowGen) -> Any:
+    value = None
+    while True:
+        try:
+            value = gen.send(value)
+        except StopIteration as stop:
+            return stop.value
+
+
+async def run_async(gen: FlowGen) -> Any:
+    value: Any = None
+    error: BaseException | None = None
+    while True:
+        try:
+            pending = gen.throw(error) if error is not None else gen.send(value)
+        except StopIteration as stop:
+            return stop.value
+        value, error = None, None
+        try:
+            value = await pending if inspect.isawaitable(pending) else pending
+        except Exception as e:
+            error = e
+
+
+class flow:
+    """
+    把 generator 流程包成「依 owner 決定同步執行或回傳 coroutine」的函式。
+    當作方法使用時，asyncio 物件取到的是真正的 coroutine function
+    （inspect.iscoroutinefunction 為 True，async runner 會直接 await）。
+    """
+
+    def __init__(self, func: Callable[..., FlowGen]):
+        if not inspect.isgeneratorfunction(func):
+            raise TypeError(f"@flow 只能用在 generator function：{func.__qualname__}")
+        self.func = func
+        functools.update_wrapper(self, func)
+
+    def __call__(self, owner: Any, *args: Any, **kwargs: Any) -> Any:
+        gen = self.func(owner, *args, **kwargs)
+        return run_async(gen) if is_async(owner) else run_sync(gen)
+
+    def __get__(self, instance: Any, owner: type | None = None) -> Any:
+        if instance is None:
+            return self
+        func = self.func
+
+        if is_async(instance):
+            @functools.wraps(func)
+            async def bound_async(*args: Any, **kwargs: Any) -> Any:
+                return await run_async(func(instance, *args, **kwargs))
+            return bound_async
+
+        @functools.wraps(func)
+        def bound(*args: Any, **kwargs: Any) -> Any:
+            return run_sync(func(instance, *args, **kwargs))
+        return bound
@@ -0,0 +1,416 @@
+# toolkit/governor.py
+"""
+瀏覽器資源管控（Resource Governor）。
+
+- 每個 browser 啟動前先取得一個名額（BrowserLease），同時建立它專屬的 chrome-profile-* 目錄
+- 名額上限依 CPU 數與記憶體計算（MAX_BROWSERS 可直接指定）；
+  另外每次啟動前檢查「目前」可用記憶體與系統負載，不足就排隊等待，而不是硬開到 OOM
+- quit 時回收：殺掉還掛在該 profile 目錄上的 Chrome process tree、刪除 profile 目錄
+- 程式結束（atexit）時回收所有還沒 quit 的 browser
+- CLI 入口 / pytest session 呼叫 install_process_cleanup() 後另外：
+  - 清掉上一次執行被強制中斷（kill -9 / runner 取消）留下的 profile 目錄與 Chrome / chromedriver
+    （以 owner pid 判斷原本的 process 已不存在）
+  - SIGTERM / SIGHUP 也會走 atexit 回收
+  只 import Browser 當函式庫用時不會改 signal handler，也不會去動別的 process。
+
+process 掃描使用 /proc（Linux / CI runner）；其他平台只做名額控管與 profile 目錄清理。
+只會對同一個使用者的 process 送 signal，先 SIGTERM，寬限時間內沒結束才 SIGKILL。
+"""
+from __future__ import annotations
+
+import atexit
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import config as C
+from toolkit.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_PREFIX = "chrome-profile-"
+# 標記 chromedriver / Chrome 是由哪個 process 啟動的（子 process 會繼承環境變數）
+OWNER_ENV_KEY = "ENGINE_OWNER_PID"
+# 寫在 profile 目錄內，記錄建立它的 process
+_OWNER_FILE = ".engine-owner"
+
+_PROC = "/proc"
+
+
+def owner_env() -> Dict[str, str]:
+    """啟動 chromedriver 用的環境變數（加上 owner 標記）"""
+    return {**os.environ, OWNER_ENV_KEY: str(os.getpid())}
+
+
+# === 系統資源 ===
+
+def _meminfo_mb(key: str) -> Optional[int]:
+    try:
+        with open(os.path.join(_PROC, "meminfo"), encoding="ascii") as f:
+            for line in f:
+                if line.startswith(key + ":"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def available_memory_mb() -> Optional[int]:
+    """目前可用記憶體（MB）；無法取得時回傳 None"""
+    return _meminfo_mb("MemAvailable")
+
+
+def load_per_cpu() -> Optional[float]:
+    """1 分鐘平均負載 / CPU 數；無法取得時回傳 None"""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return None
+
+
+def default_capacity() -> int:
+    """依 CPU 數與總記憶體估算可同時開幾個 browser"""
+    capacity = os.cpu_count() or 1
+    total = _meminfo_mb("MemTotal")
+    if total is not None:
+        capacity = min(capacity, (total - C.MEMORY_RESERVE_MB) // C.BROWSER_MEMORY_MB)
+    return max(capacity, 1)
+
+
+# === Process 掃描（/proc） ===
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_proc(pid: int, name: str) -> bytes:
+    with open(os.path.join(_PROC, str(pid), name), "rb") as f:
+        return f.read()
+
+
+def _iter_processes() -> Iterator[Tuple[int, int, List[str]]]:
+    """(pid, ppid, cmdline)；非 Linux 平台不產生任何資料"""
+    if not os.path.isdir(_PROC):
+        return
+    for entry in os.listdir(_PROC):
+        if not entry.isdigit():
+            continue
+        pid = int(entry)
+        try:
+            stat = _read_proc(pid, "stat").decode("utf-8", "replace")
+            cmdline = _read_proc(pid, "cmdline").decode("utf-8", "replace").split("\0")
+        except OSError:
+            continue
+        # stat 格式：pid (comm) state ppid ...；comm 可能含空白，從最後一個 ')' 之後切
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        yield pid, ppid, cmdline
+
+
+def _owner_pid(pid: int) -> Optional[int]:
+    try:
+        environ = _read_proc(pid, "environ").split(b"\0")
+    except OSError:
+        return None
+    prefix = f"{OWNER_ENV_KEY}=".encode("ascii")
+    for item in environ:
+        if item.startswith(prefix):
+            try:
+                return int(item[len(prefix):])
+            except ValueError:
+                return None
+    return None
+
+
+def _with_descendants(roots: Set[int], processes: List[Tuple[int, int, List[str]]]) -> Set[int]:
+    pids = set(roots)
+    children: Dict[int, List[int]] = {}
+    for pid, ppid, _ in processes:
+        children.setdefault(ppid, []).append(pid)
+    stack = list(roots)
+    while stack:
+        for child in children.get(stack.pop(), []):
+            if child not in pids:
+                pids.add(child)
+                stack.append(child)
+    return pids
+
+
+def _exited(pid: int) -> bool:
+    """已結束（含還沒被 parent 收走的 zombie）"""
+    if not _pid_alive(pid):
+        return True
+    try:
+        stat = _read_proc(pid, "stat").decode("utf-8", "replace")
+    except OSError:
+        return True
+    return stat.rsplit(")", 1)[1].split()[0] == "Z"
+
+
+def _same_user(pid: int) -> bool:
+    try:
+        return os.stat(os.path.join(_PROC, str(pid))).st_uid == os.getuid()
+    except OSError:
+        return False
+
+
+def _kill(pids: Set[int], grace: float = 1.0) -> int:
+    """先 SIGTERM，grace 秒後仍存在的再 SIGKILL；回傳送出 signal 的 process 數"""
+    targets: Set[int] = set()
+    for pid in pids:
+        if pid == os.getpid() or not _same_user(pid):
+            continue
+        try:
+            os.kill(pid, signal.SIGTERM)
+            targets.add(pid)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    deadline = time.monotonic() + grace
+    remaining = set(targets)
+    while remaining and time.monotonic() < deadline:
+        time.sleep(0.05)
+        remaining = {pid for pid in remaining if not _exited(pid)}
+    for pid in remaining:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    return len(targets)
+
+
+def kill_profile_processes(profile_dir: str) -> int:
+    """殺掉以該 profile 目錄啟動的 Chrome 與其所有子 process，回傳殺掉的數量"""
+    flag = f"--user-data-dir={profile_dir}"
+    processes = list(_iter_processes())
+    roots = {pid for pid, _, cmdline in processes if flag in cmdline}
+    if not roots:
+        return 0
+    return _kill(_with_descendants(roots, processes))
+
+
+def kill_orphaned_processes() -> int:
+    """殺掉 owner process 已不存在的 chromedriver / Chrome（上次執行被強制中斷留下的）"""
+    processes = list(_iter_processes())
+    roots: Set[int] = set()
+    for pid, _, cmdline in processes:
+        exe = os.path.basename(cmdline[0]) if cmdline and cmdline[0] else ""
+        if "chrome" not in exe.lower():
+            continue
+        owner = _owner_pid(pid)
+        if owner is not None and owner != os.getpid() and not _pid_alive(owner):
+            roots.add(pid)
+    if not roots:
+        return 0
+    return _kill(_with_descendants(roots, processes))
+
+
+def _remove_dir(path: str, attempts: int = 5) -> bool:
+    # Chrome 剛結束時可能還在寫檔，稍等重試
+    for i in range(attempts):
+        shutil.rmtree(path, ignore_errors=True)
+        if not os.path.exists(path):
+            return True
+        time.sleep(0.1 * (i + 1))
+    return False
+
+
+# === Governor ===
+
+@dataclass
+class BrowserLease:
+    """一個 browser 名額：專屬的 profile 目錄"""
+    profile_dir: str
+    acquired_at: float = field(default_factory=time.monotonic)
+
+
+class ResourceGovernor:
+
+    def __init__(self,
+                 max_browsers: Optional[int] = None,
+                 browser_memory_mb: int = C.BROWSER_MEMORY_MB,
+                 reserve_mb: int = C.MEMORY_RESERVE_MB,
+                 max_load_per_cpu: float = C.MAX_LOAD_PER_CPU,
+                 timeout: float = C.BROWSER_SLOT_TIMEOUT):
+        self.capacity = max_browsers or default_capacity()
+        self.browser_memory_mb = browser_memory_mb
+        self.reserve_mb = reserve_mb
+        self.max_load_per_cpu = max_load_per_cpu
+        self.timeout = timeout
+        self._active: Dict[str, BrowserLease] = {}
+        self._by_driver: Dict[int, BrowserLease] = {}
+        self._cond = threading.Condition()
+        self.waits = 0
+        self.reaped_processes = 0
+
+    # === 名額 ===
+
+    def _pressure(self) -> Optional[str]:
+        """目前不適合再開 browser 的原因；None 代表可以開"""
+        if len(self._active) >= self.capacity:
+            return f"已達上限 {self.capacity} 個 browser"
+        # 至少要能開一個，避免整個執行卡死
+        if not self._active:
+            return None
+        available = available_memory_mb()
+        if available is not None and available < self.browser_memory_mb + self.reserve_mb:
+            return f"可用記憶體 {available} MB 不足"
+        load = load_per_cpu()
+        if load is not None and load > self.max_load_per_cpu:
+            return f"CPU 負載過高（{load:.2f} / CPU）"
+        return None
+
+    def acquire(self) -> BrowserLease:
+        """
+        取得一個 browser 名額並建立 profile 目錄；資源不足時等待（最多 timeout 秒）。
+        """
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        with self._cond:
+            while True:
+                reason = self._pressure()
+                if reason is None:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RuntimeError(f"等待 browser 名額逾時（{self.timeout:g} 秒）：{reason}")
+                if not waited:
+                    waited = True
+                    self.waits += 1
+                    logger.info(f"暫緩啟動 browser：{reason}，排隊等待")
+                # 記憶體 / 負載不會主動通知，定期重新檢查
+                self._cond.wait(min(remaining, 1.0))
+
+            profile_dir = tempfile.mkdtemp(prefix=PROFILE_PREFIX)
+            with open(os.path.join(profile_dir, _OWNER_FILE), "w", encoding="ascii") as f:
+                f.write(str(os.getpid()))
+            lease = BrowserLease(profile_dir=profile_dir)
+            self._active[profile_dir] = lease
+            return lease
+
+    def bind(self, driver, lease: BrowserLease) -> None:
+        """記錄 driver 與名額的對應，之後可用 release_driver(driver) 回收"""
+        with self._cond:
+            self._by_driver[id(driver)] = lease
+
+    def release_driver(self, driver) -> None:
+        with self._cond:
+            lease = self._by_driver.pop(id(driver), None)
+        if lease is not None:
+            self.release(lease)
+
+    def release(self, lease: BrowserLease) -> None:
+        """回收名額：殺掉殘留的 Chrome process tree、刪除 profile 目錄"""
+        with self._cond:
+            if self._active.pop(lease.profile_dir, None) is None:
+                return
+            self._by_driver = {k: v for k, v in self._by_driver.items() if v is not lease}
+        try:
+            killed = kill_profile_processes(lease.profile_dir)
+            if killed:
+                self.reaped_processes += killed
+                logger.warning(f"回收殘留的 Chrome process {killed} 個：{lease.profile_dir}")
+            if not _remove_dir(lease.profile_dir):
+                logger.warning(f"無法刪除 profile 目錄：{lease.profile_dir}")
+        finally:
+            with self._cond:
+                self._cond.notify_all()
+
+    def reap_all(self) -> None:
+        """回收所有尚未 release 的 browser（程式結束時）"""
+        with self._cond:
+            leases = list(self._active.values())
+        for lease in leases:
+            self.release(lease)
+
+    def reap_orphans(self) -> None:
+        """清掉上一次執行（owner process 已不存在）留下的 process 與 profile 目錄"""
+        killed = kill_orphaned_processes()
+        removed = 0
+        tmp = tempfile.gettempdir()
+        for name in os.listdir(tmp):
+            if not name.startswith(PROFILE_PREFIX):
+                continue
+            path = os.path.join(tmp, name)
+            try:
+                with open(os.path.join(path, _OWNER_FILE), encoding="ascii") as f:
+                    owner = int(f.read().strip())
+            except (OSError, ValueError):
+                # 沒有 owner 標記：可能是別的工具建立的，不動它
+                continue
+            if owner == os.getpid() or _pid_alive(owner):
+                continue
+            killed += kill_profile_processes(path)
+            if _remove_dir(path):
+                removed += 1
+        self.reaped_processes += killed
+        if killed or removed:
+            logger.warning(f"清除上次執行殘留：Chrome/chromedriver process {killed} 個、profile 目錄 {removed} 個")
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "capacity": self.capacity,
+            "active": len(self._active),
+            "waits": self.waits,
+            "reaped_processes": self.reaped_processes,
+            "available_memory_mb": available_memory_mb(),
+        }
+
+
+_governor: Optional[ResourceGovernor] = None
+_governor_lock = threading.Lock()
+_cleanup_installed = False
+
+
+def _on_terminate(signum, frame) -> None:
+    # 轉成 SystemExit，讓 atexit（reap_all / 關閉 chromedriver）有機會執行
+    raise SystemExit(128 + signum)
+
+
+def _install_signal_handlers() -> None:
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for name in ("SIGTERM", "SIGHUP"):
+        signum = getattr(signal, name, None)
+        if signum is not None and signal.getsignal(signum) is signal.SIG_DFL:
+            signal.signal(signum, _on_terminate)
+
+
+def get_governor() -> ResourceGovernor:
+    """整個 process 共用的 ResourceGovernor（第一次使用時建立）"""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = ResourceGovernor(max_browsers=C.MAX_BROWSERS or None)
+            atexit.register(_governor.reap_all)
+            logger.info(f"browser 名額上限：{_governor.capacity}")
+        return _governor
+
+
+def install_process_cleanup() -> ResourceGovernor:
+    """
+    由 CLI 入口（main）/ pytest session 明確呼叫，重複呼叫只生效一次：
+    清除上次執行的殘留，並讓 SIGTERM / SIGHUP 也會回收所有 browser。
+    """
+    global _cleanup_installed
+    governor = get_governor()
+    with _governor_lock:
+        if _cleanup_installed:
+            return governor
+        _cleanup_installed = True
+    try:
+        governor.reap_orphans()
+    except Exception:
+        logger.warning("清除上次執行殘留失敗", exc_info=True)
+    _install_signal_handlers()
+    return governor
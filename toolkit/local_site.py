@@ -0,0 +1,129 @@
+# toolkit/local_site.py
+"""
+本機替身站台（對齊 saucedemo 的登入 / 商品列表 / 購物車）。
+
+用途：benchmark 與可重現的量測，不受外部網站延遲與可用性影響。
+- 靜態頁面放在 DemoData/site
+- /static/media/* 的圖片/字型由這裡動態產生，並可加上人工延遲與大小，
+  用來模擬「斷言用不到、卻拖慢載入」的資源
+
+用法：
+    with serve_local_site() as base_url:
+        ...   # 搭配 TEST_ENV=LOCAL
+
+    python -m toolkit.local_site            # 前景啟動，Ctrl+C 結束
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+import config as C
+from toolkit.logger import get_logger
+
+logger = get_logger(__name__)
+
+SITE_DIR = os.path.join(C.ROOT_DIR, "DemoData", "site")
+
+# 動態資源預設：每個 80ms、64KB（一頁約 6~7 個，差異足夠量得出來）
+DEFAULT_ASSET_DELAY_MS = int(os.environ.get("LOCAL_SITE_ASSET_DELAY_MS", "80"))
+DEFAULT_ASSET_BYTES = int(os.environ.get("LOCAL_SITE_ASSET_BYTES", str(64 * 1024)))
+
+_MEDIA_PREFIX = "/static/media/"
+_CONTENT_TYPES = {
+    ".png": "image/png",
+    ".woff2": "font/woff2",
+}
+
+
+class _SiteHandler(SimpleHTTPRequestHandler):
+    asset_delay_ms: int = DEFAULT_ASSET_DELAY_MS
+    asset_bytes: int = DEFAULT_ASSET_BYTES
+
+    def do_GET(self):
+        if self.path.startswith(_MEDIA_PREFIX):
+            self._send_media()
+            return
+        if self.path == "/" or self.path.startswith("/?"):
+            self.path = "/index.html"
+        super().do_GET()
+
+    def _send_media(self) -> None:
+        ext = os.path.splitext(self.path.split("?", 1)[0])[1].lower()
+        content_type = _CONTENT_TYPES.get(ext)
+        if content_type is None:
+            self.send_error(404)
+            return
+
+        time.sleep(self.asset_delay_ms / 1000)
+        body = b"\0" * self.asset_bytes
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def end_headers(self):
+        # 量測時不希望被瀏覽器快取影響
+        self.send_header("Cache-Control", "no-store")
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        # 不把每個 request 都印到 console
+        pass
+
+
+def create_server(port: int = C.LOCAL_SITE_PORT,
+                  asset_delay_ms: int = DEFAULT_ASSET_DELAY_MS,
+                  asset_bytes: int = DEFAULT_ASSET_BYTES) -> ThreadingHTTPServer:
+    handler = type("SiteHandler", (_SiteHandler,), {
+        "asset_delay_ms": asset_delay_ms,
+        "asset_bytes": asset_bytes,
+    })
+    return ThreadingHTTPServer(("127.0.0.1", port), partial(handler, directory=SITE_DIR))
+
+
+@contextmanager
+def serve_local_site(port: int = C.LOCAL_SITE_PORT,
+                     asset_delay_ms: int = DEFAULT_ASSET_DELAY_MS,
+                     asset_bytes: int = DEFAULT_ASSET_BYTES) -> Iterator[str]:
+    """
+    背景 thread 啟動替身站台，yield base_url，離開時關閉。
+    """
+    server = create_server(port, asset_delay_ms, asset_bytes)
+    thread = threading.Thread(target=server.serve_forever, name="local-site", daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+    logger.info(f"本機替身站台啟動：{base_url}")
+    try:
+        yield base_url
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本機替身站台")
+    parser.add_argument("--port", type=int, default=C.LOCAL_SITE_PORT)
+    parser.add_argument("--asset-delay-ms", type=int, default=DEFAULT_ASSET_DELAY_MS)
+    parser.add_argument("--asset-bytes", type=int, default=DEFAULT_ASSET_BYTES)
+    args = parser.parse_args()
+
+    server = create_server(args.port, args.asset_delay_ms, args.asset_bytes)
+    logger.info(f"本機替身站台啟動：http://127.0.0.1:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
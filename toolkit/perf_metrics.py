@@ -0,0 +1,168 @@
+# toolkit/perf_metrics.py
+"""
+頁面效能指標（Navigation Timing / Paint / Long Task）與效能預算。
+
+- 第一個要量測的步驟（PERF_METRICS 或 TestPlan 有預算欄位）執行前才注入 PerformanceObserver
+  （之後每個新頁面自動生效），記錄 long task；沒開啟量測的執行完全不碰 CDP
+- 步驟結束後一次 execute_script 取回指標，掛在 StepResult.metrics
+- 步驟沒有換頁時（同一個 document），只回報這段期間新增的 long task，不重複回報上一頁的載入時間
+- 注入與收集都是 @flow（toolkit/flow.py），同步 Browser 與 AsyncBrowser 共用
+
+指標（單位 ms，相對於頁面 navigation 開始）：
+    TTFBMs / DomContentLoadedMs / LoadMs / FirstPaintMs / FCPMs   換頁時才有
+    LongTaskCount / LongTaskMs                                     步驟期間新增的 long task
+
+TestPlan 可加預算欄位（選填，空白代表不檢查），超過時步驟失敗：
+    MaxTTFBMs / MaxDomContentLoadedMs / MaxLoadMs / MaxFCPMs / MaxLongTaskMs
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+from toolkit.flow import flow, is_async
+from toolkit.logger import get_logger
+
+logger = get_logger(__name__)
+
+# TestPlan 預算欄位 → 指標名稱
+BUDGET_COLUMNS = {
+    "MaxTTFBMs": "TTFBMs",
+    "MaxDomContentLoadedMs": "DomContentLoadedMs",
+    "MaxLoadMs": "LoadMs",
+    "MaxFCPMs": "FCPMs",
+    "MaxLongTaskMs": "LongTaskMs",
+}
+
+# 只有換頁時才有的指標
+NAVIGATION_METRICS = ("TTFBMs", "DomContentLoadedMs", "LoadMs", "FirstPaintMs", "FCPMs")
+
+# 每個新 document 載入前執行：收集 long task（PerformanceObserver 只能從註冊後開始收）
+_OBSERVER_JS = """
+window.__perfLongTasks = [];
+try {
+    new PerformanceObserver(function (list) {
+        list.getEntries().forEach(function (e) {
+            window.__perfLongTasks.push(e.duration);
+        });
+    }).observe({type: 'longtask', buffered: true});
+} catch (e) {}
+"""
+
+_COLLECT_JS = """
+var nav = performance.getEntriesByType('navigation')[0];
+var paints = {};
+performance.getEntriesByType('paint').forEach(function (p) { paints[p.name] = p.startTime; });
+return {
+    origin: performance.timeOrigin,
+    url: location.href,
+    nav: nav ? {
+        ttfb: nav.responseStart,
+        dcl: nav.domContentLoadedEventEnd,
+        load: nav.loadEventEnd
+    } : null,
+    firstPaint: paints['first-paint'],
+    fcp: paints['first-contentful-paint'],
+    longTasks: window.__perfLongTasks || []
+};
+"""
+
+
+class PerfBudgetExceeded(AssertionError):
+    """步驟的效能指標超過 TestPlan 設定的預算"""
+
+
+@flow
+def install_perf_observer(driver):
+    """透過 DevTools 讓之後每個頁面都先註冊 long task observer"""
+    yield driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _OBSERVER_JS})
+
+
+def _ms(value: Any) -> Optional[float]:
+    # loadEventEnd 等尚未發生時為 0
+    if not value:
+        return None
+    return round(float(value), 1)
+
+
+class PerfCollector:
+    """掛在 Browser 上，記住上一次量測的 document，用來判斷步驟是否換頁"""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self._origin: Optional[float] = None
+        self._long_tasks_seen = 0
+        self._observer_installed = False
+
+    @property
+    def ASYNC(self) -> bool:
+        return is_async(self.browser)
+
+    def reset(self) -> None:
+        """driver 重建後呼叫：重新判斷換頁，下次量測前重新注入 observer"""
+        self._origin = None
+        self._long_tasks_seen = 0
+        self._observer_installed = False
+
+    @flow
+    def prepare(self):
+        """量測步驟執行前呼叫：第一次時注入 long task observer（只影響之後載入的頁面）"""
+        if self._observer_installed:
+            return
+        self._observer_installed = True
+        try:
+            yield install_perf_observer(self.browser.driver)
+        except WebDriverException:
+            logger.warning("無法注入 long task observer，LongTask 指標將為 0", exc_info=True)
+
+    @flow
+    def collect(self):
+        """取回目前頁面的指標（Dict[str, Any]）；取不到（例如 about:blank、browser 已掛）時回傳空 dict"""
+        try:
+            raw = yield self.browser.driver.execute_script(_COLLECT_JS)
+        except WebDriverException:
+            logger.debug("效能指標取得失敗", exc_info=True)
+            return {}
+        if not raw:
+            return {}
+
+        navigated = raw.get("origin") != self._origin
+        if navigated:
+            self._origin = raw.get("origin")
+            self._long_tasks_seen = 0
+
+        long_tasks = raw.get("longTasks") or []
+        new_tasks = long_tasks[self._long_tasks_seen:]
+        self._long_tasks_seen = len(long_tasks)
+
+        metrics: Dict[str, Any] = {"url": raw.get("url"), "Navigated": navigated}
+        nav = raw.get("nav")
+        if navigated and nav:
+            metrics.update(
+                TTFBMs=_ms(nav.get("ttfb")),
+                DomContentLoadedMs=_ms(nav.get("dcl")),
+                LoadMs=_ms(nav.get("load")),
+                FirstPaintMs=_ms(raw.get("firstPaint")),
+                FCPMs=_ms(raw.get("fcp")),
+            )
+        metrics["LongTaskCount"] = len(new_tasks)
+        metrics["LongTaskMs"] = round(sum(new_tasks), 1)
+        return {k: v for k, v in metrics.items() if v is not None}
+
+
+def check_budgets(metrics: Dict[str, Any], budgets: Dict[str, float]) -> List[str]:
+    """
+    回傳超過預算的項目說明；沒有違規時回傳空 list。
+    步驟沒有換頁時，載入類指標無從比較，只記 log 不判定失敗。
+    """
+    violations: List[str] = []
+    for metric, limit in budgets.items():
+        value = metrics.get(metric)
+        if value is None:
+            if metric in NAVIGATION_METRICS:
+                logger.warning(f"{metric} 有設定預算，但此步驟沒有換頁或量不到，略過檢查")
+            continue
+        if value > limit:
+            violations.append(f"{metric}={value:.0f} 超過預算 {limit:.0f}")
+    return violations
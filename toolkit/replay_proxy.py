@@ -0,0 +1,392 @@
+# toolkit/replay_proxy.py
+"""
+HTTP 錄製 / 重播 proxy（REPLAY_MODE=record | replay）。
+
+- record：Chrome 經過本機 proxy 連到真正的站台，每個 request / response 依序存到
+  REPLAY_DIR/<環境>/（index.jsonl + bodies/），開始錄製時會清掉該環境舊的內容。
+  回放需要原本的 Set-Cookie，錄製內容因此含登入憑證，replay/ 已列在 .gitignore，不要提交或上傳
+- replay：完全不連網路，依 (method, URL, request body) 從磁碟回放；
+  同一個 request 錄到多次時依錄製順序回放，用完後重複最後一次。沒錄到的 request 回 404；
+  回放順序每個 pytest 測試開始時重置（rewind_replay_proxies），CLI 執行則整個 process 共用
+- HTTPS：proxy 以自簽憑證解開 CONNECT（Chrome 會加上 --ignore-certificate-errors），
+  憑證第一次使用時產生在 REPLAY_DIR/.tls/，需要 cryptography 套件或 openssl 指令其一
+
+create_driver 依 EnvConfig.REPLAY_MODE（或環境變數 REPLAY_MODE）自動啟動 proxy 並讓 Chrome 走 proxy，
+同一個 process 內每個（環境, 模式）共用一個 proxy。
+record 會清掉該環境的錄製目錄，pytest-xdist 多個 worker 同時錄製會互相覆蓋，因此拒絕執行（請用 -p no:xdist 或 -n 0 錄製）。
+
+用法：
+    REPLAY_MODE=record python -m pytest      # 參考執行：錄下流量
+    REPLAY_MODE=replay python -m pytest      # 之後離線、零延遲重播
+    python -m toolkit.replay_proxy --env DEV --mode replay --port 8767   # 單獨啟動
+"""
+from __future__ import annotations
+
+import argparse
+import atexit
+import hashlib
+import http.client
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import sys
+import threading
+from dataclasses import dataclass, asdict, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import config as C
+from toolkit.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 不轉送 / 不錄製的 header（連線層級，或由 proxy 重新計算）
+_HOP_BY_HOP = {
+    "connection", "keep-alive", "proxy-connection", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "content-length",
+    # 避免 Chrome 改用 QUIC 直連而繞過 proxy
+    "alt-svc",
+}
+
+UPSTREAM_TIMEOUT = 30
+
+Headers = List[Tuple[str, str]]
+
+
+def request_key(method: str, url: str, body: bytes = b"") -> str:
+    digest = hashlib.sha1(body).hexdigest()[:12] if body else "-"
+    return f"{method} {url} {digest}"
+
+
+@dataclass
+class RecordedResponse:
+    key: str
+    status: int
+    reason: str
+    headers: Headers = field(default_factory=list)
+    body: str = ""  # bodies/ 下的檔名（內容 sha1）
+
+
+class Cassette:
+    """單一環境的錄製內容：index.jsonl 每行一筆 response，body 依內容 sha1 存成檔案"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.jsonl")
+        self.body_dir = os.path.join(directory, "bodies")
+        self._entries: Dict[str, List[RecordedResponse]] = {}
+        self._served: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._entries.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._served.clear()
+            shutil.rmtree(self.directory, ignore_errors=True)
+            os.makedirs(self.body_dir, exist_ok=True)
+
+    def rewind(self) -> None:
+        """從頭開始回放：同一個 request 再次從第一筆錄製內容回應"""
+        with self._lock:
+            self._served.clear()
+
+    def load(self) -> int:
+        """讀回錄製內容，回傳筆數（沒有錄製過為 0）"""
+        entries: Dict[str, List[RecordedResponse]] = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        data = json.loads(line)
+                        data["headers"] = [tuple(h) for h in data["headers"]]
+                        response = RecordedResponse(**data)
+                        entries.setdefault(response.key, []).append(response)
+        with self._lock:
+            self._entries = entries
+            self._served.clear()
+        return len(self)
+
+    def record(self, key: str, status: int, reason: str, headers: Headers, body: bytes) -> None:
+        name = hashlib.sha1(body).hexdigest()
+        response = RecordedResponse(key=key, status=status, reason=reason, headers=headers, body=name)
+        with self._lock:
+            body_path = os.path.join(self.body_dir, name)
+            if not os.path.exists(body_path):
+                with open(body_path, "wb") as f:
+                    f.write(body)
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(response), ensure_ascii=False) + "\n")
+            self._entries.setdefault(key, []).append(response)
+
+    def next_response(self, key: str) -> Optional[Tuple[RecordedResponse, bytes]]:
+        with self._lock:
+            responses = self._entries.get(key)
+            if not responses:
+                return None
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+            response = responses[min(index, len(responses) - 1)]
+        with open(os.path.join(self.body_dir, response.body), "rb") as f:
+            return response, f.read()
+
+
+# === HTTPS（自簽憑證） ===
+
+def _ensure_certificate(directory: str) -> Tuple[str, str]:
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    if os.path.exists(cert_path) and os.path.exists(key_path):
+        return cert_path, key_path
+    os.makedirs(directory, exist_ok=True)
+
+    try:
+        _write_certificate_with_cryptography(cert_path, key_path)
+    except ImportError:
+        openssl = shutil.which("openssl")
+        if openssl is None:
+            raise RuntimeError("錄製 / 重播 HTTPS 需要 cryptography 套件或 openssl 指令：pip install cryptography")
+        subprocess.run([openssl, "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "3650",
+                        "-subj", "/CN=replay-proxy", "-keyout", key_path, "-out", cert_path],
+                       check=True, capture_output=True)
+    return cert_path, key_path
+
+
+def _write_certificate_with_cryptography(cert_path: str, key_path: str) -> None:
+    import datetime
+
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "replay-proxy")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name)
+            .public_key(key.public_key()).serial_number(x509.random_serial_number())
+            .not_valid_before(now).not_valid_after(now + datetime.timedelta(days=3650))
+            .sign(key, hashes.SHA256()))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL,
+                                  serialization.NoEncryption()))
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+
+
+def _fetch(method: str, url: str, headers: Headers, body: bytes) -> Tuple[int, str, Headers, bytes]:
+    parts = urlsplit(url)
+    connection_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    conn = connection_cls(parts.netloc, timeout=UPSTREAM_TIMEOUT)
+    try:
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        conn.putrequest(method, path, skip_host=True, skip_accept_encoding=True)
+        for name, value in headers:
+            if name.lower() not in _HOP_BY_HOP:
+                conn.putheader(name, value)
+        if body:
+            conn.putheader("Content-Length", str(len(body)))
+        conn.endheaders(body or None)
+        response = conn.getresponse()
+        payload = response.read()
+        kept = [(k, v) for k, v in response.getheaders() if k.lower() not in _HOP_BY_HOP]
+        return response.status, response.reason, kept, payload
+    finally:
+        conn.close()
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "ReplayProxy"
+    # CONNECT 解開後的 origin（https://host[:port]）；一般 HTTP proxy request 為 None
+    _origin: Optional[str] = None
+
+    def do_CONNECT(self):
+        host, _, port = self.path.rpartition(":")
+        self.send_response_only(200, "Connection Established")
+        self.end_headers()
+        try:
+            tls = self.server.tls_context().wrap_socket(self.connection, server_side=True)
+        except (ssl.SSLError, OSError) as e:
+            logger.debug(f"TLS handshake 失敗：{self.path} {e}")
+            self.close_connection = True
+            return
+        # 之後的 request 都從 TLS 連線讀
+        self.connection = tls
+        self.rfile = tls.makefile("rb", self.rbufsize)
+        self.wfile = tls.makefile("wb")
+        self._origin = f"https://{host if port == '443' else self.path}"
+        self.close_connection = False
+
+    def _proxy(self):
+        url = f"{self._origin}{self.path}" if self._origin else self.path
+        if not url.startswith(("http://", "https://")):
+            self.send_error(400, "replay proxy 只接受 proxy 形式的 request")
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        key = request_key(self.command, url, body)
+
+        if self.server.mode == "replay":
+            found = self.server.cassette.next_response(key)
+            if found is None:
+                self.server.count("misses")
+                logger.warning(f"沒有錄到的 request：{self.command} {url}")
+                self._send(404, "Not Recorded", [("X-Replay-Miss", "1")], b"")
+                return
+            response, payload = found
+            self.server.count("hits")
+            self._send(response.status, response.reason, response.headers, payload)
+            return
+
+        try:
+            status, reason, headers, payload = _fetch(self.command, url, list(self.headers.items()), body)
+        except (OSError, http.client.HTTPException) as e:
+            logger.warning(f"錄製時連線失敗：{self.command} {url} {type(e).__name__}: {e}")
+            self._send(502, "Bad Gateway", [], b"")
+            return
+        self.server.cassette.record(key, status, reason, headers, payload)
+        self.server.count("recorded")
+        self._send(status, reason, headers, payload)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _proxy
+
+    def _send(self, status: int, reason: str, headers: Headers, body: bytes) -> None:
+        self.send_response_only(status, reason)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayProxy(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, cassette: Cassette, mode: str, port: int = 0,
+                 tls_dir: str = os.path.join(C.REPLAY_DIR, ".tls")):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"ReplayProxy mode 必須是 record / replay：{mode!r}")
+        super().__init__(("127.0.0.1", port), _ProxyHandler)
+        self.cassette = cassette
+        self.mode = mode
+        self.tls_dir = tls_dir
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "recorded": 0}
+        self._tls: Optional[ssl.SSLContext] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def tls_context(self) -> ssl.SSLContext:
+        with self._lock:
+            if self._tls is None:
+                cert_path, key_path = _ensure_certificate(self.tls_dir)
+                context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+                context.load_cert_chain(cert_path, key_path)
+                context.set_alpn_protocols(["http/1.1"])
+                self._tls = context
+            return self._tls
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def start(self) -> "ReplayProxy":
+        self._thread = threading.Thread(target=self.serve_forever, name=f"replay-proxy-{self.mode}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        logger.info(f"replay proxy（{self.mode}）結束：{self.stats}")
+
+
+_proxies: Dict[Tuple[str, str], ReplayProxy] = {}
+_proxies_lock = threading.Lock()
+
+
+def _check_record_allowed() -> None:
+    """pytest-xdist 的每個 worker 是獨立 process，各自 clear() 會刪掉其他 worker 錄到的內容"""
+    if os.environ.get("PYTEST_XDIST_WORKER") and int(os.environ.get("PYTEST_XDIST_WORKER_COUNT") or 1) > 1:
+        raise RuntimeError("REPLAY_MODE=record 不支援 pytest-xdist 多個 worker，請以單一 process 錄製（-n 0）")
+
+
+def get_replay_proxy(env_config: C.EnvConfig) -> Optional[ReplayProxy]:
+    """依環境的 REPLAY_MODE 取得（必要時啟動）proxy；off 時回傳 None"""
+    mode = C.get_replay_mode(env_config)
+    if mode == "off":
+        return None
+    key = (env_config.NAME, mode)
+    with _proxies_lock:
+        proxy = _proxies.get(key)
+        if proxy is None:
+            cassette = Cassette(os.path.join(C.REPLAY_DIR, env_config.NAME))
+            if mode == "record":
+                _check_record_allowed()
+                cassette.clear()
+            elif cassette.load() == 0:
+                raise RuntimeError(f"{cassette.directory} 沒有錄製內容，請先以 REPLAY_MODE=record 執行一次")
+            if not _proxies:
+                atexit.register(stop_all)
+            proxy = ReplayProxy(cassette, mode).start()
+            _proxies[key] = proxy
+            logger.info(f"replay proxy（{mode}, {env_config.NAME}）：{proxy.url} → {cassette.directory}")
+        return proxy
+
+
+def rewind_replay_proxies() -> None:
+    """讓所有重播中的 proxy 從頭回放（每個測試開始時呼叫，回放結果不受之前的測試影響）"""
+    with _proxies_lock:
+        proxies = list(_proxies.values())
+    for proxy in proxies:
+        if proxy.mode == "replay":
+            proxy.cassette.rewind()
+
+
+def stop_all() -> None:
+    with _proxies_lock:
+        proxies = list(_proxies.values())
+        _proxies.clear()
+    for proxy in proxies:
+        proxy.stop()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="HTTP 錄製 / 重播 proxy")
+    parser.add_argument("--env", default=C.ACTIVE_ENV_NAME)
+    parser.add_argument("--mode", choices=("record", "replay"), default="replay")
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args(argv)
+
+    cassette = Cassette(os.path.join(C.REPLAY_DIR, C.get_env_config(args.env).NAME))
+    if args.mode == "record":
+        cassette.clear()
+    else:
+        logger.info(f"已載入 {cassette.load()} 筆錄製內容")
+    proxy = ReplayProxy(cassette, args.mode, port=args.port)
+    logger.info(f"replay proxy（{args.mode}）：{proxy.url}，Ctrl+C 結束")
+    try:
+        proxy.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.server_close()
+        logger.info(f"結束：{proxy.stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+# toolkit/session_cache.py
+"""
+登入狀態快取（Session Snapshot）。
+
+概念：
+- 每個 (環境, 使用者) 只需要真正走一次 UI 登入
+- 登入成功後擷取 cookies + localStorage + sessionStorage 存成快照
+- 之後的測試直接注入快照、導向目標頁，省掉開頁/輸入帳密/等待導頁的時間
+
+快照同時放在記憶體與磁碟（SESSION_CACHE_DIR），
+讓同一個 process 內與多個 pytest process 之間都能共用。
+超過 TTL 或注入後驗證失敗（invalidate）就會重新走 UI 登入。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
+
+import config as C
+from toolkit.flow import flow
+from toolkit.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 讀取 / 寫入 Web Storage 的 script（一次 round trip 拿完）
+_DUMP_STORAGE_JS = """
+function dump(s) {
+    var out = {};
+    for (var i = 0; i < s.length; i++) {
+        var k = s.key(i);
+        out[k] = s.getItem(k);
+    }
+    return out;
+}
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+_LOAD_STORAGE_JS = """
+var local = arguments[0] || {}, session = arguments[1] || {};
+window.localStorage.clear();
+window.sessionStorage.clear();
+Object.keys(local).forEach(function (k) { window.localStorage.setItem(k, local[k]); });
+Object.keys(session).forEach(function (k) { window.sessionStorage.setItem(k, session[k]); });
+"""
+
+
+@dataclass
+class SessionSnapshot:
+    """單一登入狀態的快照"""
+    url: str
+    cookies: List[Dict[str, Any]] = field(default_factory=list)
+    local_storage: Dict[str, str] = field(default_factory=dict)
+    session_storage: Dict[str, str] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+
+    def is_expired(self, ttl: int) -> bool:
+        return time.time() - self.created_at > ttl
+
+
+@flow
+def capture_session(driver):
+    """
+    擷取目前 driver 的登入狀態（cookies + Web Storage + 目前 URL）。
+    driver 為 AsyncWebDriver 時回傳 coroutine（toolkit/flow.py）。
+    """
+    storage = (yield driver.execute_script(_DUMP_STORAGE_JS)) or {}
+    return SessionSnapshot(
+        url=(yield driver.current_url),
+        cookies=(yield driver.get_cookies()),
+        local_storage=storage.get("local") or {},
+        session_storage=storage.get("session") or {},
+    )
+
+
+@flow
+def inject_session(driver, snapshot: SessionSnapshot, base_url: str):
+    """
+    把快照注入目前 driver。
+    cookie / storage 都綁 domain，所以要先開到同網域的頁面才能寫入。
+    注入完成後不做導頁，由呼叫端決定要去哪一頁。
+    """
+    yield driver.get(base_url)
+    yield driver.delete_all_cookies()
+    for cookie in snapshot.cookies:
+        cookie = dict(cookie)
+        # selenium 回傳的 expiry 可能是 float，add_cookie 只吃 int
+        if "expiry" in cookie:
+            cookie["expiry"] = int(cookie["expiry"])
+        yield driver.add_cookie(cookie)
+    yield driver.execute_script(_LOAD_STORAGE_JS, snapshot.local_storage, snapshot.session_storage)
+
+
+class SessionCache:
+    """
+    以 (環境名稱, 使用者) 為 key 的登入快照快取。
+    - get(): 過期會自動刪除並回傳 None
+    - put(): 寫入記憶體 + 磁碟
+    - invalidate(): 注入後發現登入失效時呼叫
+    """
+
+    def __init__(self, cache_dir: str = C.SESSION_CACHE_DIR, ttl: int = C.SESSION_CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._memory: Dict[str, SessionSnapshot] = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, env_name: str, username: str) -> str:
+        return hashlib.sha1(f"{env_name}|{username}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, env_name: str, username: str) -> Optional[SessionSnapshot]:
+        key = self._key(env_name, username)
+        with self._lock:
+            snapshot = self._memory.get(key)
+            if snapshot is None:
+                snapshot = self._read_file(key)
+
+            if snapshot is None:
+                return None
+            if snapshot.is_expired(self.ttl):
+                logger.info(f"Session 快照已過期：env={env_name}, user={username}")
+                self._remove(key)
+                return None
+
+            self._memory[key] = snapshot
+            return snapshot
+
+    def put(self, env_name: str, username: str, snapshot: SessionSnapshot) -> None:
+        key = self._key(env_name, username)
+        with self._lock:
+            self._memory[key] = snapshot
+            # 先寫暫存檔再 replace，避免其他 process 讀到寫一半的檔案
+            tmp_path = self._path(key) + f".{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(asdict(snapshot), f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+
+    def invalidate(self, env_name: str, username: str) -> None:
+        with self._lock:
+            self._remove(self._key(env_name, username))
+
+    def _read_file(self, key: str) -> Optional[SessionSnapshot]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return SessionSnapshot(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError):
+            # 檔案壞掉就當作沒有快取
+            logger.warning(f"Session 快照檔損毀，略過：{self._path(key)}")
+            return None
+        except OSError:
+            # 權限不足等讀不到的情況，同樣走 UI 登入
+            logger.warning(f"Session 快照檔無法讀取，略過：{self._path(key)}", exc_info=True)
+            return None
+
+    def _remove(self, key: str) -> None:
+        self._memory.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+_default_cache: Optional[SessionCache] = None
+
+
+def get_session_cache() -> Optional[SessionCache]:
+    """取得 process 內共用的 SessionCache；SESSION_CACHE=false 時回傳 None（一律走 UI 登入）"""
+    global _default_cache
+    if not C.SESSION_CACHE_ENABLED:
+        return None
+    if _default_cache is None:
+        _default_cache = SessionCache()
+    return _default_cache
@@ -0,0 +1,226 @@
+# toolkit/sheet_sources.py
+"""
+TestPlan 的資料來源（Sheet Source）：依副檔名選擇讀取方式，產出同樣的列資料給 DataTable。
+
+- Excel（.xlsx / .xlsm）：TESTPLANPATH 指向檔案，sheet = 分頁
+- 目錄：TESTPLANPATH 指向目錄，每個 sheet 一個檔案（TestDir.csv、Translate.jsonl、Fun001.parquet ...）
+    .csv      UTF-8（可含 BOM），第一列為欄位名稱，空字串視為空白儲存格（None）
+    .jsonl    每行一個 JSON 物件，欄位順序依第一次出現的順序；保留數字 / 布林型別
+    .parquet  需要另外安裝 pyarrow（requirements-optional.txt）；同一欄混雜多種型別時以 JSON 保留原型別
+
+CSV / JSON lines 不必解析 Excel 的 XML，CI 載入 TestPlan 可快上一到兩個數量級。
+其他格式可用 register_format 加入。
+
+轉換既有的 Excel：
+    python -m toolkit.sheet_sources DemoData/TestPlan.xlsx --format csv --out build/TestPlan
+    TESTPLAN_PATH=build/TestPlan python -m pytest
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from toolkit.datatable import read_excel_sheet, read_excel_workbook, rows_from_values
+from toolkit.logger import get_logger
+
+logger = get_logger(__name__)
+
+Rows = List[Dict[str, Any]]
+
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm")
+
+
+@dataclass(frozen=True)
+class SheetFormat:
+    """單一 sheet 一個檔案的格式"""
+    extension: str
+    read: Callable[[str, str], Rows]          # (檔案路徑, sheet 名稱) → 列資料
+    write: Callable[[str, List[str], Rows], None]  # (檔案路徑, 欄位名稱, 列資料)
+
+
+# === CSV ===
+
+def _read_csv(path: str, sheet_name: str) -> Rows:
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        values = ([None if v == "" else v for v in row] for row in csv.reader(f))
+        return rows_from_values(values, sheet_name)
+
+
+def _write_csv(path: str, headers: List[str], rows: Rows) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for row in rows:
+            writer.writerow(["" if row.get(h) is None else row.get(h) for h in headers])
+
+
+# === JSON lines ===
+
+def _read_jsonl(path: str, sheet_name: str) -> Rows:
+    records: Rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+    headers = list(dict.fromkeys(key for record in records for key in record))
+    return rows_from_values([headers] + [[r.get(h) for h in headers] for r in records], sheet_name)
+
+
+def _write_jsonl(path: str, headers: List[str], rows: Rows) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            # 日期等 JSON 沒有的型別轉成字串
+            f.write(json.dumps({h: row.get(h) for h in headers}, ensure_ascii=False, default=str) + "\n")
+
+
+# === Parquet（選用，需要 pyarrow） ===
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("讀寫 .parquet 需要安裝 pyarrow：pip install pyarrow") from None
+    return pyarrow
+
+
+# 混雜多種型別的欄位以 JSON 字串存放，欄位名稱記在 schema metadata，讀回時還原型別
+_PARQUET_JSON_COLUMNS = b"sheet_sources.json_columns"
+
+
+def _read_parquet(path: str, sheet_name: str) -> Rows:
+    pa = _pyarrow()
+    table = pa.parquet.read_table(path)
+    json_columns = set(json.loads((table.schema.metadata or {}).get(_PARQUET_JSON_COLUMNS, b"[]")))
+    values = [
+        [json.loads(v) if h in json_columns and v is not None else v for h, v in record.items()]
+        for record in table.to_pylist()
+    ]
+    return rows_from_values([table.column_names] + values, sheet_name)
+
+
+def _write_parquet(path: str, headers: List[str], rows: Rows) -> None:
+    pa = _pyarrow()
+    columns: Dict[str, List[Any]] = {}
+    json_columns: List[str] = []
+    for h in headers:
+        values = [row.get(h) for row in rows]
+        # Excel 同一欄可能混雜數字與文字，parquet 欄位只能有一種型別
+        if len({type(v) for v in values if v is not None}) > 1:
+            values = [None if v is None else json.dumps(v, ensure_ascii=False, default=str) for v in values]
+            json_columns.append(h)
+        columns[h] = values
+    table = pa.table(columns).replace_schema_metadata({_PARQUET_JSON_COLUMNS: json.dumps(json_columns)})
+    pa.parquet.write_table(table, path)
+
+
+_FORMATS: Dict[str, SheetFormat] = {}
+
+
+def register_format(fmt: SheetFormat) -> None:
+    """加入 / 覆蓋一種 sheet 檔案格式（副檔名不分大小寫）"""
+    _FORMATS[fmt.extension.lower()] = fmt
+
+
+register_format(SheetFormat(".csv", _read_csv, _write_csv))
+register_format(SheetFormat(".jsonl", _read_jsonl, _write_jsonl))
+register_format(SheetFormat(".parquet", _read_parquet, _write_parquet))
+
+
+def _sheet_files(directory: str) -> Dict[str, str]:
+    """目錄內可讀取的 sheet：{sheet 名稱: 檔案路徑}；同名多種格式時以先註冊的為準"""
+    found: Dict[str, str] = {}
+    entries = sorted(os.listdir(directory))
+    for ext in _FORMATS:
+        for entry in entries:
+            name, entry_ext = os.path.splitext(entry)
+            if entry_ext.lower() == ext and name not in found:
+                found[name] = os.path.join(directory, entry)
+    return found
+
+
+def _read_file(path: str, sheet_name: str) -> Rows:
+    return _FORMATS[os.path.splitext(path)[1].lower()].read(path, sheet_name)
+
+
+def _is_excel(source: str) -> bool:
+    return os.path.splitext(source)[1].lower() in EXCEL_EXTENSIONS
+
+
+def read_sheet(source: str, sheet_name: str) -> Rows:
+    """
+    讀取單一 sheet，可直接當作 DataTable 的 reader。
+    source 為 Excel 檔或 sheet 檔案所在的目錄。
+    """
+    if os.path.isdir(source):
+        for ext in _FORMATS:
+            path = os.path.join(source, sheet_name + ext)
+            if os.path.isfile(path):
+                return _read_file(path, sheet_name)
+        raise ValueError(f"TestPlan 目錄不存在 sheet：'{sheet_name}' (dir='{source}')")
+    if _is_excel(source):
+        return read_excel_sheet(source, sheet_name)
+    raise ValueError(f"不支援的 TestPlan 來源：'{source}'（支援 Excel 或 sheet 檔案目錄）")
+
+
+def read_workbook(source: str) -> Dict[str, Rows]:
+    """一次讀出來源的所有 sheet：{sheet 名稱: 列資料}"""
+    if os.path.isdir(source):
+        return {name: _read_file(path, name) for name, path in _sheet_files(source).items()}
+    if _is_excel(source):
+        return read_excel_workbook(source)
+    raise ValueError(f"不支援的 TestPlan 來源：'{source}'（支援 Excel 或 sheet 檔案目錄）")
+
+
+def source_mtime(source: str) -> float:
+    """來源的最後修改時間；目錄取目錄本身與各 sheet 檔案中最新的"""
+    if not os.path.isdir(source):
+        return os.path.getmtime(source)
+    return max([os.path.getmtime(source)] + [os.path.getmtime(p) for p in _sheet_files(source).values()])
+
+
+def convert(source: str, out_dir: str, extension: str) -> List[str]:
+    """把來源的每個 sheet 寫成 out_dir/<sheet><extension>，回傳寫出的檔案"""
+    fmt = _FORMATS.get(extension.lower())
+    if fmt is None:
+        raise ValueError(f"不支援的格式：'{extension}'，可用：{', '.join(_FORMATS)}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    written: List[str] = []
+    for name, rows in read_workbook(source).items():
+        headers = list(rows[0]) if rows else []
+        path = os.path.join(out_dir, name + fmt.extension)
+        fmt.write(path, headers, rows)
+        written.append(path)
+    return written
+
+
+def _timed_read(source: str) -> float:
+    start = time.perf_counter()
+    read_workbook(source)
+    return (time.perf_counter() - start) * 1000
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="把 TestPlan 轉成 CSV / JSON lines / Parquet")
+    parser.add_argument("source", help="Excel 檔或 sheet 檔案目錄")
+    parser.add_argument("--format", default="csv", help="csv / jsonl / parquet")
+    parser.add_argument("--out", required=True, help="輸出目錄（每個 sheet 一個檔案）")
+    args = parser.parse_args(argv)
+
+    extension = "." + args.format.lower().lstrip(".")
+    for path in convert(args.source, args.out, extension):
+        logger.info(f"已寫出：{path}")
+    logger.info(f"整本讀取耗時：{args.source} {_timed_read(args.source):.1f} ms → "
+                f"{args.out} {_timed_read(args.out):.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
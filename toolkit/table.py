@@ -0,0 +1,231 @@
+# toolkit/table.py
+"""
+HTML table 存取器：表頭只讀一次，之後用欄位索引直接定位。
+
+xpath.table_cell_by_header 每次定位都要瀏覽器重新計算
+count(preceding-sibling::th)，大表格逐格驗證時成本很高。
+TableAccessor 的做法：
+- 第一次使用時以一次 script 讀出表頭 → {表頭文字: 欄位索引}，
+  依 driver + table locator 快取，之後的定位不再和瀏覽器來回
+- 之後回傳直接的 td[n] XPath locator，並附帶「第 n 個表頭仍是該文字」的條件：
+  換頁或欄位被切換後找不到元素（不會默默對到別欄），呼叫 invalidate() 後重讀
+- read_column / read_row 一次 script 取回整欄 / 整列文字，不必逐格 round trip；
+  同一個 script 會順便核對表頭，表頭不符時自動重讀並更新快取
+"""
+from __future__ import annotations
+
+import threading
+import weakref
+from typing import Any, Dict, List, MutableMapping, Tuple, Union
+
+from selenium.webdriver.common.by import By
+
+from toolkit.datatable import DataTable
+from toolkit.funlib import normalize
+from toolkit.types import Locator
+from toolkit.xpath import table_by_header, table_cell_by_index
+
+# driver → {(by, locator): 表頭索引}；driver 被回收時整組快取跟著消失
+HeaderKey = Tuple[str, str]
+_header_cache: MutableMapping[Any, Dict[HeaderKey, Dict[str, int]]] = weakref.WeakKeyDictionary()
+_cache_lock = threading.Lock()
+
+# 依 locator 找到 table 元素（XPath / CSS 都支援）
+_FIND_TABLE_JS = """
+function findTable(by, value) {
+    if (by === 'xpath') {
+        return document.evaluate(value, document, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    return document.querySelector(value);
+}
+"""
+
+_READ_HEADER_JS = _FIND_TABLE_JS + """
+var table = findTable(arguments[0], arguments[1]);
+if (!table || !table.rows.length) { return null; }
+return Array.prototype.map.call(table.rows[0].cells, function (c) { return c.textContent; });
+"""
+
+# 表頭與快取不符（欄位被切換 / 重新排序）時回傳 {stale: true}，由呼叫端重讀表頭
+_READ_COLUMN_JS = _FIND_TABLE_JS + """
+var table = findTable(arguments[0], arguments[1]), col = arguments[2], expected = arguments[3];
+if (!table) { return null; }
+var head = table.rows.length ? table.rows[0].cells[col] : null;
+if (!head || head.textContent.trim() !== expected) { return {stale: true}; }
+var out = [];
+for (var i = 1; i < table.rows.length; i++) {
+    var cell = table.rows[i].cells[col];
+    out.push(cell ? cell.textContent : null);
+}
+return out;
+"""
+
+# 連同表頭一起回傳，表頭索引以當下畫面為準
+_READ_ROW_JS = _FIND_TABLE_JS + """
+var table = findTable(arguments[0], arguments[1]), row = arguments[2];
+if (!table || row >= table.rows.length) { return null; }
+var text = function (r) {
+    return Array.prototype.map.call(r.cells, function (c) { return c.textContent; });
+};
+return {header: text(table.rows[0]), cells: text(table.rows[row])};
+"""
+
+
+# 整張表一次序列化：[[表頭...], [第一列...], ...]
+_READ_ALL_JS = _FIND_TABLE_JS + """
+var table = findTable(arguments[0], arguments[1]);
+if (!table) { return null; }
+return Array.prototype.map.call(table.rows, function (r) {
+    return Array.prototype.map.call(r.cells, function (c) { return c.textContent; });
+});
+"""
+
+
+def clear_header_cache(driver=None) -> None:
+    """清除快取；指定 driver 時只清該 session 的"""
+    with _cache_lock:
+        if driver is None:
+            _header_cache.clear()
+        else:
+            _header_cache.pop(driver, None)
+
+
+def _build_index(headers: List[Any]) -> Dict[str, int]:
+    index: Dict[str, int] = {}
+    for i, text in enumerate(headers, start=1):
+        # 重複表頭以第一個為準，與 XPath 版本行為一致
+        index.setdefault(normalize(text), i)
+    return index
+
+
+class TableAccessor:
+    """
+    單一 HTML table 的存取器。
+    - table_locator: 例如 xpath.table_by_header("文件類型")，或任何 XPath / CSS locator
+    - row_index 皆為 1-based 資料列（不含表頭），與 xpath.table_cell_by_header 一致
+    """
+
+    def __init__(self, driver, table_locator: Locator):
+        by, value = table_locator
+        if by not in (By.XPATH, By.CSS_SELECTOR):
+            raise ValueError(f"TableAccessor 只支援 XPath / CSS locator：{by}")
+        self.driver = driver
+        self.table_locator = table_locator
+
+    # === 表頭索引 ===
+
+    def _cache_key(self) -> HeaderKey:
+        return (self.table_locator[0], self.table_locator[1])
+
+    def _store_index(self, index: Dict[str, int]) -> None:
+        with _cache_lock:
+            _header_cache.setdefault(self.driver, {})[self._cache_key()] = index
+
+    def invalidate(self) -> None:
+        """丟掉這張表的表頭索引（換頁或欄位被切換後呼叫，下次使用時重讀）"""
+        with _cache_lock:
+            _header_cache.get(self.driver, {}).pop(self._cache_key(), None)
+
+    def header_index(self) -> Dict[str, int]:
+        """{表頭文字: 欄位索引（1-based）}，同一個 driver / table locator 只讀一次"""
+        key = self._cache_key()
+        with _cache_lock:
+            cached = _header_cache.get(self.driver, {}).get(key)
+        if cached is not None:
+            return cached
+
+        headers = self.driver.execute_script(_READ_HEADER_JS, *self.table_locator)
+        if headers is None:
+            raise ValueError(f"找不到 table 或 table 沒有表頭：{self.table_locator[1]}")
+        index = _build_index(headers)
+        self._store_index(index)
+        return index
+
+    def column_of(self, header_text: str) -> int:
+        index = self.header_index()
+        header_text = normalize(header_text)
+        if header_text not in index:
+            raise ValueError(f"table 找不到表頭：'{header_text}'，現有表頭：{list(index)}")
+        return index[header_text]
+
+    # === Locator ===
+
+    def cell_locator(self, header_text: str, row_index: int = 1) -> Locator:
+        """直接 td[n] 的 XPath，表頭不符時找不到元素（僅 XPath table locator）"""
+        if self.table_locator[0] != By.XPATH:
+            raise ValueError("cell_locator 需要 XPath table locator，CSS 請用 cell_in_table")
+        return table_cell_by_index(self.table_locator[1], self.column_of(header_text), row_index,
+                                   header_text=normalize(header_text))
+
+    def input_locator(self, header_text: str, row_index: int = 1) -> Locator:
+        by, xpath = self.cell_locator(header_text, row_index)
+        return (by, xpath + "//input")
+
+    def cell_in_table(self, header_text: str, row_index: int = 1) -> Locator:
+        """
+        相對於 table 元素的 XPath locator，搭配 table_elem.find_element(*locator) 使用（XPath / CSS table 皆可）。
+        與 cell_locator 相同，表頭不符時找不到元素。
+        """
+        return table_cell_by_index(".", self.column_of(header_text), row_index, header_text=normalize(header_text))
+
+    # === 批次讀取（一次 round trip） ===
+
+    def read_column(self, header_text: str) -> List[str]:
+        """整欄資料列文字（已 strip，缺格為空字串）"""
+        header_text = normalize(header_text)
+        values = self.driver.execute_script(
+            _READ_COLUMN_JS, *self.table_locator, self.column_of(header_text) - 1, header_text)
+        if isinstance(values, dict):
+            # 快取的欄位索引已過期：重讀表頭再取一次
+            self.invalidate()
+            values = self.driver.execute_script(
+                _READ_COLUMN_JS, *self.table_locator, self.column_of(header_text) - 1, header_text)
+        if values is None or isinstance(values, dict):
+            raise ValueError(f"找不到 table：{self.table_locator[1]}")
+        return [normalize(v) for v in values]
+
+    def read_row(self, row_index: int = 1) -> Dict[str, str]:
+        """單一資料列：{表頭文字: 儲存格文字}"""
+        result = self.driver.execute_script(_READ_ROW_JS, *self.table_locator, row_index)
+        if result is None:
+            raise IndexError(f"資料列 {row_index} 不存在：{self.table_locator[1]}")
+        index = _build_index(result["header"])
+        self._store_index(index)
+        values = result["cells"]
+        return {
+            header: normalize(values[col - 1]) if col - 1 < len(values) else ""
+            for header, col in index.items()
+        }
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """
+        整張表一次讀回：[{表頭文字: 儲存格文字}, ...]（不含表頭列）。
+        順便更新表頭索引快取。
+        """
+        table = self.driver.execute_script(_READ_ALL_JS, *self.table_locator)
+        if not table:
+            raise ValueError(f"找不到 table 或 table 沒有表頭：{self.table_locator[1]}")
+
+        index = _build_index(table[0])
+        self._store_index(index)
+
+        rows: List[Dict[str, Any]] = []
+        for cells in table[1:]:
+            row: Dict[str, Any] = {}
+            for header, col in index.items():
+                row[header] = normalize(cells[col - 1]) if col - 1 < len(cells) else ""
+            rows.append(row)
+        return rows
+
+
+def capture_table(driver, dt: DataTable, alias: str, table: Union[str, Locator]) -> int:
+    """
+    把畫面上的 HTML table 一次擷取進 DataTable（alias 重複會覆蓋）。
+    - table: 表頭文字（走 xpath.table_by_header）或 table locator
+    回傳擷取到的資料列數，之後可用 datatable.compare_sheets 與預期 sheet 比對。
+    """
+    locator = table_by_header(table) if isinstance(table, str) else table
+    rows = TableAccessor(driver, locator).read_all()
+    dt.add_sheet_from_rows(alias, rows)
+    return len(rows)
@@ -7,6 +7,9 @@ Locator = Tuple[By, str]
 Step = Dict[str, Any]
 StepList = List[Step]
 
+# DataTable 中單一資料列：{欄位名稱: 值}
+DataRow = Dict[str, Any]
+
 # Action function 型別：某個可被呼叫的流程函式
 ActionFunc = Callable[..., Any]
 # Action 對照表：action_name → Action function
@@ -10,24 +10,55 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.remote.webelement import WebElement
 from toolkit.types import Locator
-import tempfile
+from toolkit.flow import flow
+from toolkit.driver_service import driver_path, get_driver_services
+from toolkit.governor import get_governor, owner_env
+from toolkit.replay_proxy import get_replay_proxy
+from toolkit.deadline import DeadlineExceeded, clamp_timeout, current_deadline
 
 import config as C  
 
-def create_driver(timeout: Optional[int] = None) -> tuple[webdriver.Chrome, WebDriverWait]:
-    if timeout is None:
-        timeout = C.DEFAULT_TIMEOUT
-
+# 資源類型 → URL pattern（CDP Network.setBlockedURLs 只吃 URL pattern）
+_RESOURCE_TYPE_PATTERNS = {
+    "image": ("*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp"),
+    "font": ("*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"),
+    "media": ("*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav", "*.m4a"),
+    "stylesheet": ("*.css",),
+}
+
+# LoadProfile.DISABLE_BACKGROUND 關掉的背景功能（都與斷言無關，只會吃頻寬/CPU）
+_BACKGROUND_ARGS = (
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+)
+
+
+def blocked_url_patterns(profile: C.LoadProfile) -> list[str]:
+    patterns: list[str] = list(profile.BLOCK_URL_PATTERNS)
+    for resource_type in profile.BLOCK_RESOURCE_TYPES:
+        if resource_type not in _RESOURCE_TYPE_PATTERNS:
+            raise ValueError(f"LoadProfile {profile.NAME!r} 未知的資源類型：{resource_type!r}")
+        patterns.extend(_RESOURCE_TYPE_PATTERNS[resource_type])
+    return patterns
+
+
+def build_chrome_options(profile: C.LoadProfile, headless: Optional[bool] = None) -> Options:
+    """
+    依 LoadProfile 組出 Chrome Options（不含 user-data-dir）。
+    headless 不指定時依 HEADLESS 環境變數。
+    """
+    if headless is None:
+        headless = C.HEADLESS
     chrome_options = Options()
 
-    # 乾淨 profile（避免讀到本機 Chrome 的登入/同步/密碼庫）
-    profile_dir = tempfile.mkdtemp(prefix="chrome-profile-")
-    chrome_options.add_argument(f"--user-data-dir={profile_dir}")
-
     # 訪客模式
     chrome_options.add_argument("--guest")
 
@@ -36,26 +67,182 @@ def create_driver(timeout: Optional[int] = None) -> tuple[webdriver.Chrome, WebD
         "credentials_enable_service": False,
         "profile.password_manager_enabled": False,
     }
+    # 圖片直接用 content setting 關掉，比 URL pattern 更完整（沒有副檔名的圖也擋得到）
+    if "image" in profile.BLOCK_RESOURCE_TYPES:
+        prefs["profile.managed_default_content_settings.images"] = 2
     chrome_options.add_experimental_option("prefs", prefs)
 
-    if C.HEADLESS:
+    chrome_options.page_load_strategy = profile.PAGE_LOAD_STRATEGY
+
+    if profile.DISABLE_BACKGROUND:
+        for arg in _BACKGROUND_ARGS:
+            chrome_options.add_argument(arg)
+    if profile.DISABLE_FEATURES:
+        chrome_options.add_argument(f"--disable-features={','.join(profile.DISABLE_FEATURES)}")
+
+    if headless:
         chrome_options.add_argument("--headless=new")
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
 
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    wait = WebDriverWait(driver, timeout)
+    return chrome_options
+
+
+def enable_flight_logs(chrome_options: Options) -> None:
+    """
+    flight recorder 需要的 log：console + DevTools 網路事件（只開 Network，不記 Page / Timeline）。
+    只有掛了 FlightRecorder 的 session 才開，沒人取回的 performance log 會一直堆在 chromedriver。
+    """
+    chrome_options.set_capability("goog:loggingPrefs", {"browser": "ALL", "performance": "ALL"})
+    chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+
+def apply_replay_proxy(chrome_options: Options, env_config: C.EnvConfig) -> None:
+    """
+    REPLAY_MODE=record / replay 時讓 Chrome 的所有流量走錄製 / 重播 proxy（toolkit/replay_proxy.py）。
+    """
+    proxy = get_replay_proxy(env_config)
+    if proxy is None:
+        return
+    chrome_options.add_argument(f"--proxy-server={proxy.url}")
+    # 本機替身站台（127.0.0.1）也要經過 proxy
+    chrome_options.add_argument("--proxy-bypass-list=<-loopback>")
+    # HTTPS 由 proxy 以自簽憑證解開
+    chrome_options.add_argument("--ignore-certificate-errors")
+
+
+def apply_load_profile(driver: webdriver.Chrome, profile: C.LoadProfile) -> None:
+    """
+    driver 啟動後透過 DevTools 套用 URL 封鎖清單。
+    """
+    patterns = blocked_url_patterns(profile)
+    if not patterns:
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+
+class DeadlineWait(WebDriverWait):
+    """
+    WebDriverWait，每次等待不超過目前 deadline 的剩餘預算（toolkit/deadline.py）。
+    因預算不足而逾時會丟 DeadlineExceeded，而不是一般的 TimeoutException。
+    """
+
+    def until(self, method, message: str = ""):
+        return self._bounded(lambda wait: WebDriverWait.until(wait, method, message))
+
+    def until_not(self, method, message: str = ""):
+        return self._bounded(lambda wait: WebDriverWait.until_not(wait, method, message))
+
+    def _bounded(self, call):
+        timeout = clamp_timeout(self._timeout)
+        if timeout >= self._timeout:
+            return call(self)
+        try:
+            return call(WebDriverWait(self._driver, timeout, self._poll, self._ignored_exceptions))
+        except TimeoutException as e:
+            raise DeadlineExceeded(current_deadline()) from e
+
+
+def create_driver(timeout: Optional[int] = None,
+                  env_config: Optional[C.EnvConfig] = None,
+                  profile: Optional[C.LoadProfile] = None,
+                  flight_logs: bool = False) -> tuple[webdriver.Chrome, WebDriverWait]:
+    """
+    建立 Chrome driver。
+    - env_config: 不指定時使用 ACTIVE_CONFIG
+    - profile: 不指定時依 env_config（或環境變數 LOAD_PROFILE）決定
+    - flight_logs: 開啟 FlightRecorder 需要的 console / performance log
+    """
+    if timeout is None:
+        timeout = C.DEFAULT_TIMEOUT
+    if env_config is None:
+        env_config = C.ACTIVE_CONFIG
+    if profile is None:
+        profile = C.get_load_profile(env_config)
+
+    chrome_options = build_chrome_options(profile)
+    if flight_logs:
+        enable_flight_logs(chrome_options)
+    apply_replay_proxy(chrome_options, env_config)
+
+    # 取得 browser 名額（資源不足時排隊），並使用它專屬的乾淨 profile
+    # （避免讀到本機 Chrome 的登入/同步/密碼庫；quit_driver 時由 governor 回收）
+    governor = get_governor()
+    lease = governor.acquire()
+    chrome_options.add_argument(f"--user-data-dir={lease.profile_dir}")
+
+    try:
+        # 共用 chromedriver process（SHARED_DRIVER_SERVICE=false 時每個 driver 各開一個）
+        if C.SHARED_DRIVER_SERVICE:
+            service = get_driver_services().attach()
+        else:
+            service = Service(driver_path(), env=owner_env())
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+    except Exception:
+        governor.release(lease)
+        raise
+    governor.bind(driver, lease)
+
+    try:
+        apply_load_profile(driver, profile)
+    except Exception:
+        quit_driver(driver)
+        raise
+    wait = DeadlineWait(driver, timeout)
     return driver, wait
 
 
-def take_screenshot(driver, name_prefix: str = "error") -> str:
+def quit_driver(driver: webdriver.Chrome) -> None:
+    """
+    關閉 driver 並回收資源（殘留的 Chrome process、profile 目錄、browser 名額）。
+    driver 已經掛掉時也會照常回收。
+    """
+    try:
+        driver.quit()
+    finally:
+        get_governor().release_driver(driver)
+
+
+def abort_driver(driver: webdriver.Chrome) -> None:
+    """
+    強制中止 driver（deadline watchdog 用，可從其他 thread 呼叫）：
+    先殺掉 Chrome process，讓卡住中的 WebDriver 指令立即失敗，再結束 session。
+    """
+    get_governor().release_driver(driver)
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+@flow
+def reset_browser_state(driver):
+    """
+    在同一個 browser session 內重設狀態（資料驅動 iteration 之間使用）：
+    - 清除目前網域的 localStorage / sessionStorage
+    - 刪除所有 cookie
+    - 回到空白頁
+    driver 為 AsyncWebDriver 時回傳 coroutine（toolkit/flow.py）。
+    """
+    try:
+        yield driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    except WebDriverException:
+        # about:blank / data: 頁面沒有 storage 可以清
+        pass
+    yield driver.delete_all_cookies()
+    yield driver.get("about:blank")
+
+
+def take_screenshot(driver, name_prefix: str = "error", env_name: Optional[str] = None) -> str:
     """
-    依照目前環境將 screenshot 存到指定資料夾，回傳實際路徑。
+    依照環境將 screenshot 存到指定資料夾，回傳實際路徑。
+    env_name 不指定時使用 ACTIVE_CONFIG 的環境。
     """
     timestamp = time.strftime("%Y%m%d_%H%M%S")
     filename = f"{name_prefix}_{timestamp}.png"
-    filepath = os.path.join(C.SCREENSHOT_DIR, filename)
+    directory = C.screenshot_dir(env_name) if env_name else C.SCREENSHOT_DIR
+    filepath = os.path.join(directory, filename)
 
     driver.save_screenshot(filepath)
     return filepath
@@ -117,7 +304,7 @@ def wait_for_url(driver, expected: str, timeout: int = 10, partial: bool = True)
         condition = EC.url_to_be(expected)
 
     try:
-        WebDriverWait(driver, timeout).until(condition)
+        DeadlineWait(driver, timeout).until(condition)
         return True
     except TimeoutException:
         return False
@@ -116,6 +116,25 @@ def table_cell_by_header(table_xpath: str|None,header_text: str, row_index: int
     return (By.XPATH, xpath)
 
 
+def table_cell_by_index(table_xpath: str, col_index: int, row_index: int = 1,
+                        header_text: str | None = None) -> Locator:
+    """
+    已知欄位索引時直接定位 <td>，不需瀏覽器逐格計算表頭位置。
+    欄位索引通常由 toolkit.table.TableAccessor 讀表頭後快取提供。
+
+    - col_index: 第幾欄（1-based）
+    - row_index: 第幾筆資料列（1 = 第一筆資料列，即第二個 tr）
+    - header_text: 給定時只在第 col_index 個表頭仍是這個文字時才找得到，
+      欄位被切換 / 重新排序後不會默默對到別欄
+    - table_xpath 可用 "." 取得相對於 table 元素的 locator
+    """
+    xpath = f"{table_xpath}//tr[position()>1][{row_index}]/td[{col_index}]"
+    if header_text is not None:
+        literal = _xpath_literal(header_text)
+        xpath += f"[normalize-space((ancestor::table[1]//tr)[1]/*[{col_index}])=normalize-space({literal})]"
+    return (By.XPATH, xpath)
+
+
 def table_input_by_header(table_xpath: str|None, header_text: str, row_index: int = 1) -> Locator:
     """
     根據表頭文字 + 資料列索引，取得該格 <td> 底下的第一個 <input>。